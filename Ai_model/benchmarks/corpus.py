@@ -0,0 +1,118 @@
+import os
+import random
+import docx
+from PIL import Image, ImageDraw
+
+WORDS = (
+    "agreement clause party section liability payment invoice shipment warranty schedule "
+    "component assembly tolerance revision manual procedure inspection report quarterly "
+    "revenue forecast customer account service contract renewal termination notice "
+    "the of and to in for with on by as at from that this is are be will shall may"
+).split()
+
+def random_text(rng, words):
+    """Pseudo-English text with sentence and paragraph breaks"""
+    out = []
+    for i in range(words):
+        out.append(rng.choice(WORDS))
+        if i % 14 == 13:
+            out[-1] += "."
+        if i % 120 == 119:
+            out[-1] += "\n\n"
+    return " ".join(out)
+
+def _pdf_escape(text):
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+def write_text_pdf(path, pages):
+    """Write a minimal PDF with a real text layer, one string of text per page"""
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        None,
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    page_refs = []
+    for page_text in pages:
+        lines = []
+        for paragraph in page_text.split("\n"):
+            words = paragraph.split()
+            while words:
+                lines.append(" ".join(words[:12]))
+                words = words[12:]
+        stream = "BT /F1 10 Tf 12 TL 50 780 Td " + " ".join(f"({_pdf_escape(line)}) '" for line in lines[:60]) + " ET"
+        stream = stream.encode("latin-1", "replace")
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+        content_ref = len(objects)
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % content_ref
+        )
+        page_refs.append(len(objects))
+    kids = b" ".join(b"%d 0 R" % ref for ref in page_refs)
+    objects[1] = b"<< /Type /Pages /Kids [" + kids + b"] /Count %d >>" % len(page_refs)
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for offset in offsets:
+        out += b"%010d 00000 n \n" % offset
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    with open(path, "wb") as f:
+        f.write(out)
+
+def render_text_image(text, size):
+    """Render text onto a white page image, as a scanner or phone camera would produce"""
+    width, height = size
+    img = Image.new("RGB", size, "white")
+    draw = ImageDraw.Draw(img)
+    line_height = max(12, height // 60)
+    words = text.split()
+    y = line_height
+    while words and y < height - line_height:
+        draw.text((line_height, y), " ".join(words[:12]), fill="black")
+        words = words[12:]
+        y += line_height
+    return img
+
+def generate_corpus(out_dir, text_pdfs=2, scanned_pdfs=1, pages=20, docx_files=2, txt_files=2,
+                    images=2, image_size=(2480, 3508), words_per_page=400, seed=42):
+    """Generate a synthetic local corpus and return {kind: [paths]}"""
+    rng = random.Random(seed)
+    os.makedirs(out_dir, exist_ok=True)
+    corpus = {"text_pdf": [], "scanned_pdf": [], "docx": [], "txt": [], "image": []}
+
+    for i in range(text_pdfs):
+        path = os.path.join(out_dir, f"text_{i}.pdf")
+        write_text_pdf(path, [random_text(rng, words_per_page) for _ in range(pages)])
+        corpus["text_pdf"].append(path)
+
+    for i in range(scanned_pdfs):
+        path = os.path.join(out_dir, f"scanned_{i}.pdf")
+        page_images = [render_text_image(random_text(rng, words_per_page), image_size) for _ in range(pages)]
+        page_images[0].save(path, save_all=True, append_images=page_images[1:], resolution=300)
+        corpus["scanned_pdf"].append(path)
+
+    for i in range(docx_files):
+        path = os.path.join(out_dir, f"doc_{i}.docx")
+        document = docx.Document()
+        for paragraph in random_text(rng, words_per_page * pages).split("\n\n"):
+            document.add_paragraph(paragraph.strip())
+        document.save(path)
+        corpus["docx"].append(path)
+
+    for i in range(txt_files):
+        path = os.path.join(out_dir, f"notes_{i}.txt")
+        with open(path, "w") as f:
+            f.write(random_text(rng, words_per_page * pages))
+        corpus["txt"].append(path)
+
+    for i in range(images):
+        path = os.path.join(out_dir, f"photo_{i}.jpg")
+        render_text_image(random_text(rng, words_per_page), image_size).save(path, quality=90)
+        corpus["image"].append(path)
+
+    return corpus
@@ -0,0 +1,327 @@
+"""Extraction and chunking micro-benchmarks with baseline regression checks.
+
+Run from the Ai_model directory:
+
+    python -m benchmarks.run                      # run and compare with benchmarks/baseline.json
+    python -m benchmarks.run --update-baseline    # record the current numbers as the baseline
+    python -m benchmarks.run --pages 50 --text-mb 8 --output results.json
+
+Each case runs in a fresh process so peak RSS is measured per case (summed
+over the OCR worker processes for extraction), and the extraction cache
+points at an empty temp folder so every run is cold.
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import resource
+import tempfile
+import threading
+import multiprocessing
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, "baseline.json")
+
+# metric -> True if higher is better
+METRIC_DIRECTIONS = {
+    "pages_per_sec": True,
+    "mb_per_sec": True,
+    "p50_ms": False,
+    "p95_ms": False,
+    "p99_ms": False,
+    "peak_rss_mb": False,
+    "rss_growth_mb": False,
+}
+
+EXTRACTION_KINDS = ("text_pdf", "scanned_pdf", "docx", "txt", "image")
+
+def _current_rss_mb():
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+
+def _peak_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def _tree_rss_mb():
+    """Resident memory of this process plus all its descendants (e.g. OCR workers)"""
+    parents = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                # The command name may contain spaces; fields resume after its closing paren
+                fields = f.read().rsplit(")", 1)[1].split()
+            parents.setdefault(int(fields[1]), []).append(int(entry))
+        except (OSError, IndexError):
+            continue
+    pids, stack = [], [os.getpid()]
+    while stack:
+        pid = stack.pop()
+        pids.append(pid)
+        stack.extend(parents.get(pid, ()))
+
+    total = 0
+    for pid in pids:
+        try:
+            with open(f"/proc/{pid}/statm") as f:
+                total += int(f.read().split()[1])
+        except OSError:
+            continue
+    return total * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+
+class _TreeRssSampler:
+    """Samples _tree_rss_mb in a background thread and keeps the peak"""
+
+    def __init__(self, interval=0.05):
+        self.interval = interval
+        self.peak = 0.0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while True:
+            self.peak = max(self.peak, _tree_rss_mb())
+            if self._stop.wait(self.interval):
+                return
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, _tree_rss_mb())
+
+def _percentiles(samples):
+    if not samples:
+        return {"p50_ms": 0.0, "p95_ms": 0.0, "p99_ms": 0.0}
+    ordered = sorted(samples)
+    pick = lambda q: ordered[min(len(ordered) - 1, int(len(ordered) * q))] * 1000
+    return {"p50_ms": pick(0.50), "p95_ms": pick(0.95), "p99_ms": pick(0.99)}
+
+def _bench_extraction(folder):
+    os.environ["EXTRACTION_CACHE_DIR"] = tempfile.mkdtemp(prefix="bench_cache_")
+    from core.proces.file_process import extract_text_from_all_files, iter_pages_from_file, list_supported_files
+    from core.proces.ocr_engine import ocr_engine
+
+    files = list_supported_files(folder)
+    size_mb = sum(os.path.getsize(path) for path in files) / (1024 * 1024)
+    rss_before = _tree_rss_mb()
+
+    with _TreeRssSampler() as sampler:
+        # Whole-folder pass, as the upload path runs it, for throughput in MB/s
+        start = time.perf_counter()
+        text = extract_text_from_all_files(folder)
+        elapsed = time.perf_counter() - start
+
+        # Second cold pass, file by file, timed on its own for pages/s and per-page latency
+        shutil.rmtree(os.environ["EXTRACTION_CACHE_DIR"], ignore_errors=True)
+        latencies = []
+        pages = 0
+        page_start = time.perf_counter()
+        for path in files:
+            last = time.perf_counter()
+            for _ in iter_pages_from_file(path):
+                now = time.perf_counter()
+                latencies.append(now - last)
+                last = now
+                pages += 1
+        page_elapsed = time.perf_counter() - page_start
+
+    ocr_engine.shutdown(wait=True)
+    # Peak across this process and its OCR workers, sampled during both passes
+    peak_rss = max(sampler.peak, _peak_rss_mb())
+    return {
+        "files": len(files),
+        "pages": pages,
+        "chars": len(text),
+        "seconds": elapsed,
+        "page_pass_seconds": page_elapsed,
+        "pages_per_sec": pages / page_elapsed if page_elapsed else 0.0,
+        "mb_per_sec": size_mb / elapsed if elapsed else 0.0,
+        **_percentiles(latencies),
+        "peak_rss_mb": peak_rss,
+        "rss_growth_mb": peak_rss - rss_before,
+    }
+
+def _bench_text(func_name, text_mb):
+    import random
+    from benchmarks.corpus import random_text
+
+    text = random_text(random.Random(7), int(text_mb * 1024 * 1024 / 8))
+    if func_name == "get_text_chunks":
+        from core.utils.document_manager import get_text_chunks as func
+    else:
+        from core.proces.file_process import count_words as func
+
+    rss_before = _current_rss_mb()
+    rounds = []
+    for _ in range(3):
+        start = time.perf_counter()
+        result = func(text)
+        rounds.append(time.perf_counter() - start)
+    elapsed = min(rounds)
+    size_mb = len(text.encode("utf-8")) / (1024 * 1024)
+    return {
+        "input_mb": size_mb,
+        "output": len(result) if isinstance(result, list) else result,
+        "seconds": elapsed,
+        "mb_per_sec": size_mb / elapsed if elapsed else 0.0,
+        "peak_rss_mb": _peak_rss_mb(),
+        "rss_growth_mb": _peak_rss_mb() - rss_before,
+    }
+
+def _child(queue, case, args):
+    try:
+        if case.startswith("extract:"):
+            result = _bench_extraction(args["folder"])
+        else:
+            result = _bench_text(case.split(":", 1)[1], args["text_mb"])
+        queue.put(result)
+    except Exception as e:
+        queue.put({"error": f"{type(e).__name__}: {e}"})
+
+def run_case(case, args):
+    """Run one benchmark case in a fresh process"""
+    context = multiprocessing.get_context("spawn")
+    queue = context.Queue()
+    process = context.Process(target=_child, args=(queue, case, args))
+    process.start()
+    result = queue.get()
+    process.join()
+    return result
+
+def compare(results, baseline, threshold):
+    """Return a list of regressions beyond `threshold` (fractional) versus the baseline"""
+    regressions = []
+    for case, metrics in results["cases"].items():
+        base = baseline.get("cases", {}).get(case)
+        if not base or "error" in base:
+            continue
+        if "error" in metrics:
+            # A case that used to run and now fails is the worst regression of all
+            regressions.append({"case": case, "metric": "error", "error": metrics["error"]})
+            continue
+        for metric, higher_is_better in METRIC_DIRECTIONS.items():
+            if metric not in metrics or not base.get(metric):
+                continue
+            change = (metrics[metric] - base[metric]) / base[metric]
+            worse = -change if higher_is_better else change
+            if worse > threshold:
+                regressions.append({
+                    "case": case,
+                    "metric": metric,
+                    "baseline": base[metric],
+                    "current": metrics[metric],
+                    "change": change,
+                })
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark extraction, chunking and word counting")
+    parser.add_argument("--pages", type=int, default=20, help="Pages per PDF and page-equivalents per DOCX/TXT")
+    parser.add_argument("--files", type=int, default=2, help="Files per corpus kind")
+    parser.add_argument("--image-width", type=int, default=2480)
+    parser.add_argument("--image-height", type=int, default=3508)
+    parser.add_argument("--words-per-page", type=int, default=400)
+    parser.add_argument("--text-mb", type=float, default=4.0, help="Input size for chunking/word-count cases")
+    parser.add_argument("--kinds", default=",".join(EXTRACTION_KINDS), help="Comma-separated corpus kinds to extract")
+    parser.add_argument("--corpus-dir", help="Keep the generated corpus here instead of a temp folder")
+    parser.add_argument("--output", default=os.path.join(BENCH_DIR, "results.json"))
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument(
+        "--update-baseline", "--save-baseline", dest="update_baseline", action="store_true",
+        help="Record the current numbers as the baseline instead of comparing",
+    )
+    parser.add_argument("--threshold", type=float, default=0.2, help="Allowed fractional regression per metric")
+    args = parser.parse_args(argv)
+
+    from benchmarks.corpus import generate_corpus
+
+    corpus_root = args.corpus_dir or tempfile.mkdtemp(prefix="bench_corpus_")
+    kinds = [kind for kind in args.kinds.split(",") if kind]
+    counts = {
+        "text_pdf": "text_pdfs", "scanned_pdf": "scanned_pdfs", "docx": "docx_files",
+        "txt": "txt_files", "image": "images",
+    }
+
+    results = {
+        "meta": {
+            "timestamp": time.time(),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "params": {k: v for k, v in vars(args).items() if k not in ("output", "baseline", "update_baseline")},
+        },
+        "cases": {},
+    }
+
+    try:
+        for kind in kinds:
+            folder = os.path.join(corpus_root, kind)
+            generate_corpus(
+                folder,
+                **{name: (args.files if key == kind else 0) for key, name in counts.items()},
+                pages=args.pages,
+                image_size=(args.image_width, args.image_height),
+                words_per_page=args.words_per_page,
+            )
+            case = f"extract:{kind}"
+            print(f"⏱️ {case}")
+            results["cases"][case] = run_case(case, {"folder": folder})
+
+        for func_name in ("get_text_chunks", "count_words"):
+            case = f"text:{func_name}"
+            print(f"⏱️ {case}")
+            results["cases"][case] = run_case(case, {"text_mb": args.text_mb})
+    finally:
+        if not args.corpus_dir:
+            shutil.rmtree(corpus_root, ignore_errors=True)
+
+    for case, metrics in results["cases"].items():
+        if "error" in metrics:
+            print(f"❌ {case}: {metrics['error']}")
+            continue
+        summary = ", ".join(
+            f"{metric}={metrics[metric]:.2f}" for metric in METRIC_DIRECTIONS if metric in metrics
+        )
+        print(f"📊 {case}: {summary}")
+
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=4)
+    print(f"✅ Results written to {args.output}")
+
+    if args.update_baseline:
+        failed = [case for case, metrics in results["cases"].items() if "error" in metrics]
+        if failed:
+            print(f"❌ Not updating the baseline, these cases failed: {', '.join(failed)}")
+            return 1
+        with open(args.baseline, "w") as f:
+            json.dump(results, f, indent=4)
+        print(f"✅ Baseline saved to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"❌ No baseline at {args.baseline}; nothing to compare against. Run with --update-baseline to record one")
+        return 1
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    regressions = compare(results, baseline, args.threshold)
+    for r in regressions:
+        if "error" in r:
+            print(f"❌ Regression in {r['case']}: case failed ({r['error']})")
+            continue
+        print(f"❌ Regression in {r['case']} {r['metric']}: {r['baseline']:.2f} -> {r['current']:.2f} ({r['change']:+.0%})")
+    if regressions:
+        return 1
+    print(f"✅ No regressions beyond {args.threshold:.0%} versus baseline")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,16 +1,23 @@
-from core.proces.file_process import extract_text_from_all_files, count_words
-from core.utils.document_manager import process_files, get_cached_vector_store
-from core.proces.search_engine import optimized_content_search, get_cached_response, cache_response, learn_user_patterns
-from .chat_handler import answer_question
+from core.proces.file_process import extract_text_from_all_files, iter_pages_from_all_files, iter_pages_from_files, count_words
+from core.utils.document_manager import process_files, ensure_chat, get_cached_vector_store
+from core.utils.ingest_jobs import ingest_job_manager
+from core.proces.search_engine import optimized_content_search, search_user_documents, get_cached_response, cache_response, learn_user_patterns
+from .chat_handler import answer_question, stream_answer
 
 __all__ = [
     'extract_text_from_all_files',
+    'iter_pages_from_all_files',
+    'iter_pages_from_files',
     'count_words', 
     'process_files',
+    'ensure_chat',
+    'ingest_job_manager',
     'get_cached_vector_store',
     'optimized_content_search',
+    'search_user_documents',
     'get_cached_response',
     'cache_response',
     'answer_question',
+    'stream_answer',
     'learn_user_patterns'
 ]
\ No newline at end of file
@@ -1,12 +1,40 @@
 from langchain.schema import Document
 from utils.file_utils import append_history, load_history
-from utils.ChainManager import OptimizedChainManager
-from core import get_cached_vector_store, get_cached_response, cache_response, learn_user_patterns, optimized_content_search
+from utils.ChainManager import OptimizedChainManager, CONTEXT_ONLY_TEMPLATE
+from core import get_cached_vector_store, get_cached_response, cache_response, learn_user_patterns, optimized_content_search, search_user_documents
 
 
 chain_manager = OptimizedChainManager()
 
-async def answer_question(user_id, doc_id, question, is_normal_chat=False, context_only=False):
+IDENTITY_KEYWORDS = ["model name", "what model", "your name", "who are you", "what are you", "ur name", "wat r u"]
+IDENTITY_ANSWER = "My name is Jack. I'm an AI assistant designed to help you understand and analyze your documents."
+NORMAL_CONTEXT_ONLY_ANSWER = "I can't provide a context-only answer for a normal chat as there's no document context available. Please upload a document first or ask questions about your documents."
+ERROR_ANSWER = "I apologize, but I encountered an issue processing your question. Could you please try rephrasing it?"
+
+def normal_chat_prompt(question):
+    return f"""You are Jack, a helpful AI assistant. Answer the user's question directly and conversationally.
+
+            User Question: {question}
+            Answer:"""
+
+def hybrid_prompt(question):
+    return f"""You are Jack, a helpful AI assistant. Answer the user's question directly using your knowledge.
+
+            Instructions:
+            - Provide a clear, direct answer to the question
+            - Use your general knowledge to give the best response
+            - Be conversational and helpful
+            - Don't reference any documents or previous conversations
+
+            User Question: {question}
+
+            Answer:"""
+
+def recent_history(doc_id):
+    history = load_history(doc_id)[-3:]
+    return "\n".join([f"Q: {h['question']}\nA: {h['answer']}" for h in history])
+
+async def answer_question(user_id, doc_id, question, is_normal_chat=False, context_only=False, scope="doc"):
     """Answer question using unified approach with direct model calls for hybrid mode
     
     Args:
@@ -15,37 +43,65 @@ async def answer_question(user_id, doc_id, question, is_normal_chat=False, conte
         question: The user's question
         is_normal_chat: Whether this is a normal chat without document context
         context_only: If True, only use embedded data; if False, use Gemini directly
+        scope: "doc" to search doc_id only, "all" to search every document of the user
     """
     
-    print(f"🤖 Processing question: '{question}' for doc_id: {doc_id}, normal_chat: {is_normal_chat}, context_only: {context_only}")
+    print(f"🤖 Processing question: '{question}' for doc_id: {doc_id}, normal_chat: {is_normal_chat}, context_only: {context_only}, scope: {scope}")
     
-    cached = await get_cached_response(doc_id, question, context_only)
+    # Answers over all documents depend on the user's whole library, not on this chat's document
+    cache_id = f"user_{user_id}_all" if scope == "all" else doc_id
+    cached = await get_cached_response(cache_id, question, context_only)
     if cached:
         return cached
     
-    identity_keywords = ["model name", "what model", "your name", "who are you", "what are you", "ur name", "wat r u"]
-    if any(k in question.lower() for k in identity_keywords):
-        answer = "My name is Jack. I'm an AI assistant designed to help you understand and analyze your documents."
-        await cache_response(doc_id, question, answer, context_only)
+    if any(k in question.lower() for k in IDENTITY_KEYWORDS):
+        answer = IDENTITY_ANSWER
+        await cache_response(cache_id, question, answer, context_only)
         await learn_user_patterns(user_id, question, "identity")
         await append_history(doc_id, question, answer)
         return answer
     
     try:
+        if scope == "all":
+            print(f"📚 Searching all documents of user {user_id}")
+            hits = await search_user_documents(user_id, question, top_k=4)
+            
+            history_str = recent_history(doc_id)
+            
+            chain = await chain_manager.get_chain(doc_id, context_only=True)
+            docs = [
+                Document(page_content=f"[{hit['doc_name'] or hit['doc_id']}]\n{hit['text']}", metadata={"doc_id": hit["doc_id"]})
+                for hit in hits
+            ]
+            
+            # ainvoke, so the LLM call does not block the event loop
+            response = await chain.ainvoke({
+                "input_documents": docs, 
+                "question": question, 
+                "history": history_str
+            }, return_only_outputs=True)
+            
+            answer = response["output_text"].strip()
+            
+            if not answer or len(answer) < 10:
+                answer = "None of your documents contain sufficient information to answer your question."
+            
+            await cache_response(cache_id, question, answer, context_only)
+            await learn_user_patterns(user_id, question, "all_documents")
+            await append_history(doc_id, question, answer)
+            return answer
+        
         if is_normal_chat:
             if context_only:
-                answer = "I can't provide a context-only answer for a normal chat as there's no document context available. Please upload a document first or ask questions about your documents."
-                await cache_response(doc_id, question, answer, context_only)
+                answer = NORMAL_CONTEXT_ONLY_ANSWER
+                await cache_response(cache_id, question, answer, context_only)
                 await append_history(doc_id, question, answer)
                 return answer
                 
             print(f"💬 Processing as normal chat for doc_id: {doc_id}")
             model = await chain_manager.get_direct_model(doc_id)
             
-            prompt = f"""You are Jack, a helpful AI assistant. Answer the user's question directly and conversationally.
-
-            User Question: {question}
-            Answer:"""
+            prompt = normal_chat_prompt(question)
             
             response = await model.ainvoke(prompt)
             answer = response.content.strip()
@@ -53,7 +109,7 @@ async def answer_question(user_id, doc_id, question, is_normal_chat=False, conte
             if not answer or len(answer) < 10:
                 answer = "I'm not sure I understand your question. Could you please provide more details?"
             
-            await cache_response(doc_id, question, answer, context_only)
+            await cache_response(cache_id, question, answer, context_only)
             await learn_user_patterns(user_id, question, answer)
             await append_history(doc_id, question, answer)
             
@@ -62,10 +118,9 @@ async def answer_question(user_id, doc_id, question, is_normal_chat=False, conte
         if context_only:
             print("📄 Using context-only mode - searching embedded data only")
             vector_store = await get_cached_vector_store(doc_id)
-            context = await optimized_content_search(question, vector_store, top_k=4)
+            context = await optimized_content_search(question, vector_store, top_k=4, doc_id=doc_id)
             
-            history = load_history(doc_id)[-3:]
-            history_str = "\n".join([f"Q: {h['question']}\nA: {h['answer']}" for h in history])
+            history_str = recent_history(doc_id)
             
             chain = await chain_manager.get_chain(doc_id, context_only=True)
             
@@ -74,7 +129,8 @@ async def answer_question(user_id, doc_id, question, is_normal_chat=False, conte
             else:
                 docs = [Document(page_content=c) for c in context]
             
-            response = chain({
+            # ainvoke, so the LLM call does not block the event loop
+            response = await chain.ainvoke({
                 "input_documents": docs, 
                 "question": question, 
                 "history": history_str
@@ -85,7 +141,7 @@ async def answer_question(user_id, doc_id, question, is_normal_chat=False, conte
             if not answer or len(answer) < 10:
                 answer = "The provided documents do not contain sufficient information to answer your question. Please try asking about topics that are specifically covered in your documents."
             
-            await cache_response(doc_id, question, answer, context_only)
+            await cache_response(cache_id, question, answer, context_only)
             await learn_user_patterns(user_id, question, "context_only")
             await append_history(doc_id, question, answer)
             return answer
@@ -95,17 +151,7 @@ async def answer_question(user_id, doc_id, question, is_normal_chat=False, conte
             
             model = await chain_manager.get_direct_model(doc_id)
             
-            prompt = f"""You are Jack, a helpful AI assistant. Answer the user's question directly using your knowledge.
-
-            Instructions:
-            - Provide a clear, direct answer to the question
-            - Use your general knowledge to give the best response
-            - Be conversational and helpful
-            - Don't reference any documents or previous conversations
-
-            User Question: {question}
-
-            Answer:"""
+            prompt = hybrid_prompt(question)
             
             response = await model.ainvoke(prompt)
             answer = response.content.strip()
@@ -113,7 +159,7 @@ async def answer_question(user_id, doc_id, question, is_normal_chat=False, conte
             if not answer or len(answer) < 10:
                 answer = "I'm having trouble generating a response. Could you please try rephrasing your question?"
             
-            await cache_response(doc_id, question, answer, context_only)
+            await cache_response(cache_id, question, answer, context_only)
             await learn_user_patterns(user_id, question, answer)
             await append_history(doc_id, question, answer)
             
@@ -121,4 +167,84 @@ async def answer_question(user_id, doc_id, question, is_normal_chat=False, conte
         
     except Exception as e:
         print(f"❌ Error in answer_question: {e}")
-        fallback = "I apologize, but I encountered an issue processing your question. Could you please try rephrasing it?"
\ No newline at end of file
+        return ERROR_ANSWER
+
+async def _finish_answer(user_id, doc_id, cache_id, question, answer, context_only, pattern):
+    """Cache, learn from and record a completed answer"""
+    await cache_response(cache_id, question, answer, context_only)
+    if pattern is not None:
+        await learn_user_patterns(user_id, question, pattern)
+    await append_history(doc_id, question, answer)
+
+async def stream_answer(user_id, doc_id, question, is_normal_chat=False, context_only=False, scope="doc"):
+    """Streaming counterpart of answer_question: yields answer text as Gemini generates it.
+
+    Retrieval and prompts are the same as answer_question; context-only
+    prompts are formatted from the QA chain's template and sent to the model
+    directly so they can stream. Caching, history and pattern learning run
+    on the assembled answer after the last piece has been yielded.
+    """
+    print(f"🤖 Streaming answer to: '{question}' for doc_id: {doc_id}, normal_chat: {is_normal_chat}, context_only: {context_only}, scope: {scope}")
+    
+    cache_id = f"user_{user_id}_all" if scope == "all" else doc_id
+    cached = await get_cached_response(cache_id, question, context_only)
+    if cached:
+        yield cached
+        return
+    
+    fixed_answer = None
+    if any(k in question.lower() for k in IDENTITY_KEYWORDS):
+        fixed_answer, pattern = IDENTITY_ANSWER, "identity"
+    elif is_normal_chat and context_only and scope != "all":
+        fixed_answer, pattern = NORMAL_CONTEXT_ONLY_ANSWER, None
+    if fixed_answer:
+        yield fixed_answer
+        try:
+            await _finish_answer(user_id, doc_id, cache_id, question, fixed_answer, context_only, pattern)
+        except Exception as e:
+            print(f"⚠️ Failed to record streamed answer: {e}")
+        return
+    
+    try:
+        if scope == "all":
+            hits = await search_user_documents(user_id, question, top_k=4)
+            context = "\n\n".join(f"[{hit['doc_name'] or hit['doc_id']}]\n{hit['text']}" for hit in hits)
+            prompt = CONTEXT_ONLY_TEMPLATE.format(history=recent_history(doc_id), context=context, question=question)
+            empty_answer = "None of your documents contain sufficient information to answer your question."
+            pattern = "all_documents"
+        elif is_normal_chat:
+            prompt = normal_chat_prompt(question)
+            empty_answer = "I'm not sure I understand your question. Could you please provide more details?"
+            pattern = ""
+        elif context_only:
+            vector_store = await get_cached_vector_store(doc_id)
+            context = await optimized_content_search(question, vector_store, top_k=4, doc_id=doc_id)
+            prompt = CONTEXT_ONLY_TEMPLATE.format(history=recent_history(doc_id), context="\n\n".join(context), question=question)
+            empty_answer = "The provided documents do not contain sufficient information to answer your question. Please try asking about topics that are specifically covered in your documents."
+            pattern = "context_only"
+        else:
+            prompt = hybrid_prompt(question)
+            empty_answer = "I'm having trouble generating a response. Could you please try rephrasing your question?"
+            pattern = ""
+        
+        model = await chain_manager.get_direct_model(doc_id)
+        parts = []
+        async for chunk in model.astream(prompt):
+            if chunk.content:
+                parts.append(chunk.content)
+                yield chunk.content
+        
+        answer = "".join(parts).strip()
+        if not answer:
+            answer = empty_answer
+            yield answer
+    except Exception as e:
+        print(f"❌ Error in stream_answer: {e}")
+        yield ERROR_ANSWER
+        return
+    
+    try:
+        # Normal and hybrid chats learn from the answer text itself, as in answer_question
+        await _finish_answer(user_id, doc_id, cache_id, question, answer, context_only, pattern or answer)
+    except Exception as e:
+        print(f"⚠️ Failed to record streamed answer: {e}")
@@ -0,0 +1,73 @@
+import os
+import numpy as np
+
+CONTEXT_MMR_ENABLED = os.getenv("CONTEXT_MMR_ENABLED", "true").lower() == "true"
+CONTEXT_MMR_LAMBDA = float(os.getenv("CONTEXT_MMR_LAMBDA", "0.7"))
+# Candidates scoring below this fraction of the best candidate's similarity are not used
+CONTEXT_RELATIVE_THRESHOLD = float(os.getenv("CONTEXT_RELATIVE_THRESHOLD", "0.8"))
+# Chunks this similar to one already selected are treated as the same text (e.g. chunk overlap)
+CONTEXT_MAX_OVERLAP = float(os.getenv("CONTEXT_MAX_OVERLAP", "0.95"))
+CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", "1200"))
+
+def estimate_tokens(text):
+    return max(1, len(text) // 4)
+
+def _normalize(matrix):
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+def select_context(query_vector, texts, vectors, max_chunks=4, lambda_mult=CONTEXT_MMR_LAMBDA,
+                   relative_threshold=CONTEXT_RELATIVE_THRESHOLD, max_overlap=CONTEXT_MAX_OVERLAP,
+                   token_budget=CONTEXT_TOKEN_BUDGET, scores=None, exempt=()):
+    """Pick up to max_chunks texts by Maximal Marginal Relevance.
+
+    `texts` come ranked best first (the fused retrieval order) and the first
+    one is always kept. Each further pick maximizes
+    lambda * relevance(c) - (1 - lambda) * max sim(c, selected), among
+    candidates that clear the relative score threshold, are not
+    near-duplicates of a selected chunk and still fit the token budget.
+
+    Relevance is the dense similarity to the query, or, when `scores` (the
+    fused retrieval scores of `texts`) are given, those scores scaled to the
+    best one. The threshold is on dense similarity, and candidates whose
+    index is in `exempt` skip it: a BM25 hit on an exact identifier can rank
+    high while its embedding is far from the question's.
+    """
+    if not texts:
+        return []
+    query = _normalize(np.asarray(query_vector, dtype=np.float32))
+    matrix = _normalize(np.asarray(vectors, dtype=np.float32))
+    dense = matrix @ query
+    similarity = matrix @ matrix.T
+
+    if scores is not None:
+        relevance = np.asarray(scores, dtype=np.float32)
+        if relevance.max() > 0:
+            relevance = relevance / relevance.max()
+    else:
+        relevance = dense
+
+    best = dense.max()
+    eligible = dense >= best * relative_threshold if best > 0 else np.ones(len(texts), dtype=bool)
+    eligible[[i for i in exempt if 0 <= i < len(texts)]] = True
+    tokens = np.array([estimate_tokens(text) for text in texts])
+
+    selected = [0]
+    budget = token_budget - tokens[0]
+    eligible[0] = False
+    max_similarity = similarity[0].copy()
+
+    while len(selected) < max_chunks:
+        eligible &= (max_similarity < max_overlap) & (tokens <= budget)
+        if not eligible.any():
+            break
+        mmr = lambda_mult * relevance - (1 - lambda_mult) * max_similarity
+        mmr[~eligible] = -np.inf
+        pick = int(np.argmax(mmr))
+        selected.append(pick)
+        budget -= tokens[pick]
+        eligible[pick] = False
+        np.maximum(max_similarity, similarity[pick], out=max_similarity)
+
+    return [texts[i] for i in selected]
@@ -0,0 +1,120 @@
+import os
+import json
+import hashlib
+import threading
+
+EXTRACTION_CACHE_DIR = os.getenv("EXTRACTION_CACHE_DIR", os.path.join("storage", "extraction_cache"))
+EXTRACTION_CACHE_MAX_BYTES = int(os.getenv("EXTRACTION_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
+
+def file_sha256(path, block_size=1024 * 1024):
+    """SHA-256 of a file's bytes, read in blocks"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+class ExtractionCache:
+    """Content-addressed on-disk cache of per-page extracted text.
+
+    Entries are keyed by file hash plus extractor version and evicted least
+    recently used first (by mtime, refreshed on every hit) once the cache
+    grows past `max_bytes`.
+    """
+
+    def __init__(self, cache_dir=EXTRACTION_CACHE_DIR, max_bytes=EXTRACTION_CACHE_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._total_bytes = None
+        self.stats = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+
+    def _entry_path(self, file_hash, version):
+        key = f"{file_hash}_v{version}"
+        return os.path.join(self.cache_dir, key[:2], f"{key}.json")
+
+    def get(self, file_hash, version):
+        """Return cached pages or None, refreshing the entry's LRU position on hit"""
+        path = self._entry_path(file_hash, version)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                pages = json.load(f)["pages"]
+            os.utime(path)
+        except FileNotFoundError:
+            with self._lock:
+                self.stats["misses"] += 1
+            return None
+        except Exception as e:
+            print(f"⚠️ Failed to read extraction cache entry {path}: {e}")
+            with self._lock:
+                self.stats["misses"] += 1
+            return None
+
+        with self._lock:
+            self.stats["hits"] += 1
+        return pages
+
+    def put(self, file_hash, version, pages):
+        """Store pages for a file, evicting old entries if over budget"""
+        path = self._entry_path(file_hash, version)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"version": version, "pages": pages}, f)
+            previous = os.path.getsize(path) if os.path.exists(path) else 0
+            os.replace(tmp_path, path)
+            size = os.path.getsize(path)
+        except Exception as e:
+            print(f"⚠️ Failed to write extraction cache entry {path}: {e}")
+            return
+
+        with self._lock:
+            self.stats["stores"] += 1
+            if self._total_bytes is None:
+                self._total_bytes = self._scan_size()
+            else:
+                self._total_bytes += size - previous
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+
+    def get_stats(self):
+        with self._lock:
+            lookups = self.stats["hits"] + self.stats["misses"]
+            return {
+                **self.stats,
+                "hit_rate": self.stats["hits"] / lookups if lookups else 0.0,
+                "total_bytes": self._total_bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+    def _entries(self):
+        for root, _, names in os.walk(self.cache_dir):
+            for name in names:
+                if name.endswith(".json"):
+                    path = os.path.join(root, name)
+                    try:
+                        st = os.stat(path)
+                    except FileNotFoundError:
+                        continue
+                    yield path, st.st_size, st.st_mtime
+
+    def _scan_size(self):
+        return sum(size for _, size, _ in self._entries())
+
+    def _evict(self):
+        """Drop least recently used entries down to 90% of the budget (caller holds the lock)"""
+        target = int(self.max_bytes * 0.9)
+        for path, size, _ in sorted(self._entries(), key=lambda e: e[2]):
+            if self._total_bytes <= target:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            self._total_bytes -= size
+            self.stats["evictions"] += 1
+        print(f"🧹 Extraction cache evicted down to {self._total_bytes} bytes")
+
+
+extraction_cache = ExtractionCache()
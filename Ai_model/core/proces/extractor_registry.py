@@ -0,0 +1,184 @@
+import os
+import time
+import tempfile
+
+TEXT_LAYER = "text_layer"
+OCR = "ocr"
+
+# Backend kinds:
+#   document   - path -> iterator of (page_number, text) for whole files
+#   pdf_text   - path -> list of per-page text-layer strings
+#   pdf_render - (path, first_page, last_page, output_folder, dpi) -> list of image paths
+KINDS = ("document", "pdf_text", "pdf_render")
+
+class ExtractorBackend:
+    """One extraction backend and what it can handle"""
+
+    def __init__(self, name, kind, extensions, func, cost=TEXT_LAYER, streaming=False, priority=0, available=True):
+        self.name = name
+        self.kind = kind
+        self.extensions = {ext.lower() for ext in extensions}
+        self.func = func
+        self.cost = cost
+        self.streaming = streaming
+        self.priority = priority
+        self.available = available
+
+    def to_dict(self):
+        return {
+            "name": self.name,
+            "kind": self.kind,
+            "extensions": sorted(self.extensions),
+            "cost": self.cost,
+            "streaming": self.streaming,
+            "priority": self.priority,
+            "available": self.available,
+        }
+
+class ExtractorRegistry:
+    """Registry of extraction backends, ordered by priority per kind and format.
+
+    `{KIND}_BACKEND` environment variables (e.g. PDF_TEXT_BACKEND=pypdf2)
+    pin a preferred backend; the others remain as per-file fallbacks.
+    """
+
+    def __init__(self):
+        self._backends = []
+
+    def register(self, name, kind, extensions, func, cost=TEXT_LAYER, streaming=False, priority=0, available=True):
+        if kind not in KINDS:
+            raise ValueError(f"Unknown extractor kind: {kind}")
+        backend = ExtractorBackend(name, kind, extensions, func, cost, streaming, priority, available)
+        self._backends = [b for b in self._backends if not (b.name == name and b.kind == kind)]
+        self._backends.append(backend)
+        return backend
+
+    def get_backends(self, kind, extension=None):
+        """Available backends for a kind (and extension), preferred first"""
+        backends = [
+            b for b in self._backends
+            if b.kind == kind and b.available and (extension is None or extension.lower() in b.extensions)
+        ]
+        preferred = os.getenv(f"{kind.upper()}_BACKEND")
+        return sorted(backends, key=lambda b: (b.name != preferred, -b.priority))
+
+    def select(self, kind, extension=None):
+        backends = self.get_backends(kind, extension)
+        return backends[0] if backends else None
+
+    def run(self, kind, *args, extension=None):
+        """Call backends in preference order until one succeeds for this file"""
+        return self.run_with_backend(kind, *args, extension=extension)[1]
+
+    def run_with_backend(self, kind, *args, extension=None):
+        """Like run, but returns (backend, result) so callers know which backend produced the result"""
+        last_error = None
+        for backend in self.get_backends(kind, extension):
+            try:
+                return backend, backend.func(*args)
+            except Exception as e:
+                print(f"⚠️ {kind} backend {backend.name} failed, trying next: {e}")
+                last_error = e
+        raise last_error or RuntimeError(f"No {kind} backend available")
+
+    def supported_extensions(self):
+        return {ext for b in self._backends if b.kind == "document" and b.available for ext in b.extensions}
+
+    def describe(self):
+        return [b.to_dict() for b in self._backends]
+
+
+registry = ExtractorRegistry()
+
+def register_extractor(name, kind, extensions, cost=TEXT_LAYER, streaming=False, priority=0, available=True):
+    """Decorator form of registry.register"""
+    def decorator(func):
+        registry.register(name, kind, extensions, func, cost, streaming, priority, available)
+        return func
+    return decorator
+
+def _time_backend(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    pages = len(list(result)) if result is not None else 0
+    return pages, time.perf_counter() - start
+
+def benchmark_backends(corpus_dir, render_pages=5, dpi=200):
+    """Measure pages/sec for every available backend on each file in a corpus"""
+    results = []
+    for filename in sorted(os.listdir(corpus_dir)):
+        path = os.path.join(corpus_dir, filename)
+        extension = os.path.splitext(filename)[1].lower()
+        if not os.path.isfile(path):
+            continue
+
+        candidates = [(b, (path,)) for b in registry.get_backends("document", extension)]
+        if extension == ".pdf":
+            candidates += [(b, (path,)) for b in registry.get_backends("pdf_text")]
+        for backend, args in candidates:
+            try:
+                pages, elapsed = _time_backend(backend.func, *args)
+            except Exception as e:
+                results.append({"file": filename, "kind": backend.kind, "backend": backend.name, "error": str(e)})
+                continue
+            results.append({
+                "file": filename,
+                "kind": backend.kind,
+                "backend": backend.name,
+                "pages": pages,
+                "seconds": elapsed,
+                "pages_per_sec": pages / elapsed if elapsed else 0.0,
+            })
+
+        if extension == ".pdf":
+            for backend in registry.get_backends("pdf_render"):
+                with tempfile.TemporaryDirectory(prefix="bench_") as tmp_dir:
+                    try:
+                        pages, elapsed = _time_backend(backend.func, path, 1, render_pages, tmp_dir, dpi)
+                    except Exception as e:
+                        results.append({"file": filename, "kind": backend.kind, "backend": backend.name, "error": str(e)})
+                        continue
+                results.append({
+                    "file": filename,
+                    "kind": backend.kind,
+                    "backend": backend.name,
+                    "pages": pages,
+                    "seconds": elapsed,
+                    "pages_per_sec": pages / elapsed if elapsed else 0.0,
+                })
+    return results
+
+def summarize_benchmark(results):
+    """Aggregate benchmark rows into pages/sec per (kind, backend)"""
+    totals = {}
+    for row in results:
+        if "error" in row:
+            continue
+        entry = totals.setdefault((row["kind"], row["backend"]), {"pages": 0, "seconds": 0.0})
+        entry["pages"] += row["pages"]
+        entry["seconds"] += row["seconds"]
+    return {
+        f"{kind}:{backend}": {**entry, "pages_per_sec": entry["pages"] / entry["seconds"] if entry["seconds"] else 0.0}
+        for (kind, backend), entry in totals.items()
+    }
+
+if __name__ == "__main__":
+    import json
+    import argparse
+    from core.proces import file_process  # noqa: F401 - registers the built-in backends
+
+    parser = argparse.ArgumentParser(description="Benchmark extraction backends on a corpus")
+    parser.add_argument("corpus_dir")
+    parser.add_argument("--render-pages", type=int, default=5)
+    parser.add_argument("--json", help="Write raw results to this file")
+    args = parser.parse_args()
+
+    rows = benchmark_backends(args.corpus_dir, render_pages=args.render_pages)
+    for name, entry in sorted(summarize_benchmark(rows).items()):
+        print(f"{name:32s} {entry['pages']:6d} pages {entry['seconds']:8.2f}s {entry['pages_per_sec']:8.1f} pages/s")
+    for row in rows:
+        if "error" in row:
+            print(f"❌ {row['kind']}:{row['backend']} failed on {row['file']}: {row['error']}")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(rows, f, indent=4)
@@ -1,12 +1,26 @@
 import os
 import re
+import queue
+import tempfile
+import threading
 import pytesseract
 import docx
 import docx2txt
-from PyPDF2 import PdfReader
-from PIL import ImageFilter, ImageOps, Image
-from pdf2image import convert_from_path
+from PIL import Image
 from concurrent.futures import ThreadPoolExecutor
+from core.proces.ocr_engine import ocr_engine
+from core.proces.extraction_cache import extraction_cache, file_sha256
+from core.proces.image_preprocess import preprocess_for_ocr
+from core.proces.extractor_registry import registry, TEXT_LAYER, OCR
+from core.proces import pdf_backends  # noqa: F401 - registers PDF text and render backends
+
+# Bump whenever extraction output changes so stale cache entries are ignored
+EXTRACTOR_VERSION = 2
+
+OCR_DPI = int(os.getenv("OCR_DPI", "200"))
+OCR_PAGE_WINDOW = int(os.getenv("OCR_PAGE_WINDOW", str(max(4, ocr_engine.max_workers))))
+EXTRACT_FILE_WORKERS = int(os.getenv("EXTRACT_FILE_WORKERS", "4"))
+PAGE_QUEUE_SIZE = int(os.getenv("PAGE_QUEUE_SIZE", "32"))
 
 def count_words(text):
     """Count words in text"""
@@ -32,10 +46,7 @@ def extract_text_from_docx(path):
     """Extract text from DOCX file"""
     try:
         doc = docx.Document(path)
-        text = ""
-        for paragraph in doc.paragraphs:
-            text += paragraph.text + "\n"
-        return text
+        return "".join(paragraph.text + "\n" for paragraph in doc.paragraphs)
     except Exception as e:
         print(f"❌ DOCX extraction failed for {path}: {e}")
         return ""
@@ -52,73 +63,257 @@ def extract_text_from_doc(path):
         return ""
 
 def preprocess_image(img):
-    """Preprocess image for better OCR"""
-    return ImageOps.autocontrast(ImageOps.grayscale(img).filter(ImageFilter.SHARPEN))
+    """Preprocess image for better OCR; returns None for blank pages"""
+    return preprocess_for_ocr(img)
+
+def ocr_image_file(path):
+    """OCR one image file; runs inside the OCR worker processes"""
+    with Image.open(path) as img:
+        processed = preprocess_image(img)
+    if processed is None:
+        return ""
+    return pytesseract.image_to_string(processed)
+
+def _upload_id(path):
+    """Files of one upload share a folder, which doubles as the OCR fairness key"""
+    return os.path.dirname(os.path.abspath(path))
 
 def extract_text_from_image(path):
     """Extract text from image using OCR"""
     try:
-        img = Image.open(path)
-        processed_img = preprocess_image(img)
-        text = pytesseract.image_to_string(processed_img)
-        return text
+        return ocr_engine.submit(_upload_id(path), ocr_image_file, path).result()
     except Exception as e:
         print(f"❌ Image OCR failed for {path}: {e}")
         return ""
 
+def _ocr_page_windows(page_numbers, window=OCR_PAGE_WINDOW):
+    """Group 1-based page numbers into runs of consecutive pages, at most `window` long"""
+    run = []
+    for page_number in page_numbers:
+        if run and (page_number != run[-1] + 1 or len(run) >= window):
+            yield run
+            run = []
+        run.append(page_number)
+    if run:
+        yield run
+
+def iter_ocr_pdf_pages(path, page_numbers, failed=None):
+    """Rasterize only the given pages through a temp folder, OCR them in the shared pool and yield (page_number, text) in order.
+
+    Pages that fail to rasterize or OCR are yielded as "" and appended to `failed` if given.
+    """
+    upload_id = _upload_id(path)
+    with tempfile.TemporaryDirectory(prefix="ocr_") as tmp_dir:
+        for run in _ocr_page_windows(page_numbers):
+            try:
+                image_paths = registry.run("pdf_render", path, run[0], run[-1], tmp_dir, OCR_DPI)
+            except Exception as e:
+                print(f"❌ Rasterizing pages {run[0]}-{run[-1]} of {path} failed: {e}")
+                if failed is not None:
+                    failed.extend(run)
+                for page_number in run:
+                    yield page_number, ""
+                continue
+            futures = [
+                (page_number, image_path, ocr_engine.submit(upload_id, ocr_image_file, image_path))
+                for page_number, image_path in zip(run, image_paths)
+            ]
+            for page_number, image_path, future in futures:
+                try:
+                    page_text = future.result()
+                except Exception as e:
+                    print(f"❌ OCR failed for page {page_number} of {path}: {e}")
+                    page_text = ""
+                    if failed is not None:
+                        failed.append(page_number)
+                finally:
+                    os.remove(image_path)
+                yield page_number, page_text
+
+def ocr_pdf_pages(path, page_numbers):
+    """OCR the given pages of a PDF and return {page_number: text}"""
+    return dict(iter_ocr_pdf_pages(path, page_numbers))
+
+def iter_pages_from_pdf(path):
+    """Yield (page_number, text) for a PDF, rasterizing only pages without a text layer.
+
+    Returns an extraction report: the text backend that was used and the pages that failed.
+    """
+    text_backend, pages = registry.run_with_backend("pdf_text", path)
+    failed = []
+
+    missing = [i + 1 for i, page_text in enumerate(pages) if not page_text.strip()]
+    if missing:
+        print(f"🖼️ OCR needed for {len(missing)}/{len(pages)} pages of {os.path.basename(path)}")
+
+    next_page = 1
+    for page_number, page_text in iter_ocr_pdf_pages(path, missing, failed):
+        pages[page_number - 1] = page_text
+        while next_page <= page_number:
+            yield next_page, pages[next_page - 1]
+            next_page += 1
+    while next_page <= len(pages):
+        yield next_page, pages[next_page - 1]
+        next_page += 1
+    return {"text_backend": text_backend.name, "failed_pages": failed}
+
+def extract_pages_from_pdf(path):
+    """Extract per-page text from PDF, rasterizing only pages without a text layer"""
+    return [page_text for _, page_text in iter_pages_from_pdf(path)]
+
 def extract_text_from_pdf(path):
     """Extract text from PDF using PyPDF2 and OCR fallback"""
-    text = ""
     try:
-        reader = PdfReader(path)
-        images = convert_from_path(path)
-        for i, page in enumerate(reader.pages):
-            page_text = page.extract_text() or ""
-            if not page_text.strip() and i < len(images):
-                page_text = pytesseract.image_to_string(preprocess_image(images[i]))
-            text += page_text + "\n"
+        return "".join(page_text + "\n" for page_text in extract_pages_from_pdf(path))
     except Exception as e:
         print(f"❌ PDF extraction failed for {path}: {e}")
-    return text
+        return ""
 
-def extract_text_from_file(path):
-    """Extract text from any supported file type"""
+def _single_page(extract):
+    def iter_pages(path):
+        yield 1, extract(path)
+    return iter_pages
+
+registry.register("pdf", "document", [".pdf"], iter_pages_from_pdf, cost=TEXT_LAYER, streaming=True)
+registry.register("txt", "document", [".txt"], _single_page(extract_text_from_txt), cost=TEXT_LAYER)
+registry.register("docx", "document", [".docx"], _single_page(extract_text_from_docx), cost=TEXT_LAYER)
+registry.register("doc", "document", [".doc"], _single_page(extract_text_from_doc), cost=TEXT_LAYER)
+registry.register(
+    "image", "document", [".png", ".jpg", ".jpeg", ".tiff", ".bmp"],
+    _single_page(extract_text_from_image), cost=OCR
+)
+
+def _cache_version(file_ext, text_backend=None):
+    """Extractor version for cache keys, including the PDF text backend whose output differs.
+
+    Without `text_backend`, the preferred backend is assumed.
+    """
+    if file_ext == '.pdf':
+        if text_backend is None:
+            backend = registry.select("pdf_text")
+            text_backend = backend.name if backend else 'none'
+        return f"{EXTRACTOR_VERSION}-{text_backend}"
+    return EXTRACTOR_VERSION
+
+def _iter_pages_uncached(path, file_ext):
+    """Yield (page_number, text); returns the backend's extraction report, or an error if it raised"""
+    backend = registry.select("document", file_ext)
+    try:
+        return (yield from backend.func(path)) or {}
+    except Exception as e:
+        print(f"❌ {backend.name} extraction failed for {path}: {e}")
+        return {"error": str(e)}
+
+def iter_pages_from_file(path):
+    """Yield (page_number, text) for any supported file type, using the extraction cache"""
     file_ext = os.path.splitext(path)[1].lower()
-    
-    extractors = {
-        '.pdf': extract_text_from_pdf,
-        '.txt': extract_text_from_txt,
-        '.docx': extract_text_from_docx,
-        '.doc': extract_text_from_doc,
-        '.png': extract_text_from_image,
-        '.jpg': extract_text_from_image,
-        '.jpeg': extract_text_from_image,
-        '.tiff': extract_text_from_image,
-        '.bmp': extract_text_from_image,
-    }
-    
-    extractor = extractors.get(file_ext)
-    if extractor:
-        print(f"📄 Extracting text from {file_ext} file: {os.path.basename(path)}")
-        return extractor(path)
-    else:
+    if file_ext not in registry.supported_extensions():
         print(f"❌ Unsupported file type: {file_ext}")
-        return ""
+        return
 
-def extract_text_from_all_files(folder):
-    """Extract text from all supported files in folder using ThreadPoolExecutor"""
-    supported_extensions = {'.pdf', '.txt', '.doc', '.docx', '.png', '.jpg', '.jpeg', '.tiff', '.bmp'}
+    file_hash = file_sha256(path)
+    version = _cache_version(file_ext)
+    pages = extraction_cache.get(file_hash, version)
+    if pages is not None:
+        print(f"♻️ Extraction cache hit for {os.path.basename(path)} ({len(pages)} pages)")
+        yield from enumerate(pages, start=1)
+        return
+
+    print(f"📄 Extracting text from {file_ext} file: {os.path.basename(path)}")
+    pages = []
+    extraction = _iter_pages_uncached(path, file_ext)
+    while True:
+        try:
+            page_number, page_text = next(extraction)
+        except StopIteration as done:
+            report = done.value or {}
+            break
+        pages.append(page_text)
+        yield page_number, page_text
+
+    # A failed page may only be a transient OCR or rasterizer error; caching it would lose its text for good
+    if report.get("error") or report.get("failed_pages"):
+        reason = report.get("error") or f"pages {report['failed_pages']} failed"
+        print(f"⚠️ Not caching extraction of {os.path.basename(path)}: {reason}")
+    elif any(page_text.strip() for page_text in pages):
+        extraction_cache.put(file_hash, _cache_version(file_ext, report.get("text_backend")), pages)
+
+def extract_pages_from_file(path):
+    """Extract per-page text from any supported file type, using the extraction cache"""
+    return [page_text for _, page_text in iter_pages_from_file(path)]
+
+def extract_text_from_file(path):
+    """Extract text from any supported file type"""
+    return "\n".join(extract_pages_from_file(path))
+
+def list_supported_files(folder):
+    """List supported files in folder"""
+    supported_extensions = registry.supported_extensions()
     files = []
-    
-    for f in os.listdir(folder):
-        file_ext = '.' + f.split('.')[-1].lower()
+    for f in sorted(os.listdir(folder)):
+        file_ext = os.path.splitext(f)[1].lower()
         if file_ext in supported_extensions:
             files.append(os.path.join(folder, f))
-    
+    return files
+
+def iter_pages_from_files(paths):
+    """Stream (path, page_number, text) from files extracted in parallel.
+
+    Pages arrive in order within a file but files are interleaved. The bounded
+    queue keeps extraction at most PAGE_QUEUE_SIZE pages ahead of the consumer.
+    """
+    paths = list(paths)
+    pages = queue.Queue(maxsize=PAGE_QUEUE_SIZE)
+    stop = threading.Event()
+    file_done = object()
+
+    def put(item):
+        while not stop.is_set():
+            try:
+                pages.put(item, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce(path):
+        try:
+            for page_number, page_text in iter_pages_from_file(path):
+                if not put((path, page_number, page_text)):
+                    return
+        except Exception as e:
+            print(f"❌ Extraction failed for {path}: {e}")
+        finally:
+            put(file_done)
+
+    executor = ThreadPoolExecutor(max_workers=EXTRACT_FILE_WORKERS)
+    try:
+        for path in paths:
+            executor.submit(produce, path)
+        remaining = len(paths)
+        while remaining:
+            item = pages.get()
+            if item is file_done:
+                remaining -= 1
+                continue
+            yield item
+    finally:
+        stop.set()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+def iter_pages_from_all_files(folder):
+    """Stream (path, page_number, text) from all supported files in folder"""
+    files = list_supported_files(folder)
+    print(f"📁 Found {len(files)} supported files to process")
+    return iter_pages_from_files(files)
+
+def extract_text_from_all_files(folder):
+    """Extract text from all supported files in folder using ThreadPoolExecutor"""
+    files = list_supported_files(folder)
     print(f"📁 Found {len(files)} supported files to process")
     
-    with ThreadPoolExecutor(max_workers=4) as executor:
+    with ThreadPoolExecutor(max_workers=EXTRACT_FILE_WORKERS) as executor:
         texts = list(executor.map(extract_text_from_file, files))
     
     combined_text = "\n".join(filter(None, texts))
-    return combined_text
\ No newline at end of file
+    return combined_text
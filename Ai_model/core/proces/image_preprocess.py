@@ -0,0 +1,97 @@
+import os
+import numpy as np
+from PIL import Image, ImageOps
+
+OCR_MAX_SIDE = int(os.getenv("OCR_MAX_SIDE", "2500"))
+OCR_MIN_SIDE = int(os.getenv("OCR_MIN_SIDE", "1000"))
+OCR_BLANK_STD = float(os.getenv("OCR_BLANK_STD", "3.0"))
+OCR_BINARIZE = os.getenv("OCR_BINARIZE", "true").lower() in ("true", "1", "yes", "on")
+
+def to_gray_array(img):
+    """Grayscale as a float32 array using fixed-point ITU-R 601 channel weights"""
+    if img.mode == "L":
+        return np.asarray(img, dtype=np.float32)
+    rgb = np.asarray(img.convert("RGB"), dtype=np.uint32)
+    gray = (rgb[..., 0] * 19595 + rgb[..., 1] * 38470 + rgb[..., 2] * 7471) >> 16
+    return gray.astype(np.float32)
+
+def normalize_resolution(img):
+    """Downscale oversized scans and photos, upscale small ones, so text lands near OCR-friendly size"""
+    width, height = img.size
+    long_side = max(width, height)
+    if long_side > OCR_MAX_SIDE:
+        scale = OCR_MAX_SIDE / long_side
+    elif long_side < OCR_MIN_SIDE:
+        scale = min(2.0, OCR_MIN_SIDE / long_side)
+    else:
+        return img
+
+    size = (max(1, round(width * scale)), max(1, round(height * scale)))
+    return img.resize(size, Image.BILINEAR if scale < 1.0 else Image.LANCZOS)
+
+def draft_jpeg(img):
+    """Have the JPEG decoder produce a grayscale image scaled down toward OCR_MAX_SIDE.
+
+    Must run on the freshly opened image: exif_transpose and load() return or
+    hold decoded pixels, after which draft no longer applies. The decoder only
+    scales by powers of two and never below the requested size, so
+    normalize_resolution still does the final resize.
+    """
+    if img.format != "JPEG":
+        return
+    width, height = img.size
+    long_side = max(width, height)
+    if long_side <= OCR_MAX_SIDE:
+        img.draft("L", img.size)
+        return
+    scale = OCR_MAX_SIDE / long_side
+    img.draft("L", (max(1, round(width * scale)), max(1, round(height * scale))))
+
+def is_blank(gray):
+    """Cheap blank-page check on a strided sample of pixels"""
+    return float(gray[::4, ::4].std()) < OCR_BLANK_STD
+
+def sharpen(gray):
+    """3x3 sharpen (same kernel as PIL's SHARPEN) computed with shifted slices"""
+    padded = np.pad(gray, 1, mode="edge")
+    neighbours = (
+        padded[:-2, :-2] + padded[:-2, 1:-1] + padded[:-2, 2:]
+        + padded[1:-1, :-2] + padded[1:-1, 2:]
+        + padded[2:, :-2] + padded[2:, 1:-1] + padded[2:, 2:]
+    )
+    return np.clip((32.0 * gray - 2.0 * neighbours) / 16.0, 0, 255)
+
+def autocontrast(gray, cutoff=0.01):
+    """Stretch the histogram so the `cutoff` tails map to 0 and 255"""
+    hist = np.bincount(gray.astype(np.uint8).ravel(), minlength=256)
+    cdf = np.cumsum(hist) / gray.size
+    low = int(np.searchsorted(cdf, cutoff))
+    high = int(np.searchsorted(cdf, 1.0 - cutoff))
+    if high <= low:
+        return gray
+    return np.clip((gray - low) * (255.0 / (high - low)), 0, 255)
+
+def otsu_threshold(gray):
+    """Otsu's threshold from the 256-bin histogram, vectorized over all candidate splits"""
+    hist = np.bincount(gray.astype(np.uint8).ravel(), minlength=256).astype(np.float64)
+    levels = np.arange(256)
+    weight_bg = np.cumsum(hist)
+    weight_fg = weight_bg[-1] - weight_bg
+    sum_bg = np.cumsum(hist * levels)
+    mean_bg = sum_bg / np.maximum(weight_bg, 1)
+    mean_fg = (sum_bg[-1] - sum_bg) / np.maximum(weight_fg, 1)
+    between = weight_bg * weight_fg * (mean_bg - mean_fg) ** 2
+    return int(np.argmax(between))
+
+def preprocess_for_ocr(img):
+    """Full OCR preprocessing; returns an 8-bit PIL image, or None for a blank page"""
+    draft_jpeg(img)
+    img = normalize_resolution(ImageOps.exif_transpose(img))
+    gray = to_gray_array(img)
+    if is_blank(gray):
+        return None
+
+    gray = autocontrast(sharpen(gray))
+    if OCR_BINARIZE:
+        gray = np.where(gray > otsu_threshold(gray), 255, 0)
+    return Image.fromarray(gray.astype(np.uint8))
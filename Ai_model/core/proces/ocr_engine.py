@@ -0,0 +1,145 @@
+import os
+import threading
+import multiprocessing
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+OCR_MAX_WORKERS = int(os.getenv("OCR_MAX_WORKERS", str(os.cpu_count() or 1)))
+OCR_MAX_IN_FLIGHT = int(os.getenv("OCR_MAX_IN_FLIGHT", str(OCR_MAX_WORKERS)))
+# Workers must not be forked from the threaded server process: a child can inherit a lock
+# held mid-use by another thread and deadlock. forkserver where available, else spawn
+OCR_START_METHOD = os.getenv(
+    "OCR_START_METHOD", "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+)
+
+class OCREngine:
+    """Shared process pool running page-level OCR work fairly across uploads.
+
+    Work items are queued per upload and handed to the pool round-robin, so a
+    large scan only ever holds one turn in the rotation and cannot starve
+    smaller uploads. At most `max_in_flight` items are inside the pool at once.
+    """
+
+    def __init__(self, max_workers=OCR_MAX_WORKERS, max_in_flight=OCR_MAX_IN_FLIGHT):
+        self.max_workers = max(1, max_workers)
+        self.max_in_flight = max(1, max_in_flight)
+        self._executor = None
+        self._lock = threading.Lock()
+        self._queues = OrderedDict()
+        self._in_flight = 0
+        self.stats = {"submitted": 0, "completed": 0, "failed": 0}
+
+    def submit(self, upload_id, fn, *args):
+        """Queue `fn(*args)` for `upload_id` and return a Future for its result"""
+        future = Future()
+        with self._lock:
+            self._queues.setdefault(upload_id, deque()).append((fn, args, future))
+            self.stats["submitted"] += 1
+        self._dispatch()
+        return future
+
+    def map(self, upload_id, fn, items):
+        """Run `fn` over `items` for one upload and return results in order"""
+        futures = [self.submit(upload_id, fn, item) for item in items]
+        return [future.result() for future in futures]
+
+    def get_stats(self):
+        with self._lock:
+            return {
+                **self.stats,
+                "in_flight": self._in_flight,
+                "queued": sum(len(q) for q in self._queues.values()),
+                "active_uploads": len(self._queues),
+                "max_workers": self.max_workers,
+            }
+
+    def shutdown(self, wait=False):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor:
+            executor.shutdown(wait=wait, cancel_futures=True)
+            print("✅ OCR worker pool shut down")
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers, mp_context=multiprocessing.get_context(OCR_START_METHOD)
+                )
+                print(f"✅ Started OCR worker pool with {self.max_workers} processes ({OCR_START_METHOD})")
+            return self._executor
+
+    def _discard_executor(self, executor):
+        """Drop a broken pool so the next task starts a fresh one, and reap its workers"""
+        with self._lock:
+            if self._executor is not executor:
+                return
+            self._executor = None
+        print("⚠️ OCR worker pool broken, restarting")
+        # Done callbacks of a broken pool run on its manager thread, which holds the lock shutdown() needs
+        threading.Thread(
+            target=executor.shutdown, kwargs={"wait": False, "cancel_futures": True}, daemon=True
+        ).start()
+
+    def _next_task(self):
+        """Pop the next task, rotating across uploads (caller holds the lock)"""
+        while self._queues:
+            upload_id, queue = next(iter(self._queues.items()))
+            self._queues.move_to_end(upload_id)
+            if queue:
+                task = queue.popleft()
+                if not queue:
+                    del self._queues[upload_id]
+                return task
+            del self._queues[upload_id]
+        return None
+
+    def _dispatch(self):
+        tasks = []
+        with self._lock:
+            while self._in_flight < self.max_in_flight:
+                task = self._next_task()
+                if task is None:
+                    break
+                self._in_flight += 1
+                tasks.append(task)
+
+        for fn, args, future in tasks:
+            if not future.set_running_or_notify_cancel():
+                self._task_done()
+                continue
+            executor = self._get_executor()
+            try:
+                pool_future = executor.submit(fn, *args)
+            except BrokenProcessPool as e:
+                self._discard_executor(executor)
+                future.set_exception(e)
+                self._task_done(failed=True)
+                continue
+            except Exception as e:
+                future.set_exception(e)
+                self._task_done(failed=True)
+                continue
+            pool_future.add_done_callback(
+                lambda f, future=future, executor=executor: self._on_done(f, future, executor)
+            )
+
+    def _on_done(self, pool_future, future, executor):
+        try:
+            future.set_result(pool_future.result())
+            self._task_done()
+        except Exception as e:
+            if isinstance(e, BrokenProcessPool):
+                self._discard_executor(executor)
+            future.set_exception(e)
+            self._task_done(failed=True)
+
+    def _task_done(self, failed=False):
+        with self._lock:
+            self._in_flight -= 1
+            self.stats["failed" if failed else "completed"] += 1
+        self._dispatch()
+
+
+ocr_engine = OCREngine()
@@ -0,0 +1,69 @@
+import os
+import threading
+from PyPDF2 import PdfReader
+from pdf2image import convert_from_path
+from core.proces.extractor_registry import register_extractor, TEXT_LAYER, OCR
+
+try:
+    import pypdfium2 as pdfium
+except ImportError:
+    pdfium = None
+
+# PDFium is not thread-safe; extraction threads must take turns
+_pdfium_lock = threading.Lock()
+
+@register_extractor("pypdf2", "pdf_text", [".pdf"], cost=TEXT_LAYER, priority=0)
+def pypdf2_text_pages(path):
+    """Per-page text layer via PyPDF2"""
+    reader = PdfReader(path)
+    return [page.extract_text() or "" for page in reader.pages]
+
+@register_extractor("pdf2image", "pdf_render", [".pdf"], cost=OCR, priority=0)
+def pdf2image_render_pages(path, first_page, last_page, output_folder, dpi):
+    """Render a page range to PNG files via poppler's pdftoppm"""
+    return convert_from_path(
+        path,
+        dpi=dpi,
+        first_page=first_page,
+        last_page=last_page,
+        output_folder=output_folder,
+        fmt="png",
+        paths_only=True,
+    )
+
+@register_extractor("pypdfium2", "pdf_text", [".pdf"], cost=TEXT_LAYER, priority=10, available=pdfium is not None)
+def pdfium_text_pages(path):
+    """Per-page text layer via PDFium, typically several times faster than PyPDF2"""
+    with _pdfium_lock:
+        pdf = pdfium.PdfDocument(path)
+        try:
+            pages = []
+            for page in pdf:
+                text_page = page.get_textpage()
+                pages.append(text_page.get_text_range())
+                text_page.close()
+                page.close()
+            return pages
+        finally:
+            pdf.close()
+
+@register_extractor("pypdfium2", "pdf_render", [".pdf"], cost=OCR, priority=10, available=pdfium is not None)
+def pdfium_render_pages(path, first_page, last_page, output_folder, dpi):
+    """Render a page range to PNG files in-process via PDFium"""
+    paths = []
+    with _pdfium_lock:
+        pdf = pdfium.PdfDocument(path)
+        try:
+            last_page = min(last_page, len(pdf))
+            for index in range(first_page - 1, last_page):
+                page = pdf[index]
+                bitmap = page.render(scale=dpi / 72, grayscale=True)
+                image = bitmap.to_pil()
+                bitmap.close()
+                page.close()
+                image_path = os.path.join(output_folder, f"page_{index + 1:05d}.png")
+                image.save(image_path)
+                paths.append(image_path)
+        finally:
+            pdf.close()
+    return paths
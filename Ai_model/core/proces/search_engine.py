@@ -1,7 +1,28 @@
+import os
 import re
+import base64
+import asyncio
+import heapq
 import hashlib
-from collections import Counter
+import threading
+import numpy as np
+from collections import Counter, OrderedDict
 from utils.redis_config import get_redis
+from utils.ChainManager import get_cached_embeddings, get_pinecone_vector_store
+from utils.pinecone import get_pinecone_index
+from core.utils.hot_index import hot_index_cache, HOT_INDEX_ENABLED
+from core.utils.doc_registry import doc_registry, namespace_for
+from core.utils.lexical_index import lexical_index_store, reciprocal_rank_scores
+from core.proces.context_selector import select_context, CONTEXT_MMR_ENABLED
+from core.utils.hedging import retrieval_executor
+
+QUESTION_EMBEDDING_CACHE_SIZE = int(os.getenv("QUESTION_EMBEDDING_CACHE_SIZE", "2048"))
+QUESTION_EMBEDDING_TTL = int(os.getenv("QUESTION_EMBEDDING_TTL", "86400"))
+HYBRID_SEARCH_ENABLED = os.getenv("HYBRID_SEARCH_ENABLED", "true").lower() == "true"
+# Candidates taken from each of the dense and BM25 rankings before fusion and MMR
+HYBRID_CANDIDATES = int(os.getenv("HYBRID_CANDIDATES", "20"))
+FANOUT_CONCURRENCY = int(os.getenv("FANOUT_CONCURRENCY", "32"))
+FANOUT_NAMESPACE_TIMEOUT = float(os.getenv("FANOUT_NAMESPACE_TIMEOUT", "2.0"))
 
 user_patterns_cache = {}
 
@@ -63,28 +84,304 @@ async def learn_user_patterns(user_id, question, _):
     except Exception as e:
         print(f"⚠️ Error learning user patterns: {e}")
 
-async def optimized_content_search(question, vector_store, top_k=4):
-    """Optimized content search using Pinecone"""
+def normalize_question(question):
+    """Case- and whitespace-insensitive form of a question, ignoring trailing punctuation"""
+    return " ".join(question.lower().split()).rstrip("?!. ")
+
+class QuestionEmbeddingCache:
+    """Normalized question -> query vector, with an in-process LRU in front of Redis.
+
+    Vectors are not tied to a document, so a question asked against one
+    document is served from cache when it is asked against another.
+    """
+
+    def __init__(self, max_size=QUESTION_EMBEDDING_CACHE_SIZE, ttl=QUESTION_EMBEDDING_TTL):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._lru = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"memory_hits": 0, "redis_hits": 0, "misses": 0}
+
+    def _key(self, model_name, question):
+        digest = hashlib.sha256(normalize_question(question).encode("utf-8")).hexdigest()[:32]
+        return f"question_embedding:{model_name}:{digest}"
+
+    def _remember(self, key, vector):
+        with self._lock:
+            self._lru[key] = vector
+            self._lru.move_to_end(key)
+            while len(self._lru) > self.max_size:
+                self._lru.popitem(last=False)
+
+    async def get_embedding(self, question, embeddings):
+        """Return the query vector for a question, embedding it only on a miss in both tiers"""
+        key = self._key(getattr(embeddings, "model_name", "default"), question)
+
+        with self._lock:
+            vector = self._lru.get(key)
+            if vector is not None:
+                self._lru.move_to_end(key)
+                self.stats["memory_hits"] += 1
+                return vector
+
+        try:
+            cached = await get_redis().get(key)
+            if cached:
+                vector = np.frombuffer(base64.b64decode(cached), dtype=np.float32).tolist()
+                self._remember(key, vector)
+                self.stats["redis_hits"] += 1
+                return vector
+        except Exception as e:
+            print(f"⚠️ Failed to read question embedding from Redis: {e}")
+
+        self.stats["misses"] += 1
+        vector = await retrieval_executor.call("embed_query", embeddings.embed_query, normalize_question(question))
+        self._remember(key, vector)
+        try:
+            encoded = base64.b64encode(np.asarray(vector, dtype=np.float32).tobytes()).decode("ascii")
+            await get_redis().setex(key, self.ttl, encoded)
+        except Exception as e:
+            print(f"⚠️ Failed to cache question embedding in Redis: {e}")
+        return vector
+
+    def get_stats(self):
+        with self._lock:
+            return {**self.stats, "size": len(self._lru), "max_size": self.max_size}
+
+
+question_embedding_cache = QuestionEmbeddingCache()
+
+def search_hot_index(doc_id, query_vector, top_k, vectors_by_text=None):
+    """Search the in-process copy of a document's vectors; None if it is not loaded yet.
+
+    Vectors of the hits are added to `vectors_by_text` when it is given.
+    """
+    namespace = namespace_for(doc_id)
+    hot = hot_index_cache.get(namespace)
+    if hot is None:
+        record = doc_registry.get_local(doc_id)
+        hot_index_cache.schedule_load(namespace, expected_count=record.get("chunk_count") if record else None)
+        return None
+    if not len(hot):
+        return None
+    texts = []
+    for row, _ in hot.search(query_vector, top_k):
+        text = hot.texts[row].strip()
+        if text:
+            texts.append(text)
+            if vectors_by_text is not None:
+                vectors_by_text[text] = hot.matrix[row]
+    return texts
+
+def query_dense(doc_id, query_vector, top_k):
+    """Dense top-k of one document as [(text, vector)], with the stored vectors returned by the same query"""
+    response = get_pinecone_index().query(
+        vector=[float(x) for x in query_vector], top_k=top_k, namespace=namespace_for(doc_id),
+        include_values=True, include_metadata=True
+    )
+    hits = []
+    for match in response.matches:
+        text = (match.metadata or {}).get("text", "").strip()
+        if text:
+            hits.append((text, match.values or None))
+    return hits
+
+def fetch_chunk_vectors(doc_id, chunk_ids):
+    """Stored vectors by chunk id, from the hot index when loaded, otherwise with one fetch"""
+    namespace = namespace_for(doc_id)
+    hot = hot_index_cache.get(namespace) if HOT_INDEX_ENABLED else None
+    found = {}
+    if hot is not None:
+        for chunk_id in chunk_ids:
+            row = hot.row_of.get(chunk_id)
+            if row is not None:
+                found[chunk_id] = hot.matrix[row]
+    missing = [chunk_id for chunk_id in chunk_ids if chunk_id not in found]
+    if missing:
+        response = get_pinecone_index().fetch(ids=missing, namespace=namespace)
+        for chunk_id, vector in response.vectors.items():
+            if vector.values:
+                found[chunk_id] = vector.values
+    return found
+
+async def rerank_context(query_vector, candidates, vectors_by_text, top_k, doc_id=None, ids_by_text=None,
+                         scores=None, exempt=()):
+    """MMR-select the context from ranked candidates, or keep their order if some vectors cannot be had.
+
+    Vectors come from the retrieval itself (hot index rows or the dense
+    query's values); BM25-only candidates are fetched by chunk id. Nothing is
+    re-embedded on the question path.
+    """
+    missing = [text for text in candidates if text not in vectors_by_text]
+    chunk_ids = [ids_by_text[text] for text in missing if ids_by_text and text in ids_by_text]
+    if chunk_ids and doc_id is not None:
+        fetched = await retrieval_executor.call("fetch_vectors", fetch_chunk_vectors, doc_id, chunk_ids)
+        for text in missing:
+            vector = fetched.get(ids_by_text.get(text))
+            if vector is not None:
+                vectors_by_text[text] = vector
+    if any(text not in vectors_by_text for text in candidates):
+        print(f"⚠️ Missing vectors for {sum(text not in vectors_by_text for text in candidates)} candidates, using fused order")
+        return candidates[:top_k]
+    selected = select_context(
+        query_vector, candidates, [vectors_by_text[text] for text in candidates], max_chunks=top_k,
+        scores=scores, exempt=[i for i, text in enumerate(candidates) if text in exempt]
+    )
+    print(f"🎯 Selected {len(selected)} of {len(candidates)} candidates for context")
+    return selected
+
+def search_lexical_index(doc_id, question, top_k):
+    """BM25 ranking of a document's chunks as [(chunk_id, text)]; empty if it has no lexical index"""
+    index = lexical_index_store.get(namespace_for(doc_id))
+    if index is None:
+        return []
+    return [
+        (index.chunk_ids[row], index.texts[row].strip())
+        for row, _ in index.search(question, top_k) if index.texts[row].strip()
+    ]
+
+async def optimized_content_search(question, vector_store, top_k=4, doc_id=None):
+    """Hybrid content search: dense (hot index or Pinecone) and BM25 rankings fused with RRF, then MMR-selected"""
     try:
-        print(f"🔍 Searching for: '{question}' in Pinecone")
-        docs = vector_store.similarity_search(question, k=top_k)
-        content = []
-        for doc in docs:
-            if doc.page_content and doc.page_content.strip():
-                content.append(doc.page_content.strip())
-                print(f"📄 Found relevant content: {doc.page_content[:100]}...")
+        print(f"🔍 Searching for: '{question}'")
+        hybrid = doc_id is not None and HYBRID_SEARCH_ENABLED
+        candidates = max(top_k, HYBRID_CANDIDATES) if hybrid or CONTEXT_MMR_ENABLED else top_k
+        query_vector = await question_embedding_cache.get_embedding(question, vector_store.embeddings)
+        vectors_by_text = {}
+        
+        dense = None
+        if doc_id is not None and HOT_INDEX_ENABLED:
+            dense = search_hot_index(doc_id, query_vector, candidates, vectors_by_text)
+            if dense is not None:
+                print(f"✅ Found {len(dense)} relevant documents from the hot index")
+        if dense is None:
+            try:
+                if doc_id is not None:
+                    # Ask for the stored vectors too, so MMR never has to re-embed candidates
+                    hits = await retrieval_executor.call("dense_search", query_dense, doc_id, query_vector, candidates)
+                    dense = [text for text, _ in hits]
+                    vectors_by_text.update((text, vector) for text, vector in hits if vector is not None)
+                else:
+                    results = await retrieval_executor.call(
+                        "dense_search", vector_store.similarity_search_by_vector_with_score, query_vector, k=candidates
+                    )
+                    dense = [doc.page_content.strip() for doc, _ in results if doc.page_content and doc.page_content.strip()]
+            except asyncio.TimeoutError as e:
+                # Past the deadline a second network search would only add latency; answer from BM25 alone
+                if not hybrid:
+                    raise
+                print(f"⏳ {e}, continuing with BM25 results only")
+                dense = []
+            print(f"✅ Found {len(dense)} relevant documents from Pinecone")
+        
+        content = dense
+        fused_scores = None
+        lexical_top = set()
+        ids_by_text = {}
+        if hybrid:
+            lexical_hits = await retrieval_executor.run(search_lexical_index, doc_id, question, candidates)
+            lexical = [text for _, text in lexical_hits]
+            ids_by_text = {text: chunk_id for chunk_id, text in lexical_hits}
+            if lexical:
+                fused = reciprocal_rank_scores([dense, lexical])
+                content = sorted(fused, key=fused.get, reverse=True)
+                fused_scores = fused
+                # Top BM25 hits are kept eligible even when their dense similarity is low (exact ids, codes)
+                lexical_top = set(lexical[:top_k])
+                print(f"🔀 Fused {len(dense)} dense and {len(lexical)} BM25 candidates")
+        
+        content = content[:candidates]
+        if CONTEXT_MMR_ENABLED and len(content) > 1:
+            try:
+                content = await rerank_context(
+                    query_vector, content, vectors_by_text, top_k, doc_id=doc_id, ids_by_text=ids_by_text,
+                    scores=[fused_scores[text] for text in content] if fused_scores else None, exempt=lexical_top
+                )
+            except Exception as e:
+                print(f"⚠️ Context re-ranking failed, using fused order: {e}")
         
-        print(f"✅ Found {len(content)} relevant documents from Pinecone")
+        for text in content[:top_k]:
+            print(f"📄 Found relevant content: {text[:100]}...")
         return content[:top_k]
         
+    except asyncio.TimeoutError as e:
+        print(f"❌ Content search timed out: {e}")
+        return []
     except Exception as e:
         print(f"❌ Error in content search: {e}")
         try:
             print("🔄 Trying alternative search method...")
-            results = vector_store.similarity_search_with_score(question, k=top_k)
+            results = await retrieval_executor.call("text_search", vector_store.similarity_search_with_score, question, k=top_k)
             content = [doc.page_content.strip() for doc, score in results if doc.page_content.strip()]
             print(f"✅ Alternative search found {len(content)} documents")
             return content[:top_k]
         except Exception as e2:
             print(f"❌ Alternative search also failed: {e2}")
-            return []
\ No newline at end of file
+            return []
+
+async def _search_namespace(doc_id, query_vector, top_k, embeddings):
+    """Dense top-k for one document as [(text, score, metadata)], from the hot index when loaded"""
+    namespace = namespace_for(doc_id)
+    hot = hot_index_cache.get(namespace) if HOT_INDEX_ENABLED else None
+    if hot is not None and len(hot):
+        return [(hot.texts[row], score, hot.metadatas[row]) for row, score in hot.search(query_vector, top_k)]
+    if HOT_INDEX_ENABLED:
+        record = doc_registry.get_local(doc_id)
+        hot_index_cache.schedule_load(namespace, expected_count=record.get("chunk_count") if record else None)
+    vector_store = await get_pinecone_vector_store(doc_id, embeddings)
+    results = await retrieval_executor.call(
+        "namespace_search", vector_store.similarity_search_by_vector_with_score, query_vector,
+        k=top_k, deadline=FANOUT_NAMESPACE_TIMEOUT
+    )
+    return [(doc.page_content, score, doc.metadata) for doc, score in results]
+
+async def search_user_documents(user_id, question, top_k=4):
+    """Search all of a user's ready documents concurrently and merge the hits into a global top-k.
+
+    Only doc_ids registered to the user are queried. At most
+    FANOUT_CONCURRENCY namespaces are searched at once and each gets
+    FANOUT_NAMESPACE_TIMEOUT seconds; slow or failing ones are left out.
+    Hits are ranked by their cosine similarity to the question.
+    """
+    # Documents uploaded before the registry existed are only in the user's upload folder
+    await doc_registry.backfill_user(user_id)
+    doc_ids = await doc_registry.list_user_docs(user_id)
+    records = await asyncio.gather(*(doc_registry.get(doc_id) for doc_id in doc_ids))
+    ready = [(doc_id, record) for doc_id, record in zip(doc_ids, records) if record and record.get("chunk_count")]
+    if not ready:
+        print(f"⚠️ No indexed documents for user {user_id}")
+        return []
+    
+    embeddings = await get_cached_embeddings()
+    query_vector = await question_embedding_cache.get_embedding(question, embeddings)
+    slots = asyncio.Semaphore(FANOUT_CONCURRENCY)
+    
+    async def search_one(doc_id, record):
+        async with slots:
+            try:
+                hits = await asyncio.wait_for(
+                    _search_namespace(doc_id, query_vector, top_k, embeddings), FANOUT_NAMESPACE_TIMEOUT
+                )
+            except asyncio.TimeoutError:
+                print(f"⏳ Search of doc_id {doc_id} exceeded {FANOUT_NAMESPACE_TIMEOUT}s, skipping it")
+                return []
+            except Exception as e:
+                print(f"⚠️ Search of doc_id {doc_id} failed: {e}")
+                return []
+        return [
+            {
+                "doc_id": doc_id,
+                "doc_name": record.get("doc_name"),
+                "text": text.strip(),
+                "score": float(score),
+                "source": metadata.get("source"),
+                "page_start": metadata.get("page_start"),
+                "page_end": metadata.get("page_end"),
+            }
+            for text, score, metadata in hits if text and text.strip()
+        ]
+    
+    results = await asyncio.gather(*(search_one(doc_id, record) for doc_id, record in ready))
+    hits = heapq.nlargest(top_k, (hit for doc_hits in results for hit in doc_hits), key=lambda hit: hit["score"])
+    print(f"✅ Found {len(hits)} relevant chunks across {len(ready)} documents")
+    return hits
@@ -0,0 +1,145 @@
+import re
+from bisect import bisect_right
+
+_WHITESPACE = re.compile(r"\s+")
+
+class Chunk:
+    """A chunk of source text with its file/page provenance and character offsets"""
+
+    __slots__ = ("text", "source", "page_start", "page_end", "start", "end")
+
+    def __init__(self, text, source, page_start, page_end, start, end):
+        self.text = text
+        self.source = source
+        self.page_start = page_start
+        self.page_end = page_end
+        self.start = start
+        self.end = end
+
+    def __repr__(self):
+        return f"Chunk(source={self.source!r}, pages={self.page_start}-{self.page_end}, span={self.start}:{self.end})"
+
+class _SourceBuffer:
+    """Unchunked tail of one source; `base` is the offset of text[0] within the whole source"""
+
+    __slots__ = ("text", "base", "pos", "page_offsets", "page_numbers")
+
+    def __init__(self):
+        self.text = ""
+        self.base = 0
+        self.pos = 0
+        self.page_offsets = []
+        self.page_numbers = []
+
+class OffsetChunker:
+    """Fixed-size overlapping chunker that works on (start, end) offsets.
+
+    Chunk boundaries are chosen by searching backwards from start + chunk_size
+    for the coarsest separator available (paragraph, line, then word), the same
+    preference order the old recursive splitter used, but without building
+    intermediate split lists. Only the final chunk text is sliced out. Pages
+    can be fed incrementally per source, and each chunk records which source
+    and pages it came from.
+    """
+
+    def __init__(self, chunk_size=1000, chunk_overlap=200, separators=("\n\n", "\n", " ")):
+        if chunk_overlap >= chunk_size:
+            raise ValueError("chunk_overlap must be smaller than chunk_size")
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self.separators = separators
+        self._min_cut = chunk_size // 4
+
+    def split(self, text, source=None, page=None):
+        """Chunk a complete text in one go"""
+        buffer = _SourceBuffer()
+        self._append(buffer, text, page)
+        return list(self._cut(buffer, source, final=True))
+
+    def iter_chunks(self, pages):
+        """Chunk streamed (source, page_number, text) items; chunks never span sources"""
+        buffers = {}
+        for source, page_number, page_text in pages:
+            buffer = buffers.get(source)
+            if buffer is None:
+                buffer = buffers[source] = _SourceBuffer()
+            self._append(buffer, page_text + "\n", page_number)
+            yield from self._cut(buffer, source, final=False)
+
+        for source, buffer in buffers.items():
+            yield from self._cut(buffer, source, final=True)
+
+    def _append(self, buffer, text, page_number):
+        buffer.page_offsets.append(buffer.base + len(buffer.text))
+        buffer.page_numbers.append(page_number)
+        buffer.text += text
+
+    def _page_at(self, buffer, offset):
+        offsets = buffer.page_offsets
+        if len(offsets) == 1:
+            return buffer.page_numbers[0]
+        return buffer.page_numbers[max(0, bisect_right(offsets, offset) - 1)]
+
+    def _cut(self, buffer, source, final):
+        text = buffer.text
+        length = len(text)
+        pos = buffer.pos
+        base = buffer.base
+        chunk_size = self.chunk_size
+        overlap = self.chunk_overlap
+        min_cut = self._min_cut
+        separators = self.separators
+
+        while True:
+            if pos < length and text[pos].isspace():
+                pos = _WHITESPACE.match(text, pos).end()
+            if pos >= length:
+                break
+            if length - pos <= chunk_size:
+                if not final:
+                    break
+                end = length
+            else:
+                # Cut at the last paragraph, line or word break that leaves a reasonably sized chunk
+                end = pos + chunk_size
+                cut_separator = None
+                for separator in separators:
+                    index = text.rfind(separator, pos + min_cut, end)
+                    if index != -1:
+                        end = index
+                        cut_separator = separator
+                        break
+
+            stripped_end = end
+            while text[stripped_end - 1].isspace():
+                stripped_end -= 1
+            start = base + pos
+            stop = base + stripped_end
+            yield Chunk(
+                text[pos:stripped_end],
+                source,
+                self._page_at(buffer, start),
+                self._page_at(buffer, stop - 1),
+                start,
+                stop,
+            )
+
+            if end >= length:
+                pos = length
+                break
+            # Overlap only whole units of the separator the chunk was cut at, so
+            # a paragraph boundary is not re-embedded as a sliver of the next chunk
+            if cut_separator is None:
+                pos = max(pos + 1, end - overlap)
+            else:
+                index = text.find(cut_separator, max(pos + 1, end - overlap), end)
+                pos = end if index == -1 else index + len(cut_separator)
+
+        # Drop the consumed prefix so buffers stay around one chunk long
+        if pos > 0:
+            buffer.base += pos
+            buffer.text = text[pos:]
+            buffer.pos = 0
+            first_page = max(0, bisect_right(buffer.page_offsets, buffer.base) - 1)
+            del buffer.page_offsets[:first_page]
+            del buffer.page_numbers[:first_page]
@@ -0,0 +1,121 @@
+import os
+import hashlib
+import numpy as np
+
+DEDUP_ENABLED = os.getenv("DEDUP_ENABLED", "true").lower() == "true"
+DEDUP_THRESHOLD = float(os.getenv("DEDUP_THRESHOLD", "0.9"))
+DEDUP_SHINGLE_SIZE = int(os.getenv("DEDUP_SHINGLE_SIZE", "5"))
+DEDUP_NUM_PERM = int(os.getenv("DEDUP_NUM_PERM", "128"))
+
+_SHINGLE_BASE = np.uint64(1099511628211)
+
+def _lsh_bands(num_perm, threshold):
+    """Pick (bands, rows) so the LSH candidate curve rises just below the threshold"""
+    best = None
+    for rows in range(1, num_perm + 1):
+        if num_perm % rows:
+            continue
+        bands = num_perm // rows
+        knee = (1 / bands) ** (1 / rows)
+        # Prefer a knee slightly under the threshold so near-duplicates become candidates
+        score = abs(knee - (threshold - 0.1))
+        if best is None or score < best[0]:
+            best = (score, bands, rows)
+    return best[1], best[2]
+
+class ChunkDeduplicator:
+    """Drops exact and near-duplicate chunks within one ingestion run.
+
+    Exact duplicates are caught by hashing whitespace/case-normalized text.
+    Near duplicates use MinHash signatures over word shingles, bucketed with
+    LSH; candidates are kept only if their estimated Jaccard similarity
+    reaches `threshold`.
+    """
+
+    def __init__(self, threshold=DEDUP_THRESHOLD, shingle_size=DEDUP_SHINGLE_SIZE, num_perm=DEDUP_NUM_PERM, seed=1):
+        self.threshold = threshold
+        self.shingle_size = shingle_size
+        self.num_perm = num_perm
+        self.bands, self.rows = _lsh_bands(num_perm, threshold)
+
+        rng = np.random.default_rng(seed)
+        self._a = (rng.integers(1, 2**63, size=num_perm, dtype=np.uint64) | np.uint64(1))[:, None]
+        self._b = rng.integers(0, 2**63, size=num_perm, dtype=np.uint64)[:, None]
+
+        self._exact = set()
+        self._buckets = [{} for _ in range(self.bands)]
+        self._signatures = []
+        self.exact_dropped = 0
+        self.near_dropped = 0
+        self.kept = 0
+
+    def _signature(self, words):
+        # Python's str hash is cached per object and stable within the process, which is
+        # all a per-run deduplicator needs; shingle hashes combine consecutive word hashes
+        word_hashes = np.fromiter(map(hash, words), dtype=np.int64, count=len(words)).view(np.uint64)
+        count = len(words) - self.shingle_size + 1
+        with np.errstate(over="ignore"):
+            shingles = word_hashes[:count].copy()
+            for offset in range(1, self.shingle_size):
+                shingles = shingles * _SHINGLE_BASE + word_hashes[offset:offset + count]
+            shingles = np.unique(shingles)
+            # (a * x + b) mod 2**64 per permutation; uint64 arithmetic wraps, which is the mod we want
+            permuted = np.multiply(self._a, shingles)
+            permuted += self._b
+        return permuted.min(axis=1)
+
+    def is_duplicate(self, text):
+        """Return True if text duplicates a chunk already seen; otherwise remember it"""
+        words = text.lower().split()
+        digest = hashlib.blake2b(" ".join(words).encode("utf-8"), digest_size=16).digest()
+        if digest in self._exact:
+            self.exact_dropped += 1
+            return True
+        self._exact.add(digest)
+
+        # Too short to shingle meaningfully; exact matching only
+        if len(words) < self.shingle_size * 2:
+            self.kept += 1
+            return False
+
+        signature = self._signature(words)
+        band_keys = [
+            signature[band * self.rows:(band + 1) * self.rows].tobytes()
+            for band in range(self.bands)
+        ]
+
+        candidates = set()
+        for bucket, key in zip(self._buckets, band_keys):
+            candidates.update(bucket.get(key, ()))
+        for index in candidates:
+            if np.count_nonzero(self._signatures[index] == signature) / self.num_perm >= self.threshold:
+                self.near_dropped += 1
+                return True
+
+        index = len(self._signatures)
+        self._signatures.append(signature)
+        for bucket, key in zip(self._buckets, band_keys):
+            bucket.setdefault(key, []).append(index)
+        self.kept += 1
+        return False
+
+    @property
+    def dropped(self):
+        return self.exact_dropped + self.near_dropped
+
+    def get_stats(self):
+        return {
+            "kept": self.kept,
+            "exact_dropped": self.exact_dropped,
+            "near_dropped": self.near_dropped,
+            "threshold": self.threshold,
+        }
+
+def iter_unique_chunks(chunks, deduplicator=None):
+    """Filter a chunk stream through a deduplicator; pass-through when dedup is disabled"""
+    if deduplicator is None:
+        yield from chunks
+        return
+    for chunk in chunks:
+        if not deduplicator.is_duplicate(chunk.text):
+            yield chunk
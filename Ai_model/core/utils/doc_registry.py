@@ -0,0 +1,177 @@
+import os
+import json
+import time
+from redis.exceptions import WatchError
+from utils.redis_config import get_redis
+from utils.pinecone import get_pinecone_index
+from core.utils.executors import run_ingest
+
+REGISTRY_MIRROR_TTL = float(os.getenv("REGISTRY_MIRROR_TTL", "30"))
+UPLOADS_DIR = os.path.join("storage", "uploads")
+
+def namespace_for(doc_id):
+    return f"doc_{doc_id}"
+
+class DocRegistry:
+    """Per-document index metadata in Redis, mirrored in process.
+
+    Each record holds the Pinecone namespace, chunk count, embedding model,
+    ingest version, status and file manifest for one doc_id. Reads are
+    served from the local mirror while it is fresher than `mirror_ttl`
+    seconds, so existence/readiness/size checks do not touch the network.
+    Writes re-read the record from Redis inside a WATCH transaction, so
+    concurrent ingests of one doc never overwrite each other's changes with
+    a stale mirror copy.
+    """
+
+    def __init__(self, mirror_ttl=REGISTRY_MIRROR_TTL):
+        self.mirror_ttl = mirror_ttl
+        self._mirror = {}
+        self._backfilled = set()
+
+    def _key(self, doc_id):
+        return f"doc_registry:{doc_id}"
+
+    def get_local(self, doc_id):
+        """Mirror-only lookup; None if the doc is unknown or the entry is stale"""
+        entry = self._mirror.get(doc_id)
+        if entry and time.monotonic() - entry[0] < self.mirror_ttl:
+            return entry[1]
+        return None
+
+    async def get(self, doc_id):
+        record = self.get_local(doc_id)
+        if record is not None:
+            return record
+        try:
+            data = await get_redis().get(self._key(doc_id))
+        except Exception as e:
+            print(f"⚠️ Failed to read doc registry for {doc_id}: {e}")
+            entry = self._mirror.get(doc_id)
+            return entry[1] if entry else None
+        record = json.loads(data) if data else None
+        if record is not None:
+            self._mirror[doc_id] = (time.monotonic(), record)
+        return record
+
+    def _new_record(self, doc_id):
+        return {
+            "doc_id": str(doc_id),
+            "namespace": namespace_for(doc_id),
+            "chunk_count": 0,
+            "files": {},
+            "created_at": time.time(),
+        }
+
+    async def _modify(self, doc_id, change):
+        """Apply change(record) to the doc's current record and persist it atomically"""
+        key = self._key(doc_id)
+        try:
+            async with get_redis().pipeline() as pipe:
+                while True:
+                    try:
+                        await pipe.watch(key)
+                        data = await pipe.get(key)
+                        record = json.loads(data) if data else self._new_record(doc_id)
+                        change(record)
+                        record["updated_at"] = time.time()
+                        pipe.multi()
+                        pipe.set(key, json.dumps(record))
+                        if record.get("user_id"):
+                            pipe.sadd(f"user_docs:{record['user_id']}", record["doc_id"])
+                        await pipe.execute()
+                        break
+                    except WatchError:
+                        # Another worker wrote the record first; apply the change to its version
+                        continue
+        except Exception as e:
+            print(f"⚠️ Failed to write doc registry for {doc_id}: {e}")
+            entry = self._mirror.get(doc_id)
+            record = dict(entry[1]) if entry else self._new_record(doc_id)
+            change(record)
+            record["updated_at"] = time.time()
+        self._mirror[doc_id] = (time.monotonic(), record)
+        return record
+
+    async def update(self, doc_id, **fields):
+        """Merge fields into a doc's record and persist it"""
+        return await self._modify(doc_id, lambda record: record.update(fields))
+
+    async def record_ingest(self, doc_id, user_id, chunks_added, embedding_model, ingest_version, files):
+        """Mark a doc ready after an ingest added chunks and files"""
+        def change(record):
+            record.update(
+                user_id=str(user_id),
+                status="ready",
+                chunk_count=record.get("chunk_count", 0) + chunks_added,
+                embedding_model=embedding_model,
+                ingest_version=ingest_version,
+                files={**record.get("files", {}), **files},
+            )
+        return await self._modify(doc_id, change)
+
+    async def exists(self, doc_id):
+        return await self.get(doc_id) is not None
+
+    async def is_ready(self, doc_id):
+        record = await self.get(doc_id)
+        return bool(record and record.get("chunk_count"))
+
+    async def backfill_user(self, user_id):
+        """Register a user's documents ingested before the registry existed; returns how many were added.
+
+        Runs once per user: their upload folders give the doc_ids, and the
+        index's namespace stats give each document's vector count. The result
+        is remembered in Redis so later calls return immediately, but only
+        while the user's doc set is there too; if that set is lost, the
+        backfill runs again and rebuilds it.
+        """
+        user_id = str(user_id)
+        marker = f"user_docs_backfilled:{user_id}"
+        if user_id in self._backfilled:
+            return 0
+        try:
+            if await get_redis().exists(marker, f"user_docs:{user_id}") == 2:
+                self._backfilled.add(user_id)
+                return 0
+        except Exception as e:
+            print(f"⚠️ Failed to check registry backfill for user {user_id}: {e}")
+
+        folder = os.path.join(UPLOADS_DIR, user_id)
+        doc_ids = await run_ingest(lambda: sorted(os.listdir(folder)) if os.path.isdir(folder) else [])
+        unregistered = [doc_id for doc_id in doc_ids if not await self.exists(doc_id)]
+        added = 0
+        if unregistered:
+            stats = await run_ingest(get_pinecone_index().describe_index_stats)
+            namespaces = stats.get("namespaces", {}) if isinstance(stats, dict) else stats.namespaces
+            for doc_id in unregistered:
+                summary = namespaces.get(namespace_for(doc_id))
+                if summary is None:
+                    continue
+                count = summary.get("vector_count", 0) if isinstance(summary, dict) else summary.vector_count
+                if count:
+                    await self.update(doc_id, user_id=user_id, status="ready", chunk_count=count, backfilled=True)
+                    added += 1
+
+        self._backfilled.add(user_id)
+        try:
+            await get_redis().set(marker, str(time.time()))
+        except Exception as e:
+            print(f"⚠️ Failed to record registry backfill for user {user_id}: {e}")
+        if added:
+            print(f"📝 Backfilled {added} pre-registry documents for user {user_id}")
+        return added
+
+    async def list_user_docs(self, user_id):
+        """doc_ids registered for a user"""
+        try:
+            return sorted(await get_redis().smembers(f"user_docs:{user_id}"))
+        except Exception as e:
+            print(f"⚠️ Failed to list docs for user {user_id}: {e}")
+            return sorted(
+                doc_id for doc_id, (_, record) in self._mirror.items()
+                if record.get("user_id") == str(user_id)
+            )
+
+
+doc_registry = DocRegistry()
@@ -1,24 +1,149 @@
+import os
 import time
-import uuid
-from langchain.text_splitter import RecursiveCharacterTextSplitter
+import json
+import hashlib
+import threading
+from contextlib import aclosing
+from datetime import datetime, timezone
 from utils.redis_config import get_redis
 from utils.pinecone import get_pinecone_index
 from utils.file_utils import save_files
-from utils.ChainManager import get_cached_embeddings, get_pinecone_vector_store
+from utils.ChainManager import get_cached_embeddings, get_pinecone_vector_store, EMBEDDING_MODEL
 from services.grpc_func import ServiceClient
-from core import extract_text_from_all_files, count_words
+from core import iter_pages_from_files, count_words
+from core.proces.extraction_cache import file_sha256
+from core.utils.chunker import OffsetChunker
+from core.utils.dedup import ChunkDeduplicator, iter_unique_chunks, DEDUP_ENABLED
+from core.utils.vector_upserter import AsyncUpserter, UPSERT_BATCH_SIZE
+from core.utils.executors import run_ingest, iterate_in_thread
+from core.utils.doc_registry import doc_registry, namespace_for
+from core.utils.hot_index import hot_index_cache
+from core.utils.lexical_index import lexical_index_store
 
 client = ServiceClient()
 
+CHUNK_SIZE = 1000
+CHUNK_OVERLAP = 200
+MIN_WORDS = 20
+EMBED_BATCH_SIZE = int(os.getenv("EMBED_BATCH_SIZE", "256"))
+MANIFEST_FILE = ".manifest.json"
+# Bump when chunking or embedding changes in a way that makes older vectors incomparable
+INGEST_VERSION = 3
+# Pinecone accepts at most 1000 ids per delete or fetch request
+DELETE_BATCH_SIZE = 1000
+FETCH_BATCH_SIZE = 1000
+
+chunker = OffsetChunker(chunk_size=CHUNK_SIZE, chunk_overlap=CHUNK_OVERLAP)
+
 def get_text_chunks(text):
     """Split text into chunks for vector storage"""
-    splitter = RecursiveCharacterTextSplitter(
-        chunk_size=1000, 
-        chunk_overlap=200,
-        length_function=len,
-        separators=["\n\n", "\n", " ", ""]
-    )
-    return splitter.split_text(text)
+    return [chunk.text for chunk in chunker.split(text)]
+
+def iter_text_chunks(pages):
+    """Incrementally chunk streamed (path, page_number, text) pages into Chunk objects.
+
+    Each file keeps its own buffer of roughly one chunk, and every chunk
+    records the file and page range it came from.
+    """
+    return chunker.iter_chunks(pages)
+
+class PageStats:
+    """Counts pages and words as they stream past and holds their text until drained"""
+
+    def __init__(self):
+        self.pages = 0
+        self.words = 0
+        self._pending = []
+        self._lock = threading.Lock()
+
+    def tap(self, pages):
+        for item in pages:
+            page_text = item[2]
+            with self._lock:
+                self.pages += 1
+                self.words += count_words(page_text)
+                self._pending.append(page_text)
+            yield item
+
+    def drain_text(self):
+        with self._lock:
+            text = "\n".join(self._pending)
+            self._pending = []
+        return text
+
+def chunk_vector_id(doc_id, source, text, ordinal):
+    """Deterministic vector id for a chunk.
+
+    The id is derived from the file name and chunk text, so re-ingesting the
+    same content overwrites the same vectors. `ordinal` numbers repeats of
+    identical text within one file; it is not the chunk's position, so an
+    edit early in a file does not change the ids of every chunk after it.
+    """
+    name_hash = hashlib.sha256(os.path.basename(source).encode("utf-8")).hexdigest()[:8]
+    text_hash = hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
+    return f"{doc_id}_{name_hash}_{text_hash}_{ordinal}"
+
+async def update_vector_metadata(index, namespace, metadata_by_id, text_key="text"):
+    """Replace the metadata of existing vectors, keeping their values and text; returns how many were updated.
+
+    Vectors are fetched and upserted back in batches, so nothing is re-embedded.
+    """
+    ids = list(metadata_by_id)
+    updated = 0
+    for start in range(0, len(ids), FETCH_BATCH_SIZE):
+        response = await run_ingest(index.fetch, ids=ids[start:start + FETCH_BATCH_SIZE], namespace=namespace)
+        vectors = [
+            {
+                "id": vector_id,
+                "values": list(vector.values),
+                "metadata": {**metadata_by_id[vector_id], text_key: (vector.metadata or {}).get(text_key, "")},
+            }
+            for vector_id, vector in response.vectors.items()
+        ]
+        for batch_start in range(0, len(vectors), UPSERT_BATCH_SIZE):
+            await run_ingest(index.upsert, vectors=vectors[batch_start:batch_start + UPSERT_BATCH_SIZE], namespace=namespace)
+        updated += len(vectors)
+    return updated
+
+async def delete_vectors(index, namespace, ids):
+    """Delete vectors by id in batches; returns how many were deleted"""
+    ids = list(ids)
+    for start in range(0, len(ids), DELETE_BATCH_SIZE):
+        await run_ingest(index.delete, ids=ids[start:start + DELETE_BATCH_SIZE], namespace=namespace)
+    return len(ids)
+
+def load_manifest(folder):
+    """Load the manifest of files already ingested for a document folder"""
+    path = os.path.join(folder, MANIFEST_FILE)
+    if not os.path.exists(path):
+        return {"files": {}}
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except Exception as e:
+        print(f"⚠️ Failed to read manifest {path}: {e}")
+        return {"files": {}}
+
+def save_manifest(folder, manifest):
+    """Atomically write the ingestion manifest for a document folder"""
+    path = os.path.join(folder, MANIFEST_FILE)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(manifest, f, indent=4)
+    os.replace(tmp_path, path)
+
+def find_new_files(folder, filenames, manifest):
+    """Hash uploaded files and return {path: sha256} for content not yet ingested"""
+    known_hashes = {entry["sha256"] for entry in manifest["files"].values()}
+    new_files = {}
+    for filename in filenames:
+        path = os.path.join(folder, filename)
+        file_hash = file_sha256(path)
+        if file_hash in known_hashes or file_hash in new_files.values():
+            print(f"⏭️ Skipping already ingested file: {filename}")
+            continue
+        new_files[path] = file_hash
+    return new_files
 
 async def cache_document_content(doc_id, content):
     """Cache document content in Redis"""
@@ -29,6 +154,16 @@ async def cache_document_content(doc_id, content):
     except Exception as e:
         print(f"⚠️ Failed to cache document content: {e}")
 
+async def append_document_content(doc_id, content):
+    """Append streamed document content to the Redis copy"""
+    try:
+        redis_client = get_redis()
+        key = f"document_content:{doc_id}"
+        await redis_client.append(key, content)
+        await redis_client.expire(key, 7200)
+    except Exception as e:
+        print(f"⚠️ Failed to append document content: {e}")
+
 async def get_cached_document_content(doc_id):
     """Get cached document content from Redis"""
     try:
@@ -41,13 +176,8 @@ async def get_cached_document_content(doc_id):
         print(f"⚠️ Failed to get cached document content: {e}")
         return None
 
-async def process_files(user_id, doc_id, files, name):
-    """Process multiple file types and store in Pinecone"""
-    start_time = time.time()
-    
-    if not name or name.strip() == "":
-        name = "Untitled Document"
-    
+async def ensure_chat(user_id, doc_id, name):
+    """Make sure a chat exists for the document; returns an error dict if the chat service is down"""
     try:
         chat = await client.get_chat(doc_id)
         if not chat:
@@ -67,103 +197,298 @@ async def process_files(user_id, doc_id, files, name):
     except Exception as e:
         print(f"⚠️ Chat service unavailable: {e}")
         print("📝 Proceeding with file processing without chat creation")
+    return None
+
+async def process_files(user_id, doc_id, files, name):
+    """Process multiple file types and store in Pinecone"""
+    if not name or name.strip() == "":
+        name = "Untitled Document"
+    
+    error = await ensure_chat(user_id, doc_id, name)
+    if error:
+        return error
+    
+    try:
+        folder = await run_ingest(save_files, user_id, doc_id, files)
+    except Exception as e:
+        print(f"❌ Error saving files: {e}")
+        return {
+            "error": f"Failed to process files: {str(e)}"
+        }
+    
+    return await ingest_files(user_id, doc_id, folder, [f.filename for f in files], name)
+
+async def ingest_files(user_id, doc_id, folder, filenames, name, progress=None):
+    """Extract, chunk and embed saved upload files into Pinecone.
+
+    `progress`, if given, is an async callable receiving keyword updates
+    (stage, pages_done, chunks_embedded) as ingestion advances.
+    """
+    result = None
+    try:
+        result = await _ingest_files(user_id, doc_id, folder, filenames, name, progress)
+        return result
+    finally:
+        # Also runs when the job is cancelled, so the registry never stays "ingesting"
+        if result is None or result.get("error"):
+            hot_index_cache.invalidate(namespace_for(doc_id))
+            try:
+                record = await doc_registry.get(doc_id)
+                if record and record.get("status") == "ingesting":
+                    await doc_registry.update(doc_id, status="ready" if record.get("chunk_count") else "failed")
+            except Exception as e:
+                print(f"⚠️ Failed to finalize registry status for doc_id: {doc_id}: {e}")
+
+async def _ingest_files(user_id, doc_id, folder, filenames, name, progress):
+    start_time = time.time()
+    
+    async def report(**fields):
+        if progress:
+            try:
+                await progress(**fields)
+            except Exception as e:
+                print(f"⚠️ Failed to report ingestion progress: {e}")
     
+    upserter = None
     try:
-        folder = save_files(user_id, doc_id, files)
-        full_text = extract_text_from_all_files(folder)
+        manifest = load_manifest(folder)
+        is_new_document = not manifest["files"]
+        await report(stage="hashing")
+        new_files = await run_ingest(find_new_files, folder, filenames, manifest)
         
-        if not full_text.strip():
-            print(f"❌ No text extracted from {len(files)} files")
-            for file in files:
-                print(f"📄 File: {file.filename}, Size: {file.size if hasattr(file, 'size') else 'unknown'}")
-            
+        if not new_files:
+            print(f"✅ All {len(filenames)} files already ingested for doc_id: {doc_id}")
             return {
-                "error": "No text could be extracted from the uploaded files. Please ensure your files contain readable text or try uploading different file formats (PDF, TXT, DOC, DOCX, or images with text)."
+                "success": True,
+                "total_words": 0,
+                "chunks_created": 0,
+                "chunks_unchanged": 0,
+                "chunks_relocated": 0,
+                "chunks_deleted": 0,
+                "chunks_deduplicated": 0,
+                "files_processed": 0,
+                "files_skipped": len(filenames)
             }
         
-        word_count = count_words(full_text)
-        print(f"📊 Extracted {word_count} words from {len(files)} files")
+        embeddings = await get_cached_embeddings()
+        index = get_pinecone_index()
+        namespace = namespace_for(doc_id)
         
-        if word_count < 20:
-            return {
-                "error": f"The extracted text contains only {word_count} words. A minimum of 20 words is required for processing. Please upload files with more text content."
-            }
+        registered = await doc_registry.get(doc_id)
+        if registered and registered.get("chunk_count"):
+            print(f"📝 Adding to existing document collection in Pinecone ({registered['chunk_count']} chunks)")
+        else:
+            print(f"📝 Creating new document collection in Pinecone")
+        await doc_registry.update(doc_id, user_id=str(user_id), doc_name=str(name), status="ingesting")
         
-        print(f"✅ Text validation passed: {word_count} words extracted")
+        file_types = []
+        for path in new_files:
+            filename = os.path.basename(path)
+            if '.' in filename:
+                file_types.append(filename.split('.')[-1].lower())
+            else:
+                file_types.append('unknown')
         
-        await cache_document_content(doc_id, full_text)
-        chunks = get_text_chunks(full_text)
-
-        print(f"📄 Created {len(chunks)} text chunks")
-        if chunks:
-            print(f"📝 First chunk preview: {chunks[0][:200]}...")
-            
-        embeddings = await get_cached_embeddings()
-        vector_store = await get_pinecone_vector_store(doc_id, embeddings)
+        stats = PageStats()
+        deduplicator = ChunkDeduplicator() if DEDUP_ENABLED else None
+        chunks = iter_unique_chunks(iter_text_chunks(stats.tap(iter_pages_from_files(new_files))), deduplicator)
+        await report(stage="extracting")
         
-        index = get_pinecone_index()
-        namespace = f"doc_{doc_id}"
-        
-        try:
-            existing_docs = index.query(
-                vector=[0.0] * 768, 
-                namespace=namespace,
-                top_k=1,
-                include_metadata=True
-            )
-            
-            if existing_docs.get('matches'):
-                print(f"📝 Adding to existing document collection in Pinecone")
-            else:
-                print(f"📝 Creating new document collection in Pinecone")
-        except Exception as e:
-            print(f"⚠️ Could not check existing docs: {e}")
+        # A re-uploaded file with changed content is diffed against the chunk ids of its previous version
+        previous_ids = {}
+        # Page and offsets each unchanged chunk was stored with; an edit earlier in the file moves them
+        previous_spans = {}
+        for path in new_files:
+            entry = manifest["files"].get(os.path.basename(path))
+            if entry and entry.get("chunk_ids"):
+                previous_ids[os.path.basename(path)] = set(entry["chunk_ids"])
+                previous_spans[os.path.basename(path)] = entry.get("chunk_spans", {})
+        file_chunk_ids = {os.path.basename(path): [] for path in new_files}
+        file_chunk_spans = {os.path.basename(path): {} for path in new_files}
+        # Metadata for unchanged chunks whose provenance moved, applied without re-embedding
+        moved_metadata = {}
+        text_ordinals = {}
+        chunks_unchanged = 0
+        # Every chunk of the new files, changed or not, for the BM25 index
+        run_chunks = {}
         
         texts_with_metadata = []
         metadatas = []
         ids = []
+        content_cleared = not is_new_document
         
-        file_types = []
-        for f in files:
-            if f.filename and '.' in f.filename:
-                file_types.append(f.filename.split('.')[-1].lower())
-            else:
-                file_types.append('unknown')
+        async def on_upserted(upserted):
+            await report(stage="embedding", pages_done=stats.pages, chunks_embedded=upserted)
+            print(f"📤 Upserted {upserted} chunks so far ({stats.pages} pages read)")
+        
+        upserter = AsyncUpserter(index, namespace, embeddings, progress=on_upserted)
         
-        for i, chunk in enumerate(chunks):
-            if chunk.strip(): 
-                chunk_id = f"{doc_id}_chunk_{i}_{uuid.uuid4().hex[:8]}"
-                texts_with_metadata.append(chunk.strip())
+        async def flush():
+            nonlocal texts_with_metadata, metadatas, ids, content_cleared
+            if not content_cleared:
+                await cache_document_content(doc_id, "")
+                content_cleared = True
+            text = stats.drain_text()
+            if text:
+                # Each drain ends a page, so keep the page break between drains
+                await append_document_content(doc_id, text + "\n")
+            batch = (texts_with_metadata, metadatas, ids)
+            texts_with_metadata, metadatas, ids = [], [], []
+            if batch[0]:
+                await upserter.add(*batch)
+        
+        i = 0
+        # Extraction and chunking run on their own thread, a bounded distance ahead of embedding
+        async with aclosing(iterate_in_thread(chunks)) as chunk_stream:
+            async for chunk in chunk_stream:
+                if i == 0:
+                    print(f"📝 First chunk preview: {chunk.text[:200]}...")
                 
+                source = os.path.basename(chunk.source)
+                ordinal_key = (source, chunk.text)
+                ordinal = text_ordinals.get(ordinal_key, 0)
+                text_ordinals[ordinal_key] = ordinal + 1
+                chunk_id = chunk_vector_id(doc_id, source, chunk.text, ordinal)
+                file_chunk_ids[source].append(chunk_id)
+                span = [chunk.page_start, chunk.page_end, chunk.start, chunk.end]
+                file_chunk_spans[source][chunk_id] = span
+                run_chunks[chunk_id] = chunk.text
+                i += 1
                 metadata = {
                     "doc_id": str(doc_id),
-                    "chunk_id": i,
+                    "chunk_id": i - 1,
                     "user_id": str(user_id),
                     "doc_name": str(name),  
                     "timestamp": float(time.time()),
-                    "file_types": file_types,  
-                    "total_words": int(word_count)
+                    "file_types": file_types,
+                    "source": source,
+                    "page_start": chunk.page_start,
+                    "page_end": chunk.page_end,
+                    "char_start": chunk.start,
+                    "char_end": chunk.end
                 }
                 
+                if chunk_id in previous_ids.get(source, ()):
+                    chunks_unchanged += 1
+                    # Manifests written before spans were recorded count as moved, so they are corrected once
+                    if previous_spans[source].get(chunk_id) != span:
+                        moved_metadata[chunk_id] = metadata
+                    continue
+                
+                texts_with_metadata.append(chunk.text)
                 metadatas.append(metadata)
                 ids.append(chunk_id)
+                
+                # Hold the first batch back until the upload is known to pass the word minimum
+                if len(texts_with_metadata) >= EMBED_BATCH_SIZE and (stats.words >= MIN_WORDS or not is_new_document):
+                    await flush()
         
-        if texts_with_metadata:
-            vector_store.add_texts(
-                texts=texts_with_metadata,
-                metadatas=metadatas,
-                ids=ids
+        word_count = stats.words
+        if word_count == 0:
+            print(f"❌ No text extracted from {len(new_files)} new files")
+            for path in new_files:
+                print(f"📄 File: {os.path.basename(path)}, Size: {os.path.getsize(path)}")
+            
+            return {
+                "error": "No text could be extracted from the uploaded files. Please ensure your files contain readable text or try uploading different file formats (PDF, TXT, DOC, DOCX, or images with text)."
+            }
+        
+        print(f"📊 Extracted {word_count} words from {len(new_files)} new files")
+        
+        if is_new_document and word_count < MIN_WORDS:
+            return {
+                "error": f"The extracted text contains only {word_count} words. A minimum of {MIN_WORDS} words is required for processing. Please upload files with more text content."
+            }
+        
+        # Flush even with no chunks left, so text of final pages that added none (deduplicated or unchanged) is kept
+        await report(stage="embedding", pages_done=stats.pages)
+        await flush()
+        
+        upsert_stats = await upserter.close()
+        chunks_created = upsert_stats["upserted"]
+        if upsert_stats["failed_chunks"]:
+            print(f"❌ {upsert_stats['failed_chunks']} chunks failed to upsert for doc_id: {doc_id}: {upsert_stats}")
+            return {
+                "error": f"Failed to index {upsert_stats['failed_chunks']} of {upsert_stats['failed_chunks'] + chunks_created} chunks: {upserter.errors[-1]}"
+            }
+        
+        chunk_total = sum(len(chunk_ids) for chunk_ids in file_chunk_ids.values())
+        if chunk_total:
+            # Drop vectors of chunks that disappeared only after their replacements are in,
+            # so a re-index never leaves the document without searchable content
+            stale_ids = {
+                source: old_ids.difference(file_chunk_ids[source])
+                for source, old_ids in previous_ids.items()
+            }
+            chunks_deleted = 0
+            for source, ids_to_delete in stale_ids.items():
+                if not ids_to_delete:
+                    continue
+                try:
+                    chunks_deleted += await delete_vectors(index, namespace, ids_to_delete)
+                except Exception as e:
+                    # Keep the ids in the manifest so the next re-index of this file retries the delete
+                    print(f"⚠️ Failed to delete {len(ids_to_delete)} stale chunks of {source}: {e}")
+                    file_chunk_ids[source].extend(ids_to_delete)
+            if chunks_deleted:
+                print(f"🧹 Deleted {chunks_deleted} stale chunks for doc_id: {doc_id}")
+            
+            # Unchanged text at a new page or offset keeps its vector; only its citation metadata is rewritten
+            chunks_relocated = 0
+            if moved_metadata:
+                try:
+                    chunks_relocated = await update_vector_metadata(index, namespace, moved_metadata)
+                    print(f"📍 Updated page and offsets of {chunks_relocated} moved chunks for doc_id: {doc_id}")
+                except Exception as e:
+                    # Leave their spans out of the manifest so the next re-index of the file retries them
+                    print(f"⚠️ Failed to update metadata of {len(moved_metadata)} moved chunks: {e}")
+                    for spans in file_chunk_spans.values():
+                        for chunk_id in moved_metadata:
+                            spans.pop(chunk_id, None)
+            
+            ingested_at = datetime.now(timezone.utc).isoformat()
+            ingested = {}
+            for path, file_hash in new_files.items():
+                ingested[os.path.basename(path)] = {
+                    "sha256": file_hash,
+                    "size": os.path.getsize(path),
+                    "ingested_at": ingested_at
+                }
+            chunks_added = sum(len(chunk_ids) for chunk_ids in file_chunk_ids.values()) - sum(len(old_ids) for old_ids in previous_ids.values())
+            record = await doc_registry.record_ingest(doc_id, user_id, chunks_added, EMBEDDING_MODEL, INGEST_VERSION, ingested)
+            try:
+                removed_ids = set().union(*stale_ids.values())
+                await run_ingest(lexical_index_store.update, namespace, run_chunks, removed_ids)
+            except Exception as e:
+                print(f"⚠️ Failed to update lexical index for doc_id: {doc_id}: {e}")
+            # Reload the in-process copy so active chats see the new chunks
+            hot_index_cache.invalidate(namespace)
+            hot_index_cache.schedule_load(namespace, expected_count=record.get("chunk_count"))
+            manifest["files"].update(
+                (filename, {**entry, "chunk_ids": file_chunk_ids[filename], "chunk_spans": file_chunk_spans[filename]})
+                for filename, entry in ingested.items()
             )
+            save_manifest(folder, manifest)
             
             processing_time = time.time() - start_time
-            print(f"✅ Successfully processed {len(files)} files in {processing_time:.2f}s")
-            print(f"📊 Added {len(texts_with_metadata)} chunks to Pinecone for doc_id: {doc_id}")
+            print(f"✅ Successfully processed {len(new_files)} new files in {processing_time:.2f}s")
+            print(f"📊 Upserted {chunks_created} chunks to Pinecone for doc_id: {doc_id} ({chunks_unchanged} unchanged, {upsert_stats['batches']} batches, {upsert_stats['retries']} retries)")
+            
+            chunks_deduplicated = deduplicator.dropped if deduplicator else 0
+            if chunks_deduplicated:
+                print(f"🧹 Dropped {chunks_deduplicated} duplicate chunks before embedding: {deduplicator.get_stats()}")
             
             return {
                 "success": True,
                 "total_words": word_count,
-                "chunks_created": len(texts_with_metadata),
-                "files_processed": len(files)
+                "chunks_created": chunks_created,
+                "chunks_unchanged": chunks_unchanged,
+                "chunks_relocated": chunks_relocated,
+                "chunks_deleted": chunks_deleted,
+                "chunks_deduplicated": chunks_deduplicated,
+                "upsert_retries": upsert_stats["retries"],
+                "files_processed": len(new_files),
+                "files_skipped": len(filenames) - len(new_files)
             }
         else:
             return {
@@ -175,30 +500,24 @@ async def process_files(user_id, doc_id, files, name):
         return {
             "error": f"Failed to process files: {str(e)}"
         }
+    finally:
+        # No-op after a successful close; otherwise stops batches still embedding or upserting
+        if upserter is not None:
+            await upserter.cancel()
 
 async def get_cached_vector_store(doc_id):
-    """Get vector store from Pinecone with Redis caching"""
-    cache_key = f"pinecone_store:{doc_id}"
-    
-    try:
-        redis_client = get_redis()
-        cached = await redis_client.get(cache_key)
-        if cached:
-            print(f"✅ Vector store metadata found in Redis for doc_id: {doc_id}")
-    except Exception as e:
-        print(f"⚠️ Redis cache check failed: {e}")
+    """Get vector store from Pinecone, checking the document registry first"""
+    record = await doc_registry.get(doc_id)
+    if record is None:
+        print(f"⚠️ doc_id {doc_id} is not in the document registry")
+    elif not record.get("chunk_count"):
+        print(f"⚠️ doc_id {doc_id} has no indexed chunks yet (status: {record.get('status')})")
+    else:
+        print(f"✅ doc_id {doc_id} registered with {record['chunk_count']} chunks")
     
     try:
         embeddings = await get_cached_embeddings()
         vector_store = await get_pinecone_vector_store(doc_id, embeddings)
-        
-        try:
-            redis_client = get_redis()
-            await redis_client.setex(cache_key, 3600, "exists")
-            print(f"✅ Cached vector store metadata for {doc_id}")
-        except Exception as e:
-            print(f"⚠️ Failed to cache vector store metadata: {e}")
-        
         return vector_store
         
     except Exception as e:
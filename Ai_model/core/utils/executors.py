@@ -0,0 +1,74 @@
+import os
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# Ingestion blocks for long stretches (OCR, embedding rate limits and backoff),
+# so it gets its own threads instead of sharing asyncio's default executor
+# with the question path.
+INGEST_THREADS = int(os.getenv("INGEST_THREADS", "16"))
+INGEST_PAGE_QUEUE = int(os.getenv("INGEST_PAGE_QUEUE", "64"))
+
+ingest_executor = ThreadPoolExecutor(max_workers=INGEST_THREADS, thread_name_prefix="ingest")
+
+async def run_ingest(fn, *args, **kwargs):
+    """Run a blocking ingestion call on the ingest thread pool"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(ingest_executor, functools.partial(fn, *args, **kwargs))
+
+_DONE = object()
+
+class _Failed:
+    def __init__(self, error):
+        self.error = error
+
+async def iterate_in_thread(iterator, maxsize=INGEST_PAGE_QUEUE):
+    """Drive a blocking iterator on a dedicated thread and yield its items.
+
+    The thread runs ahead by at most `maxsize` items. When the consumer stops
+    early (error, cancellation), the thread stops at its next item and closes
+    the iterator itself, since a generator cannot be closed while another
+    thread is running it.
+    """
+    loop = asyncio.get_running_loop()
+    queue = asyncio.Queue()
+    slots = threading.Semaphore(maxsize)
+    stop = threading.Event()
+
+    def deliver(item):
+        try:
+            loop.call_soon_threadsafe(queue.put_nowait, item)
+        except RuntimeError:
+            # Event loop already closed
+            stop.set()
+
+    def produce():
+        try:
+            for item in iterator:
+                while not slots.acquire(timeout=0.5):
+                    if stop.is_set():
+                        return
+                if stop.is_set():
+                    return
+                deliver(item)
+            deliver(_DONE)
+        except BaseException as e:
+            deliver(_Failed(e))
+        finally:
+            close = getattr(iterator, "close", None)
+            if close:
+                close()
+
+    threading.Thread(target=produce, name="ingest-pages", daemon=True).start()
+    try:
+        while True:
+            item = await queue.get()
+            if item is _DONE:
+                return
+            if isinstance(item, _Failed):
+                raise item.error
+            slots.release()
+            yield item
+    finally:
+        stop.set()
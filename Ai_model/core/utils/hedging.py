@@ -0,0 +1,153 @@
+import os
+import time
+import asyncio
+import functools
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+RETRIEVAL_DEADLINE = float(os.getenv("RETRIEVAL_DEADLINE", "5.0"))
+RETRIEVAL_HEDGE_ENABLED = os.getenv("RETRIEVAL_HEDGE_ENABLED", "true").lower() == "true"
+# Hedge delay used until an operation has enough latency samples for a p95
+RETRIEVAL_HEDGE_DEFAULT_DELAY = float(os.getenv("RETRIEVAL_HEDGE_DEFAULT_DELAY", "0.5"))
+RETRIEVAL_HEDGE_MIN_DELAY = float(os.getenv("RETRIEVAL_HEDGE_MIN_DELAY", "0.05"))
+RETRIEVAL_LATENCY_WINDOW = int(os.getenv("RETRIEVAL_LATENCY_WINDOW", "200"))
+# Threads reserved for the question path, separate from ingestion's pool
+RETRIEVAL_THREADS = int(os.getenv("RETRIEVAL_THREADS", "16"))
+
+_MIN_SAMPLES = 20
+
+class _OperationStats:
+    """Rolling latency window and attempt counters for one operation"""
+
+    def __init__(self, window):
+        self.latencies = deque(maxlen=window)
+        self.counts = {"calls": 0, "attempts": 0, "hedges": 0, "hedge_wins": 0, "errors": 0, "timeouts": 0, "abandoned": 0}
+
+    def p95(self):
+        if len(self.latencies) < _MIN_SAMPLES:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+
+class HedgedExecutor:
+    """Runs blocking client calls off the event loop with a deadline and a hedged retry.
+
+    Each call runs on the executor's own thread pool, so it never queues
+    behind ingestion work. If it has not finished by the
+    operation's observed p95 latency, an identical second attempt is started
+    and whichever succeeds first wins; a failed attempt hands over to the
+    other one. Once the deadline passes, asyncio.TimeoutError is raised. The
+    losing attempt cannot be interrupted in its thread, but its result is
+    discarded. Abandoned attempts still enter the latency window with the
+    time they had run, so slow calls are not left out of the p95.
+    """
+
+    def __init__(self, deadline=RETRIEVAL_DEADLINE, hedge=RETRIEVAL_HEDGE_ENABLED, window=RETRIEVAL_LATENCY_WINDOW,
+                 threads=RETRIEVAL_THREADS):
+        self.deadline = deadline
+        self.hedge = hedge
+        self.window = window
+        self._stats = {}
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="retrieval")
+
+    def _operation(self, name):
+        with self._lock:
+            stats = self._stats.get(name)
+            if stats is None:
+                stats = self._stats[name] = _OperationStats(self.window)
+            return stats
+
+    def hedge_delay(self, name):
+        p95 = self._operation(name).p95()
+        if p95 is None:
+            return RETRIEVAL_HEDGE_DEFAULT_DELAY
+        return max(RETRIEVAL_HEDGE_MIN_DELAY, p95)
+
+    async def run(self, fn, *args, **kwargs):
+        """Run fn(*args, **kwargs) on the retrieval thread pool, without deadline or hedging"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._pool, functools.partial(fn, *args, **kwargs))
+
+    async def _attempt(self, stats, fn, args, kwargs):
+        started = time.perf_counter()
+        with self._lock:
+            stats.counts["attempts"] += 1
+        try:
+            result = await self.run(fn, *args, **kwargs)
+        except asyncio.CancelledError:
+            # Lost to the other attempt or hit the deadline: a lower bound on its latency
+            with self._lock:
+                stats.latencies.append(time.perf_counter() - started)
+                stats.counts["abandoned"] += 1
+            raise
+        except Exception:
+            with self._lock:
+                stats.counts["errors"] += 1
+            raise
+        with self._lock:
+            stats.latencies.append(time.perf_counter() - started)
+        return result
+
+    async def call(self, name, fn, *args, deadline=None, **kwargs):
+        """Run fn(*args, **kwargs) in a thread under the deadline, hedging once if it is slow"""
+        stats = self._operation(name)
+        with self._lock:
+            stats.counts["calls"] += 1
+        loop = asyncio.get_running_loop()
+        expires = loop.time() + (deadline or self.deadline)
+
+        primary = asyncio.create_task(self._attempt(stats, fn, args, kwargs))
+        pending = {primary}
+        hedged = False
+        last_error = None
+        try:
+            while pending:
+                remaining = expires - loop.time()
+                if remaining <= 0:
+                    break
+                wait = remaining
+                if self.hedge and not hedged:
+                    wait = min(wait, self.hedge_delay(name))
+                done, pending = await asyncio.wait(pending, timeout=wait, return_when=asyncio.FIRST_COMPLETED)
+
+                for task in done:
+                    if task.exception() is None:
+                        if task is not primary:
+                            with self._lock:
+                                stats.counts["hedge_wins"] += 1
+                        return task.result()
+                    last_error = task.exception()
+
+                # Start the hedge when the primary is slow, or as a retry if it failed early
+                if self.hedge and not hedged and expires - loop.time() > 0:
+                    hedged = True
+                    with self._lock:
+                        stats.counts["hedges"] += 1
+                    pending.add(asyncio.create_task(self._attempt(stats, fn, args, kwargs)))
+                elif not pending and last_error is not None:
+                    raise last_error
+        finally:
+            for task in pending:
+                task.cancel()
+
+        if last_error is not None and not pending:
+            raise last_error
+        with self._lock:
+            stats.counts["timeouts"] += 1
+        raise asyncio.TimeoutError(f"{name} exceeded its {deadline or self.deadline:.2f}s deadline")
+
+    def get_stats(self):
+        with self._lock:
+            return {
+                name: {
+                    **stats.counts,
+                    "p95_ms": round(stats.p95() * 1000, 1) if stats.p95() is not None else None,
+                    "samples": len(stats.latencies),
+                }
+                for name, stats in self._stats.items()
+            }
+
+
+retrieval_executor = HedgedExecutor()
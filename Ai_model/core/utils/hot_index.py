@@ -0,0 +1,205 @@
+import os
+import time
+import asyncio
+import threading
+import numpy as np
+from collections import OrderedDict
+from utils.pinecone import get_pinecone_index
+from core.utils.executors import run_ingest
+
+HOT_INDEX_MAX_BYTES = int(os.getenv("HOT_INDEX_MAX_BYTES", str(128 * 1024 * 1024)))
+HOT_INDEX_MAX_VECTORS = int(os.getenv("HOT_INDEX_MAX_VECTORS", "20000"))
+HOT_INDEX_LOAD_RETRIES = int(os.getenv("HOT_INDEX_LOAD_RETRIES", "3"))
+HOT_INDEX_RETRY_DELAY = float(os.getenv("HOT_INDEX_RETRY_DELAY", "2.0"))
+# Wait before trying again after a load that stayed incomplete through all retries
+HOT_INDEX_RELOAD_DELAY = float(os.getenv("HOT_INDEX_RELOAD_DELAY", "30"))
+HOT_INDEX_ENABLED = os.getenv("HOT_INDEX_ENABLED", "true").lower() == "true"
+
+# Ids go in the fetch query string, so keep requests well under URL limits
+_FETCH_BATCH = 200
+
+class HotIndex:
+    """All vectors of one namespace as a row-normalized float32 matrix.
+
+    Cosine top-k is a single matrix-vector product plus argpartition, which
+    for a few thousand 768-dim rows takes well under a millisecond.
+    """
+
+    def __init__(self, namespace, ids, vectors, texts, metadatas):
+        self.namespace = namespace
+        self.ids = ids
+        self.row_of = {vector_id: row for row, vector_id in enumerate(ids)}
+        self.texts = texts
+        self.metadatas = metadatas
+        matrix = np.asarray(vectors, dtype=np.float32).reshape(len(ids), -1)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        self.matrix = matrix / norms
+        self.nbytes = self.matrix.nbytes + sum(len(text) for text in texts) + 256 * len(ids)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def search(self, query_vector, k=4):
+        """Return [(row, score)] for the k rows most similar to query_vector"""
+        if not len(self.ids):
+            return []
+        query = np.asarray(query_vector, dtype=np.float32)
+        norm = np.linalg.norm(query)
+        if norm:
+            query = query / norm
+        scores = self.matrix @ query
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(int(row), float(scores[row])) for row in top]
+
+def _fetch_namespace(index, namespace):
+    """Read every vector in a namespace; returns (ids, vectors, texts, metadatas) or None if too large"""
+    ids = []
+    for page in index.list(namespace=namespace):
+        ids.extend(page)
+        if len(ids) > HOT_INDEX_MAX_VECTORS:
+            return None
+
+    vectors, texts, metadatas, kept_ids = [], [], [], []
+    for start in range(0, len(ids), _FETCH_BATCH):
+        response = index.fetch(ids=ids[start:start + _FETCH_BATCH], namespace=namespace)
+        for vector_id, vector in response.vectors.items():
+            metadata = dict(vector.metadata or {})
+            kept_ids.append(vector_id)
+            vectors.append(vector.values)
+            texts.append(metadata.pop("text", ""))
+            metadatas.append(metadata)
+    return kept_ids, vectors, texts, metadatas
+
+class HotIndexCache:
+    """Per-namespace HotIndex instances, LRU-evicted by memory budget.
+
+    A namespace is loaded in the background the first time it is searched
+    (or right after ingestion); until it is ready, searches fall back to
+    Pinecone. A load that returns fewer vectors than the registry expects is
+    retried, since freshly upserted vectors can take a moment to show up. If
+    it is still short after the retries, nothing is cached: searches keep
+    using Pinecone and another load is scheduled HOT_INDEX_RELOAD_DELAY later.
+    """
+
+    def __init__(self, max_bytes=HOT_INDEX_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._indexes = OrderedDict()
+        self._loading = {}
+        self._deferred = {}
+        self._lock = threading.Lock()
+        self._total_bytes = 0
+        self.stats = {"hits": 0, "misses": 0, "loads": 0, "evictions": 0, "load_failures": 0, "incomplete_loads": 0}
+
+    def get(self, namespace):
+        with self._lock:
+            hot = self._indexes.get(namespace)
+            if hot is None:
+                self.stats["misses"] += 1
+                return None
+            self._indexes.move_to_end(namespace)
+            self.stats["hits"] += 1
+            return hot
+
+    def invalidate(self, namespace):
+        """Drop a namespace and cancel any load of it that is still in flight"""
+        with self._lock:
+            hot = self._indexes.pop(namespace, None)
+            if hot is not None:
+                self._total_bytes -= hot.nbytes
+            task = self._loading.pop(namespace, None)
+            deferred = self._deferred.pop(namespace, None)
+        if task is not None:
+            task.cancel()
+        if deferred is not None:
+            deferred.cancel()
+
+    def schedule_load(self, namespace, expected_count=None):
+        """Start loading a namespace in the background unless it is loaded or loading"""
+        if not HOT_INDEX_ENABLED:
+            return
+        with self._lock:
+            if namespace in self._indexes or namespace in self._loading or namespace in self._deferred:
+                return
+            task = asyncio.create_task(self._load(namespace, expected_count))
+            self._loading[namespace] = task
+        task.add_done_callback(lambda done: self._finish_load(namespace, done))
+
+    def _finish_load(self, namespace, task):
+        with self._lock:
+            if self._loading.get(namespace) is task:
+                del self._loading[namespace]
+
+    def _defer_load(self, namespace, expected_count):
+        """Schedule another load of a namespace after HOT_INDEX_RELOAD_DELAY"""
+        def reload():
+            with self._lock:
+                if self._deferred.get(namespace) is not handle:
+                    return
+                del self._deferred[namespace]
+            self.schedule_load(namespace, expected_count)
+
+        handle = asyncio.get_running_loop().call_later(HOT_INDEX_RELOAD_DELAY, reload)
+        with self._lock:
+            previous = self._deferred.pop(namespace, None)
+            self._deferred[namespace] = handle
+        if previous is not None:
+            previous.cancel()
+
+    async def _load(self, namespace, expected_count):
+        for attempt in range(HOT_INDEX_LOAD_RETRIES):
+            started = time.perf_counter()
+            try:
+                # Bulk background fetch; kept off the retrieval threads
+                data = await run_ingest(_fetch_namespace, get_pinecone_index(), namespace)
+            except Exception as e:
+                self.stats["load_failures"] += 1
+                print(f"⚠️ Failed to load hot index for {namespace}: {e}")
+                return
+            if data is None:
+                print(f"⚠️ {namespace} has more than {HOT_INDEX_MAX_VECTORS} vectors, serving it from Pinecone only")
+                return
+            if expected_count and len(data[0]) < expected_count:
+                if attempt < HOT_INDEX_LOAD_RETRIES - 1:
+                    await asyncio.sleep(HOT_INDEX_RETRY_DELAY * (attempt + 1))
+                    continue
+                # A partial index would hide the missing chunks from answers, so keep serving from Pinecone
+                self.stats["incomplete_loads"] += 1
+                print(f"⚠️ Hot index for {namespace} has {len(data[0])} of {expected_count} expected vectors, retrying in {HOT_INDEX_RELOAD_DELAY:.0f}s")
+                self._defer_load(namespace, expected_count)
+                return
+
+            hot = HotIndex(namespace, *data)
+            self._store(hot)
+            print(f"🔥 Loaded hot index for {namespace}: {len(hot)} vectors, {hot.nbytes / 1024 / 1024:.1f}MB in {time.perf_counter() - started:.2f}s")
+            return
+
+    def _store(self, hot):
+        if hot.nbytes > self.max_bytes:
+            print(f"⚠️ Hot index for {hot.namespace} exceeds the memory budget, not caching it")
+            return
+        with self._lock:
+            previous = self._indexes.pop(hot.namespace, None)
+            if previous is not None:
+                self._total_bytes -= previous.nbytes
+            self._indexes[hot.namespace] = hot
+            self._total_bytes += hot.nbytes
+            self.stats["loads"] += 1
+            while self._total_bytes > self.max_bytes:
+                _, evicted = self._indexes.popitem(last=False)
+                self._total_bytes -= evicted.nbytes
+                self.stats["evictions"] += 1
+
+    def get_stats(self):
+        with self._lock:
+            return {
+                **self.stats,
+                "namespaces": len(self._indexes),
+                "total_bytes": self._total_bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+
+hot_index_cache = HotIndexCache()
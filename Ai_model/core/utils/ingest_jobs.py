@@ -0,0 +1,164 @@
+import os
+import json
+import time
+import asyncio
+from utils.redis_config import get_redis
+from utils.id_gen import generate_doc_id
+from core.utils.document_manager import ingest_files
+from core.utils.ingest_scheduler import ingest_scheduler, DEFAULT_PRIORITY
+
+JOB_TTL = 86400
+JOB_PUBLISH_INTERVAL = 1.0
+
+class IngestJob:
+    """State of one background upload ingestion, mirrored to Redis for status lookups"""
+
+    def __init__(self, user_id, doc_id, folder, filenames, name, priority=DEFAULT_PRIORITY):
+        self.job_id = generate_doc_id()
+        self.user_id = user_id
+        self.doc_id = doc_id
+        self.folder = folder
+        self.filenames = filenames
+        self.name = name
+        self.priority = priority
+        self.cost = self._estimate_cost()
+        self.queue_wait = None
+        self.status = "queued"
+        self.stage = "queued"
+        self.pages_done = 0
+        self.chunks_embedded = 0
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self._last_published = 0.0
+
+    def _estimate_cost(self):
+        """Job cost for fair queuing: upload size in MB, so small documents schedule first"""
+        size = 0
+        for filename in self.filenames:
+            try:
+                size += os.path.getsize(os.path.join(self.folder, filename))
+            except OSError:
+                pass
+        return max(size / (1024 * 1024), 0.01)
+
+    def to_dict(self):
+        return {
+            "job_id": self.job_id,
+            "user_id": self.user_id,
+            "doc_id": self.doc_id,
+            "status": self.status,
+            "stage": self.stage,
+            "priority": self.priority,
+            "queue_wait": self.queue_wait,
+            "files": len(self.filenames),
+            "pages_done": self.pages_done,
+            "chunks_embedded": self.chunks_embedded,
+            "result": self.result,
+            "error": self.error,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+    async def update(self, force=False, **fields):
+        """Apply progress fields; Redis is written at most once per JOB_PUBLISH_INTERVAL unless forced"""
+        for key, value in fields.items():
+            setattr(self, key, value)
+        now = time.time()
+        if force or now - self._last_published >= JOB_PUBLISH_INTERVAL:
+            self._last_published = now
+            await self._publish()
+
+    async def _publish(self):
+        try:
+            redis_client = get_redis()
+            await redis_client.setex(f"ingest_job:{self.job_id}", JOB_TTL, json.dumps(self.to_dict()))
+        except Exception as e:
+            print(f"⚠️ Failed to publish ingest job {self.job_id}: {e}")
+
+class IngestJobManager:
+    """Runs upload ingestion as background tasks so the serving loop never waits on it"""
+
+    def __init__(self, scheduler=ingest_scheduler):
+        self.scheduler = scheduler
+        self.jobs = {}
+        self._tasks = set()
+
+    async def submit(self, user_id, doc_id, folder, filenames, name, priority=DEFAULT_PRIORITY):
+        """Register a job for already-saved files and hand it to the scheduler"""
+        self._prune()
+        job = IngestJob(user_id, doc_id, folder, filenames, name, priority)
+        self.jobs[job.job_id] = job
+        await job.update(force=True)
+
+        task = asyncio.create_task(self._run(job))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        print(f"📥 Queued {priority} ingest job {job.job_id} for doc_id: {doc_id} ({len(filenames)} files, {job.cost:.2f} MB)")
+        return job
+
+    async def get_status(self, job_id):
+        """Return job status from this worker, falling back to the Redis mirror"""
+        job = self.jobs.get(job_id)
+        if job:
+            return job.to_dict()
+        try:
+            redis_client = get_redis()
+            data = await redis_client.get(f"ingest_job:{job_id}")
+            return json.loads(data) if data else None
+        except Exception as e:
+            print(f"⚠️ Failed to read ingest job {job_id}: {e}")
+            return None
+
+    async def shutdown(self):
+        for task in list(self._tasks):
+            task.cancel()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        print("✅ Ingest jobs stopped")
+
+    def get_queue_stats(self):
+        return self.scheduler.get_stats()
+
+    async def _run(self, job):
+        try:
+            # Covers the wait for a slot too, so a job cancelled while queued is not left "queued"
+            async with self.scheduler.slot(job.user_id, job.cost, job.priority) as wait:
+                await job.update(force=True, status="running", stage="starting", started_at=time.time(), queue_wait=wait)
+                try:
+                    result = await ingest_files(
+                        job.user_id, job.doc_id, job.folder, job.filenames, job.name,
+                        progress=job.update
+                    )
+                except Exception as e:
+                    print(f"❌ Ingest job {job.job_id} crashed: {e}")
+                    result = {"error": f"Failed to process files: {str(e)}"}
+        except asyncio.CancelledError:
+            await job.update(force=True, status="failed", stage="failed", error="Ingestion cancelled", finished_at=time.time())
+            raise
+
+        if result.get("error"):
+            await job.update(force=True, status="failed", stage="failed", error=result["error"], finished_at=time.time())
+            print(f"❌ Ingest job {job.job_id} failed: {result['error']}")
+        else:
+            await job.update(
+                force=True,
+                status="completed",
+                stage="done",
+                result=result,
+                chunks_embedded=result.get("chunks_created", job.chunks_embedded),
+                finished_at=time.time()
+            )
+            print(f"✅ Ingest job {job.job_id} completed in {job.finished_at - job.started_at:.2f}s")
+
+    def _prune(self):
+        cutoff = time.time() - JOB_TTL
+        for job_id, job in list(self.jobs.items()):
+            if job.finished_at and job.finished_at < cutoff:
+                del self.jobs[job_id]
+
+
+ingest_job_manager = IngestJobManager()
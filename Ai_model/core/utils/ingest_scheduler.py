@@ -0,0 +1,145 @@
+import os
+import time
+import heapq
+import asyncio
+import itertools
+from collections import Counter, deque
+from contextlib import asynccontextmanager
+
+INGEST_MAX_CONCURRENT = int(os.getenv("INGEST_MAX_CONCURRENT", "2"))
+INGEST_MAX_PER_USER = int(os.getenv("INGEST_MAX_PER_USER", "1"))
+PRIORITY_WEIGHTS = {"interactive": 4.0, "bulk": 1.0}
+DEFAULT_PRIORITY = "interactive"
+
+class _Entry:
+    def __init__(self, user_id, cost, priority, finish_tag, start_tag):
+        self.user_id = user_id
+        self.cost = cost
+        self.priority = priority
+        self.finish_tag = finish_tag
+        self.start_tag = start_tag
+        self.enqueued_at = time.time()
+        self.ready = asyncio.get_running_loop().create_future()
+
+class IngestScheduler:
+    """Weighted fair queue for ingest jobs with global and per-user concurrency limits.
+
+    Every user gets their own virtual clock. A job's finish tag advances that
+    clock by cost / weight, and the queued job with the smallest finish tag
+    whose user is under the per-user limit runs next. Small documents and
+    interactive uploads (weight 4) therefore go ahead of bulk backfills
+    (weight 1), and one user's backlog only delays that user.
+    """
+
+    def __init__(self, max_concurrent=INGEST_MAX_CONCURRENT, max_per_user=INGEST_MAX_PER_USER):
+        self.max_concurrent = max(1, max_concurrent)
+        self.max_per_user = max(1, max_per_user)
+        self._queue = []
+        self._seq = itertools.count()
+        self._running = 0
+        self._running_per_user = Counter()
+        self._queued_per_user = Counter()
+        self._user_finish = {}
+        self._virtual_time = 0.0
+        self._waits = deque(maxlen=500)
+
+    @asynccontextmanager
+    async def slot(self, user_id, cost, priority=DEFAULT_PRIORITY):
+        """Wait for a fair turn to run a job of the given cost; yields the seconds spent queued"""
+        entry = self._enqueue(user_id, cost, priority)
+        self._dispatch()
+        try:
+            await entry.ready
+        except asyncio.CancelledError:
+            if entry.ready.done() and not entry.ready.cancelled():
+                self._release(entry)
+            else:
+                self._remove(entry)
+            raise
+
+        wait = time.time() - entry.enqueued_at
+        self._waits.append(wait)
+        try:
+            yield wait
+        finally:
+            self._release(entry)
+
+    def get_stats(self):
+        now = time.time()
+        waits = sorted(self._waits)
+        queued = [entry for _, _, entry in self._queue]
+        return {
+            "queued": len(queued),
+            "queued_by_priority": dict(Counter(entry.priority for entry in queued)),
+            "running": self._running,
+            "running_users": len(self._running_per_user),
+            "max_concurrent": self.max_concurrent,
+            "max_per_user": self.max_per_user,
+            "oldest_queued_seconds": max((now - entry.enqueued_at for entry in queued), default=0.0),
+            "wait_seconds": {
+                "avg": sum(waits) / len(waits) if waits else 0.0,
+                "p95": waits[min(len(waits) - 1, int(len(waits) * 0.95))] if waits else 0.0,
+                "max": waits[-1] if waits else 0.0,
+            },
+        }
+
+    def _enqueue(self, user_id, cost, priority):
+        weight = PRIORITY_WEIGHTS.get(priority, PRIORITY_WEIGHTS[DEFAULT_PRIORITY])
+        start_tag = max(self._virtual_time, self._user_finish.get(user_id, 0.0))
+        finish_tag = start_tag + max(cost, 1e-6) / weight
+        self._user_finish[user_id] = finish_tag
+
+        entry = _Entry(user_id, cost, priority, finish_tag, start_tag)
+        heapq.heappush(self._queue, (finish_tag, next(self._seq), entry))
+        self._queued_per_user[user_id] += 1
+        return entry
+
+    def _unqueue(self, user_id):
+        self._queued_per_user[user_id] -= 1
+        if self._queued_per_user[user_id] <= 0:
+            del self._queued_per_user[user_id]
+
+    def _forget_if_idle(self, user_id):
+        """Drop a user's virtual clock once they have nothing queued or running"""
+        if user_id not in self._queued_per_user and user_id not in self._running_per_user:
+            self._user_finish.pop(user_id, None)
+
+    def _remove(self, entry):
+        remaining = [item for item in self._queue if item[2] is not entry]
+        if len(remaining) == len(self._queue):
+            # Already dropped by _dispatch after its future was cancelled
+            return
+        self._queue = remaining
+        heapq.heapify(self._queue)
+        self._unqueue(entry.user_id)
+        self._forget_if_idle(entry.user_id)
+
+    def _release(self, entry):
+        self._running -= 1
+        self._running_per_user[entry.user_id] -= 1
+        if self._running_per_user[entry.user_id] <= 0:
+            del self._running_per_user[entry.user_id]
+        self._forget_if_idle(entry.user_id)
+        self._dispatch()
+
+    def _dispatch(self):
+        skipped = []
+        while self._queue and self._running < self.max_concurrent:
+            item = heapq.heappop(self._queue)
+            entry = item[2]
+            if self._running_per_user[entry.user_id] >= self.max_per_user:
+                skipped.append(item)
+                continue
+            self._unqueue(entry.user_id)
+            if entry.ready.done():
+                self._forget_if_idle(entry.user_id)
+                continue
+            self._running += 1
+            self._running_per_user[entry.user_id] += 1
+            self._virtual_time = max(self._virtual_time, entry.start_tag)
+            entry.ready.set_result(None)
+        for item in skipped:
+            heapq.heappush(self._queue, item)
+
+
+ingest_scheduler = IngestScheduler()
@@ -0,0 +1,206 @@
+import os
+import re
+import math
+import threading
+import numpy as np
+from collections import Counter, OrderedDict
+
+LEXICAL_INDEX_DIR = os.getenv("LEXICAL_INDEX_DIR", os.path.join("storage", "lexical_index"))
+LEXICAL_INDEX_CACHE_SIZE = int(os.getenv("LEXICAL_INDEX_CACHE_SIZE", "64"))
+BM25_K1 = float(os.getenv("BM25_K1", "1.2"))
+BM25_B = float(os.getenv("BM25_B", "0.75"))
+
+# Words, plus identifiers such as "AB-1234", "4.2.1" or "v2.1.0" kept whole
+_TOKEN = re.compile(r"\w+(?:[-./:]\w+)*")
+
+def tokenize(text):
+    """Lowercased terms; compound identifiers are emitted whole and as their parts"""
+    tokens = []
+    for match in _TOKEN.findall(text.lower()):
+        tokens.append(match)
+        if not match.isalnum():
+            tokens.extend(part for part in re.split(r"[-./:]", match) if part)
+    return tokens
+
+def _pack_strings(strings):
+    """Encode strings as one UTF-8 blob plus offsets, so the index saves without pickling"""
+    encoded = [s.encode("utf-8") for s in strings]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(e) for e in encoded], out=offsets[1:])
+    return np.frombuffer(b"".join(encoded), dtype=np.uint8), offsets
+
+def _unpack_strings(blob, offsets):
+    data = blob.tobytes()
+    return [data[offsets[i]:offsets[i + 1]].decode("utf-8") for i in range(len(offsets) - 1)]
+
+class LexicalIndex:
+    """BM25 inverted index over one document's chunks.
+
+    Postings are stored CSR-style: for term t, rows offsets[t]:offsets[t+1]
+    of `postings` (chunk row) and `tfs` (term frequency). Scoring a query is
+    a few NumPy gathers and adds per query term.
+    """
+
+    def __init__(self, chunk_ids, texts, vocab, offsets, postings, tfs, doc_lengths):
+        self.chunk_ids = chunk_ids
+        self.texts = texts
+        self.vocab = vocab
+        self.term_index = {term: i for i, term in enumerate(vocab)}
+        self.offsets = offsets
+        self.postings = postings
+        self.tfs = tfs
+        self.doc_lengths = doc_lengths
+        self.avg_length = float(doc_lengths.mean()) if len(doc_lengths) else 0.0
+
+    @classmethod
+    def build(cls, chunks):
+        """Build from {chunk_id: text}"""
+        chunk_ids = list(chunks)
+        texts = [chunks[chunk_id] for chunk_id in chunk_ids]
+        term_rows = {}
+        doc_lengths = np.zeros(len(texts), dtype=np.int32)
+        for row, text in enumerate(texts):
+            counts = Counter(tokenize(text))
+            doc_lengths[row] = sum(counts.values())
+            for term, tf in counts.items():
+                term_rows.setdefault(term, []).append((row, tf))
+
+        vocab = sorted(term_rows)
+        offsets = np.zeros(len(vocab) + 1, dtype=np.int64)
+        np.cumsum([len(term_rows[term]) for term in vocab], out=offsets[1:])
+        postings = np.empty(offsets[-1], dtype=np.int32)
+        tfs = np.empty(offsets[-1], dtype=np.uint16)
+        for i, term in enumerate(vocab):
+            rows = term_rows[term]
+            postings[offsets[i]:offsets[i + 1]] = [row for row, _ in rows]
+            tfs[offsets[i]:offsets[i + 1]] = [min(tf, 65535) for _, tf in rows]
+        return cls(chunk_ids, texts, vocab, offsets, postings, tfs, doc_lengths)
+
+    def chunks(self):
+        return dict(zip(self.chunk_ids, self.texts))
+
+    def search(self, query, top_k=10):
+        """Return [(row, score)] for the top_k chunks by BM25"""
+        if not self.chunk_ids:
+            return []
+        n = len(self.chunk_ids)
+        scores = np.zeros(n, dtype=np.float32)
+        norm = BM25_K1 * (1 - BM25_B + BM25_B * self.doc_lengths / (self.avg_length or 1.0))
+        matched = False
+        for term in set(tokenize(query)):
+            i = self.term_index.get(term)
+            if i is None:
+                continue
+            matched = True
+            start, end = self.offsets[i], self.offsets[i + 1]
+            rows = self.postings[start:end]
+            tf = self.tfs[start:end].astype(np.float32)
+            idf = math.log(1 + (n - len(rows) + 0.5) / (len(rows) + 0.5))
+            scores[rows] += idf * tf * (BM25_K1 + 1) / (tf + norm[rows])
+        if not matched:
+            return []
+
+        k = min(top_k, int(np.count_nonzero(scores)))
+        if k == 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(int(row), float(scores[row])) for row in top]
+
+    def save(self, path):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        id_blob, id_offsets = _pack_strings(self.chunk_ids)
+        text_blob, text_offsets = _pack_strings(self.texts)
+        vocab_blob, vocab_offsets = _pack_strings(self.vocab)
+        tmp_path = f"{path}.tmp.npz"
+        np.savez(
+            tmp_path,
+            id_blob=id_blob, id_offsets=id_offsets,
+            text_blob=text_blob, text_offsets=text_offsets,
+            vocab_blob=vocab_blob, vocab_offsets=vocab_offsets,
+            offsets=self.offsets, postings=self.postings, tfs=self.tfs, doc_lengths=self.doc_lengths,
+        )
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            return cls(
+                _unpack_strings(data["id_blob"], data["id_offsets"]),
+                _unpack_strings(data["text_blob"], data["text_offsets"]),
+                _unpack_strings(data["vocab_blob"], data["vocab_offsets"]),
+                data["offsets"], data["postings"], data["tfs"], data["doc_lengths"],
+            )
+
+class LexicalIndexStore:
+    """Per-namespace lexical index files with a small in-process LRU.
+
+    Cached entries are keyed by file mtime and size, so an index rebuilt by
+    ingestion is picked up on the next search.
+    """
+
+    def __init__(self, directory=LEXICAL_INDEX_DIR, cache_size=LEXICAL_INDEX_CACHE_SIZE):
+        self.directory = directory
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        # Serializes read-modify-write updates of the same namespace
+        self._write_lock = threading.Lock()
+
+    def _path(self, namespace):
+        return os.path.join(self.directory, f"{namespace}.npz")
+
+    def get(self, namespace):
+        """The namespace's index, or None if it has none"""
+        path = self._path(namespace)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        version = (stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            entry = self._cache.get(namespace)
+            if entry and entry[0] == version:
+                self._cache.move_to_end(namespace)
+                return entry[1]
+        try:
+            index = LexicalIndex.load(path)
+        except Exception as e:
+            print(f"⚠️ Failed to load lexical index for {namespace}: {e}")
+            return None
+        with self._lock:
+            self._cache[namespace] = (version, index)
+            self._cache.move_to_end(namespace)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return index
+
+    def update(self, namespace, added, removed=()):
+        """Add or replace {chunk_id: text}, drop removed chunk ids, and rebuild the postings"""
+        with self._write_lock:
+            existing = self.get(namespace)
+            chunks = existing.chunks() if existing else {}
+            for chunk_id in removed:
+                chunks.pop(chunk_id, None)
+            chunks.update(added)
+            index = LexicalIndex.build(chunks)
+            index.save(self._path(namespace))
+        return index
+
+
+lexical_index_store = LexicalIndexStore()
+
+def reciprocal_rank_scores(rankings, k=60):
+    """{key: sum of 1 / (k + rank)} over ranked lists of keys"""
+    scores = {}
+    for ranking in rankings:
+        for rank, key in enumerate(ranking):
+            scores[key] = scores.get(key, 0.0) + 1.0 / (k + rank + 1)
+    return scores
+
+def reciprocal_rank_fusion(rankings, k=60):
+    """Fuse ranked lists of keys; returns keys ordered by sum of 1 / (k + rank)"""
+    scores = reciprocal_rank_scores(rankings, k)
+    return sorted(scores, key=scores.get, reverse=True)
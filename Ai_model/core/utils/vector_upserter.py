@@ -0,0 +1,104 @@
+import os
+import random
+import asyncio
+from core.utils.executors import run_ingest
+
+UPSERT_BATCH_SIZE = int(os.getenv("UPSERT_BATCH_SIZE", "100"))
+UPSERT_CONCURRENCY = int(os.getenv("UPSERT_CONCURRENCY", "4"))
+UPSERT_MAX_RETRIES = int(os.getenv("UPSERT_MAX_RETRIES", "3"))
+
+class AsyncUpserter:
+    """Embeds and upserts chunks into a Pinecone namespace in concurrent batches.
+
+    `add` queues chunks and starts a batch task for every `batch_size` of
+    them. At most `concurrency` batches are in flight; once that many are
+    running, `add` waits for one to finish, which pushes back on the
+    producer instead of buffering the whole document. Each batch is retried
+    with backoff on failure. `progress`, if given, is an async callable that
+    receives the running upserted count.
+    """
+
+    def __init__(self, index, namespace, embeddings, text_key="text", batch_size=UPSERT_BATCH_SIZE,
+                 concurrency=UPSERT_CONCURRENCY, max_retries=UPSERT_MAX_RETRIES, progress=None):
+        self.index = index
+        self.namespace = namespace
+        self.embeddings = embeddings
+        self.text_key = text_key
+        self.batch_size = batch_size
+        self.max_retries = max_retries
+        self.progress = progress
+        self._slots = asyncio.Semaphore(concurrency)
+        self._tasks = set()
+        self._pending = []
+        self.stats = {"upserted": 0, "batches": 0, "retries": 0, "failed_batches": 0, "failed_chunks": 0}
+        self.errors = []
+
+    async def add(self, texts, metadatas, ids):
+        """Queue chunks for upsert, waiting if the in-flight limit is reached"""
+        self._pending.extend(zip(ids, texts, metadatas))
+        while len(self._pending) >= self.batch_size:
+            batch = self._pending[:self.batch_size]
+            self._pending = self._pending[self.batch_size:]
+            await self._submit(batch)
+
+    async def close(self):
+        """Send the remaining chunks and wait for every batch; returns stats"""
+        if self._pending:
+            batch, self._pending = self._pending, []
+            await self._submit(batch)
+        if self._tasks:
+            await asyncio.gather(*self._tasks)
+        return self.stats
+
+    async def cancel(self):
+        """Abandon queued chunks and cancel in-flight batches"""
+        self._pending = []
+        for task in list(self._tasks):
+            task.cancel()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    async def _submit(self, batch):
+        await self._slots.acquire()
+        task = asyncio.create_task(self._run_batch(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def _upsert(self, batch):
+        ids, texts, metadatas = zip(*batch)
+        vectors = self.embeddings.embed_documents(list(texts))
+        self.index.upsert(
+            vectors=[
+                {"id": chunk_id, "values": vector, "metadata": {**metadata, self.text_key: text}}
+                for chunk_id, text, metadata, vector in zip(ids, texts, metadatas, vectors)
+            ],
+            namespace=self.namespace
+        )
+
+    async def _run_batch(self, batch):
+        try:
+            for attempt in range(self.max_retries + 1):
+                try:
+                    await run_ingest(self._upsert, batch)
+                    break
+                except Exception as e:
+                    if attempt == self.max_retries:
+                        self.stats["failed_batches"] += 1
+                        self.stats["failed_chunks"] += len(batch)
+                        self.errors.append(str(e))
+                        print(f"❌ Upsert batch of {len(batch)} chunks failed after {attempt + 1} attempts: {e}")
+                        return
+                    self.stats["retries"] += 1
+                    delay = min(30, 2 ** attempt) * random.uniform(0.5, 1.0)
+                    print(f"⚠️ Upsert batch of {len(batch)} chunks failed (attempt {attempt + 1}), retrying in {delay:.1f}s: {e}")
+                    await asyncio.sleep(delay)
+
+            self.stats["batches"] += 1
+            self.stats["upserted"] += len(batch)
+            if self.progress:
+                try:
+                    await self.progress(self.stats["upserted"])
+                except Exception as e:
+                    print(f"⚠️ Upsert progress callback failed: {e}")
+        finally:
+            self._slots.release()
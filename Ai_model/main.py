@@ -37,6 +37,13 @@ async def lifespan(app: FastAPI):
     yield
     
     print("🛑 Shutting down...")
+    # Stop ingest jobs first so their final status updates still reach Redis
+    try:
+        from core import ingest_job_manager
+        await ingest_job_manager.shutdown()
+    except Exception as e:
+        print(f"⚠️ Error during ingest job shutdown: {e}")
+    
     try:
         await close_redis()
     except Exception as e:
@@ -50,6 +57,12 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         print(f"⚠️ Error during gRPC client shutdown: {e}")
 
+    try:
+        from core.proces.ocr_engine import ocr_engine
+        ocr_engine.shutdown()
+    except Exception as e:
+        print(f"⚠️ Error during OCR worker pool shutdown: {e}")
+
 app = FastAPI(lifespan=lifespan)
 
 app.add_middleware(
@@ -1,6 +1,15 @@
+import json
 from fastapi import APIRouter, UploadFile, File, Form, HTTPException, Request
-from core import process_files, answer_question
+from fastapi.responses import StreamingResponse
+from core import ensure_chat, ingest_job_manager, answer_question, stream_answer, search_user_documents
+from core.utils.ingest_scheduler import PRIORITY_WEIGHTS
+from core.proces.extractor_registry import registry as extractor_registry
+from core.proces.search_engine import question_embedding_cache
+from core.utils.hedging import retrieval_executor
+from core.utils.hot_index import hot_index_cache
+from core.utils.executors import run_ingest
 from utils.id_gen import generate_doc_id
+from utils.file_utils import save_files
 from services.grpc_func import ServiceClient
 
 app = APIRouter()
@@ -10,10 +19,17 @@ async def upload_files(
     request: Request, 
     files: list[UploadFile] = File(...), 
     doc_id: str = Form(None), 
-    doc_name: str = Form(None)
+    doc_name: str = Form(None),
+    priority: str = Form("interactive")
 ):
     userid = request.state.user_id
     
+    if priority not in PRIORITY_WEIGHTS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid priority: {priority}. Supported: {', '.join(PRIORITY_WEIGHTS)}"
+        )
+    
     if not doc_id:
         doc_id = generate_doc_id()
         if doc_name is None:
@@ -25,7 +41,7 @@ async def upload_files(
             detail="No files provided"
         )
     
-    supported_extensions = {'.pdf', '.txt', '.doc', '.docx', '.png', '.jpg', '.jpeg', '.tiff', '.bmp'}
+    supported_extensions = extractor_registry.supported_extensions()
     invalid_files = []
     
     for file in files:
@@ -40,56 +56,82 @@ async def upload_files(
     if invalid_files:
         raise HTTPException(
             status_code=400, 
-            detail=f"Unsupported file types: {', '.join(invalid_files)}. Supported: PDF, TXT, DOC, DOCX, PNG, JPG, JPEG, TIFF, BMP"
+            detail=f"Unsupported file types: {', '.join(invalid_files)}. Supported: {', '.join(ext[1:].upper() for ext in sorted(supported_extensions))}"
+        )
+    
+    if not doc_name or doc_name.strip() == "":
+        doc_name = "Untitled Document"
+    
+    error = await ensure_chat(userid, doc_id, doc_name)
+    if error:
+        raise HTTPException(
+            status_code=400,
+            detail=error["error"]
         )
     
     try:
-        result = await process_files(userid, doc_id, files, doc_name)
-        
-        if result.get("error"):
-            raise HTTPException(
-                status_code=400,
-                detail=result["error"]
-            )
+        folder = await run_ingest(save_files, userid, doc_id, files)
+        job = await ingest_job_manager.submit(
+            userid, doc_id, folder, [file.filename for file in files], doc_name, priority
+        )
         
         return {
-            "message": "Files processed and embeddings stored successfully.", 
+            "message": "Files received. Processing has started in the background.", 
             "doc_id": doc_id,
-            "files_processed": len(files),
-            "total_words": result.get("total_words", 0),
-            "status": "success"
+            "job_id": job.job_id,
+            "files_received": len(files),
+            "status": job.status
         }
         
-    except HTTPException as he:
-        print(f"HTTP Exception in upload_files: {he.detail}")
-        raise he
     except Exception as e:
         print(f"Unexpected error in upload_files: {e}")
         return{
             "error": f"Failed to process files: {str(e)}"
         }
 
-@app.post("/ask")
-async def ask_question(
-    request: Request, 
-    doc_id: str = Form(None), 
-    question: str = Form(...),
-    context_only: str = Form("false"),
-    doc_name: str = Form(None)
-):
+@app.get("/upload/queue")
+async def upload_queue_stats():
+    return ingest_job_manager.get_queue_stats()
+
+@app.get("/retrieval/stats")
+async def retrieval_stats():
+    return {
+        "calls": retrieval_executor.get_stats(),
+        "hot_index": hot_index_cache.get_stats(),
+        "question_embeddings": question_embedding_cache.get_stats()
+    }
+
+@app.get("/upload/{job_id}")
+async def upload_status(request: Request, job_id: str):
     userid = request.state.user_id
     
+    status = await ingest_job_manager.get_status(job_id)
+    if not status or status.get("user_id") != userid:
+        raise HTTPException(
+            status_code=404,
+            detail="Upload job not found"
+        )
+    
+    return status
+
+async def prepare_question(userid, doc_id, question, doc_name, scope):
+    """Validate an ask request and create a chat when none is given; returns (doc_id, is_normal_chat)"""
     if not question.strip():
         raise HTTPException(
             status_code=400, 
             detail="Question cannot be empty"
         )
     
-    context_only_bool = context_only.lower() in ('true', '1', 'yes', 'on')
+    if scope not in ("doc", "all"):
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid scope: {scope}. Supported: doc, all"
+        )
     
     is_normal_chat = False
     if not doc_id:
-        is_normal_chat = True
+        # A question over all documents still needs a chat to keep its history in
+        is_normal_chat = scope != "all"
         doc_id = generate_doc_id()
         try:
             client = ServiceClient()
@@ -103,11 +145,76 @@ async def ask_question(
         except Exception as e:
             print(f"⚠️ Error creating normal chat: {e}")
     
+    return doc_id, is_normal_chat
+
+@app.post("/ask")
+async def ask_question(
+    request: Request, 
+    doc_id: str = Form(None), 
+    question: str = Form(...),
+    context_only: str = Form("false"),
+    doc_name: str = Form(None),
+    scope: str = Form("doc")
+):
+    userid = request.state.user_id
+    doc_id, is_normal_chat = await prepare_question(userid, doc_id, question, doc_name, scope)
+    context_only_bool = context_only.lower() in ('true', '1', 'yes', 'on')
+    
     answer = await answer_question(
         userid, 
         doc_id, 
         question, 
         is_normal_chat=is_normal_chat,
-        context_only=context_only_bool  
+        context_only=context_only_bool,
+        scope=scope
     )
-    return {"answer": answer, "doc_id": doc_id}
\ No newline at end of file
+    return {"answer": answer, "doc_id": doc_id}
+
+@app.post("/ask/stream")
+async def ask_question_stream(
+    request: Request, 
+    doc_id: str = Form(None), 
+    question: str = Form(...),
+    context_only: str = Form("false"),
+    doc_name: str = Form(None),
+    scope: str = Form("doc")
+):
+    userid = request.state.user_id
+    doc_id, is_normal_chat = await prepare_question(userid, doc_id, question, doc_name, scope)
+    context_only_bool = context_only.lower() in ('true', '1', 'yes', 'on')
+    
+    async def events():
+        yield f"event: start\ndata: {json.dumps({'doc_id': doc_id})}\n\n"
+        async for token in stream_answer(
+            userid,
+            doc_id,
+            question,
+            is_normal_chat=is_normal_chat,
+            context_only=context_only_bool,
+            scope=scope
+        ):
+            yield f"data: {json.dumps({'token': token})}\n\n"
+        yield f"event: done\ndata: {json.dumps({'doc_id': doc_id})}\n\n"
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.post("/search")
+async def search_documents(
+    request: Request,
+    question: str = Form(...),
+    top_k: int = Form(5)
+):
+    userid = request.state.user_id
+    
+    if not question.strip():
+        raise HTTPException(
+            status_code=400, 
+            detail="Question cannot be empty"
+        )
+    
+    results = await search_user_documents(userid, question, top_k=max(1, min(top_k, 50)))
+    return {"results": results}
\ No newline at end of file
@@ -0,0 +1,4 @@
+import os
+
+# Importing `core` builds the API key manager, which needs a key to exist; no request is ever sent with it
+os.environ.setdefault("GOOGLE_API_KEY", "test-key")
@@ -0,0 +1,73 @@
+import asyncio
+from redis.exceptions import WatchError
+
+class FakeRedis:
+    """In-memory stand-in for the few async Redis calls the registry makes, with WATCH semantics"""
+
+    def __init__(self):
+        self.data = {}
+        self.versions = {}
+
+    def pipeline(self):
+        return FakePipeline(self)
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def set(self, key, value):
+        self.data[key] = value
+        self.versions[key] = self.versions.get(key, 0) + 1
+
+    async def setex(self, key, ttl, value):
+        await self.set(key, value)
+
+    async def append(self, key, value):
+        await self.set(key, self.data.get(key, "") + value)
+
+    async def expire(self, key, ttl):
+        return key in self.data
+
+    async def sadd(self, key, member):
+        self.data.setdefault(key, set()).add(member)
+
+    async def exists(self, *keys):
+        return sum(key in self.data for key in keys)
+
+    async def smembers(self, key):
+        return set(self.data.get(key, set()))
+
+class FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.watched = {}
+        self.commands = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        return False
+
+    async def watch(self, key):
+        self.watched = {key: self.redis.versions.get(key, 0)}
+
+    async def get(self, key):
+        # Yield between the read and the write, so concurrent writers interleave
+        value = self.redis.data.get(key)
+        await asyncio.sleep(0)
+        return value
+
+    def multi(self):
+        self.commands = []
+
+    def set(self, key, value):
+        self.commands.append(("set", key, value))
+
+    def sadd(self, key, member):
+        self.commands.append(("sadd", key, member))
+
+    async def execute(self):
+        if any(self.redis.versions.get(key, 0) != version for key, version in self.watched.items()):
+            raise WatchError()
+        for command, key, value in self.commands:
+            await getattr(self.redis, command)(key, value)
@@ -0,0 +1,44 @@
+import asyncio
+from core import chat_handler
+
+class AsyncOnlyChain:
+    def __init__(self):
+        self.inputs = None
+
+    def __call__(self, *args, **kwargs):
+        raise AssertionError("the synchronous chain call blocks the event loop")
+
+    async def ainvoke(self, inputs, return_only_outputs=False):
+        self.inputs = inputs
+        return {"output_text": "Both documents list the part AB-1234."}
+
+def _patch(monkeypatch, chain, search):
+    async def nothing(*args, **kwargs):
+        return None
+
+    async def get_chain(doc_id, context_only=False):
+        return chain
+
+    for name in ("get_cached_response", "cache_response", "learn_user_patterns", "append_history"):
+        monkeypatch.setattr(chat_handler, name, nothing)
+    monkeypatch.setattr(chat_handler, "search_user_documents", search)
+    monkeypatch.setattr(chat_handler, "recent_history", lambda doc_id: "")
+    monkeypatch.setattr(chat_handler.chain_manager, "get_chain", get_chain)
+
+def test_all_documents_answer_uses_async_chain(monkeypatch):
+    async def search(user_id, question, top_k=4):
+        return [{"doc_id": "doc1", "doc_name": "manual.pdf", "text": "Part AB-1234"}]
+
+    chain = AsyncOnlyChain()
+    _patch(monkeypatch, chain, search)
+    answer = asyncio.run(chat_handler.answer_question("alice", "doc1", "Which part?", scope="all"))
+    assert answer == "Both documents list the part AB-1234."
+    assert chain.inputs["input_documents"][0].page_content == "[manual.pdf]\nPart AB-1234"
+
+def test_failure_returns_the_error_answer(monkeypatch):
+    async def search(user_id, question, top_k=4):
+        raise RuntimeError("index unavailable")
+
+    _patch(monkeypatch, AsyncOnlyChain(), search)
+    answer = asyncio.run(chat_handler.answer_question("alice", "doc1", "Which part?", scope="all"))
+    assert answer == chat_handler.ERROR_ANSWER
@@ -0,0 +1,66 @@
+import random
+from core.utils.chunker import OffsetChunker
+
+def _pages(rng, count, words=300):
+    vocabulary = ["alpha", "beta", "gamma", "delta", "clause", "section", "widget", "torque"]
+    pages = []
+    for _ in range(count):
+        paragraphs = [" ".join(rng.choice(vocabulary) for _ in range(words // 4)) for _ in range(4)]
+        pages.append("\n\n".join(paragraphs))
+    return pages
+
+def test_offsets_slice_the_streamed_text():
+    rng = random.Random(0)
+    pages = _pages(rng, 6)
+    chunker = OffsetChunker(chunk_size=500, chunk_overlap=100)
+    chunks = list(chunker.iter_chunks(("a.pdf", number, text) for number, text in enumerate(pages, 1)))
+
+    full = "".join(text + "\n" for text in pages)
+    assert chunks
+    for chunk in chunks:
+        assert chunk.text == full[chunk.start:chunk.end]
+        assert len(chunk.text) <= 500
+        assert chunk.text == chunk.text.strip()
+
+def test_page_provenance():
+    rng = random.Random(1)
+    pages = _pages(rng, 5)
+    chunker = OffsetChunker(chunk_size=400, chunk_overlap=80)
+    chunks = list(chunker.iter_chunks(("a.pdf", number, text) for number, text in enumerate(pages, 1)))
+
+    page_starts = []
+    offset = 0
+    for text in pages:
+        page_starts.append(offset)
+        offset += len(text) + 1
+    page_of = lambda position: max(i for i, start in enumerate(page_starts, 1) if start <= position)
+    for chunk in chunks:
+        assert chunk.page_start == page_of(chunk.start)
+        assert chunk.page_end == page_of(chunk.end - 1)
+        assert chunk.page_start <= chunk.page_end
+
+def test_chunks_never_span_sources():
+    chunker = OffsetChunker(chunk_size=200, chunk_overlap=40)
+    pages = [("a.txt", 1, "first file " * 30), ("b.txt", 1, "second file " * 30), ("a.txt", 2, "more of a " * 30)]
+    chunks = list(chunker.iter_chunks(pages))
+    assert {chunk.source for chunk in chunks} == {"a.txt", "b.txt"}
+    for chunk in chunks:
+        if chunk.source == "b.txt":
+            assert "first" not in chunk.text and "more" not in chunk.text
+
+def test_consecutive_chunks_overlap_and_cover_text():
+    text = " ".join(f"word{i}" for i in range(2000))
+    chunker = OffsetChunker(chunk_size=300, chunk_overlap=60)
+    chunks = chunker.split(text)
+    assert chunks[0].start == 0
+    assert chunks[-1].end == len(text)
+    for previous, current in zip(chunks, chunks[1:]):
+        assert current.start > previous.start
+        assert current.start <= previous.end
+
+def test_overlap_must_be_smaller_than_size():
+    try:
+        OffsetChunker(chunk_size=100, chunk_overlap=100)
+    except ValueError:
+        return
+    raise AssertionError("expected ValueError")
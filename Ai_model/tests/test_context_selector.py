@@ -0,0 +1,74 @@
+import numpy as np
+from core.proces.context_selector import select_context
+from core.utils.lexical_index import reciprocal_rank_scores
+
+DIM = 32
+
+def _unit(vector):
+    return vector / np.linalg.norm(vector)
+
+def _near_query(rng, cosine):
+    """A unit vector with the given cosine to the query axis e0"""
+    noise = rng.normal(size=DIM)
+    noise[0] = 0
+    return _unit(np.eye(DIM)[0] * cosine + _unit(noise) * np.sqrt(1 - cosine ** 2))
+
+def _corpus(seed=0):
+    rng = np.random.default_rng(seed)
+    texts = {f"d{i}": _near_query(rng, 0.9 - 0.01 * i) for i in range(20)}
+    # Exact identifier: only BM25 finds it, its embedding is far from the question's
+    texts["PART-7731 spec"] = _unit(np.eye(DIM)[5] + 0.2 * np.eye(DIM)[0])
+    return texts
+
+def test_bm25_only_exact_id_hit_is_selected():
+    vectors = _corpus()
+    dense = [f"d{i}" for i in range(20)]
+    lexical = ["PART-7731 spec", "d9", "d0", "d14"]
+    fused = reciprocal_rank_scores([dense, lexical])
+    candidates = sorted(fused, key=fused.get, reverse=True)
+    assert candidates.index("PART-7731 spec") < 4
+
+    selected = select_context(
+        np.eye(DIM)[0], candidates, [vectors[text] for text in candidates], max_chunks=4,
+        scores=[fused[text] for text in candidates],
+        exempt=[i for i, text in enumerate(candidates) if text in lexical[:4]],
+    )
+    assert "PART-7731 spec" in selected
+    assert len(selected) == 4
+
+def test_relative_threshold_drops_weak_dense_candidates():
+    rng = np.random.default_rng(1)
+    texts = ["strong", "also strong", "weak"]
+    vectors = [_near_query(rng, 0.9), _near_query(rng, 0.88), _near_query(rng, 0.3)]
+    selected = select_context(np.eye(DIM)[0], texts, vectors, max_chunks=3, relative_threshold=0.8)
+    assert selected == ["strong", "also strong"]
+
+def test_exempt_candidate_skips_threshold():
+    rng = np.random.default_rng(1)
+    texts = ["strong", "also strong", "weak"]
+    vectors = [_near_query(rng, 0.9), _near_query(rng, 0.88), _near_query(rng, 0.3)]
+    selected = select_context(np.eye(DIM)[0], texts, vectors, max_chunks=3, relative_threshold=0.8, exempt=[2])
+    assert set(selected) == set(texts)
+
+def test_first_candidate_is_always_kept():
+    rng = np.random.default_rng(2)
+    texts = ["fused first", "dense best"]
+    vectors = [_near_query(rng, 0.2), _near_query(rng, 0.95)]
+    assert select_context(np.eye(DIM)[0], texts, vectors, max_chunks=1) == ["fused first"]
+
+def test_near_duplicates_are_skipped():
+    rng = np.random.default_rng(3)
+    base = _near_query(rng, 0.9)
+    texts = ["chunk", "overlapping chunk", "other"]
+    vectors = [base, _unit(base + 0.01 * rng.normal(size=DIM)), _near_query(rng, 0.85)]
+    assert select_context(np.eye(DIM)[0], texts, vectors, max_chunks=3) == ["chunk", "other"]
+
+def test_token_budget_limits_selection():
+    rng = np.random.default_rng(4)
+    texts = ["a" * 400, "b" * 400, "c" * 400]
+    vectors = [_near_query(rng, 0.9) for _ in texts]
+    # 100 estimated tokens each
+    assert len(select_context(np.eye(DIM)[0], texts, vectors, max_chunks=3, token_budget=250)) == 2
+
+def test_empty_input():
+    assert select_context(np.eye(DIM)[0], [], []) == []
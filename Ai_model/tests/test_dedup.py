@@ -0,0 +1,36 @@
+import random
+from core.utils.chunker import Chunk
+from core.utils.dedup import ChunkDeduplicator, iter_unique_chunks
+
+def _paragraph(rng, words=120):
+    return " ".join(f"w{rng.randrange(5000)}" for _ in range(words))
+
+def test_exact_duplicates_ignore_case_and_whitespace():
+    dedup = ChunkDeduplicator()
+    assert not dedup.is_duplicate("Terms  and\nConditions apply")
+    assert dedup.is_duplicate("terms and conditions APPLY")
+    assert dedup.exact_dropped == 1
+
+def test_near_duplicate_is_dropped():
+    # One changed word in 400 keeps the shingle Jaccard near 0.975, far enough above the
+    # threshold that the MinHash estimate (word hashes vary per process) never misses it
+    rng = random.Random(0)
+    text = _paragraph(rng, words=400)
+    words = text.split()
+    words[200] = "changed"
+    dedup = ChunkDeduplicator(threshold=0.9)
+    assert not dedup.is_duplicate(text)
+    assert dedup.is_duplicate(" ".join(words))
+    assert dedup.near_dropped == 1
+
+def test_distinct_chunks_are_kept():
+    rng = random.Random(1)
+    dedup = ChunkDeduplicator()
+    texts = [_paragraph(rng) for _ in range(50)]
+    assert not any(dedup.is_duplicate(text) for text in texts)
+    assert dedup.kept == 50
+
+def test_iter_unique_chunks():
+    chunks = [Chunk(text, "a.txt", 1, 1, 0, len(text)) for text in ("same text here", "other text", "same text here")]
+    assert [chunk.text for chunk in iter_unique_chunks(chunks, ChunkDeduplicator())] == ["same text here", "other text"]
+    assert len(list(iter_unique_chunks(chunks, None))) == 3
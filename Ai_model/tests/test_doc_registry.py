@@ -0,0 +1,44 @@
+import asyncio
+from core.utils import doc_registry as registry_module
+from core.utils.doc_registry import DocRegistry
+from tests.fakes import FakeRedis
+
+def test_concurrent_ingests_do_not_lose_chunk_counts(monkeypatch):
+    redis = FakeRedis()
+    monkeypatch.setattr(registry_module, "get_redis", lambda: redis)
+    registry = DocRegistry()
+
+    async def scenario():
+        await asyncio.gather(*(
+            registry.record_ingest("doc1", "alice", 10, "model", 1, {f"file{i}.pdf": {"sha256": str(i)}})
+            for i in range(5)
+        ))
+        return await DocRegistry().get("doc1")
+
+    record = asyncio.run(scenario())
+    assert record["chunk_count"] == 50
+    assert set(record["files"]) == {f"file{i}.pdf" for i in range(5)}
+    assert redis.data["user_docs:alice"] == {"doc1"}
+
+def test_backfill_reruns_when_user_doc_set_is_lost(monkeypatch, tmp_path):
+    redis = FakeRedis()
+    redis.data["user_docs_backfilled:alice"] = "1"
+    (tmp_path / "alice" / "doc1").mkdir(parents=True)
+
+    class Index:
+        def describe_index_stats(self):
+            return {"namespaces": {"doc_doc1": {"vector_count": 7}}}
+
+    monkeypatch.setattr(registry_module, "get_redis", lambda: redis)
+    monkeypatch.setattr(registry_module, "get_pinecone_index", lambda: Index())
+    monkeypatch.setattr(registry_module, "UPLOADS_DIR", str(tmp_path))
+
+    async def scenario():
+        registry = DocRegistry()
+        added = await registry.backfill_user("alice")
+        return added, await registry.list_user_docs("alice"), await DocRegistry().backfill_user("alice")
+
+    added, docs, added_again = asyncio.run(scenario())
+    assert added == 1
+    assert docs == ["doc1"]
+    assert added_again == 0
@@ -0,0 +1,103 @@
+import asyncio
+import hashlib
+import functools
+import numpy as np
+import pytest
+from core.proces import file_process
+from core.proces.extraction_cache import ExtractionCache
+from core.utils import doc_registry as registry_module
+from core.utils import document_manager, executors
+from core.utils.lexical_index import LexicalIndexStore
+from tests.fakes import FakeRedis
+from utils.local_vector_store import LocalVectorIndex
+
+class HashEmbeddings:
+    """Deterministic stand-in embeddings: a vector seeded by the text's hash"""
+
+    def embed_documents(self, texts):
+        return [self._vector(text) for text in texts]
+
+    def embed_query(self, text):
+        return self._vector(text)
+
+    def _vector(self, text):
+        seed = int(hashlib.sha256(text.encode("utf-8")).hexdigest()[:8], 16)
+        return np.random.default_rng(seed).standard_normal(8).tolist()
+
+@pytest.fixture
+def ingest_env(monkeypatch, tmp_path):
+    redis = FakeRedis()
+    index = LocalVectorIndex(path=str(tmp_path / "vectors"))
+
+    async def embeddings():
+        return HashEmbeddings()
+
+    monkeypatch.setattr(document_manager, "get_redis", lambda: redis)
+    monkeypatch.setattr(registry_module, "get_redis", lambda: redis)
+    monkeypatch.setattr(document_manager, "get_cached_embeddings", embeddings)
+    monkeypatch.setattr(document_manager, "get_pinecone_index", lambda: index)
+    monkeypatch.setattr(document_manager, "lexical_index_store", LexicalIndexStore(directory=str(tmp_path / "lexical")))
+    monkeypatch.setattr(document_manager.hot_index_cache, "schedule_load", lambda *args, **kwargs: None)
+    monkeypatch.setattr(document_manager, "doc_registry", registry_module.DocRegistry())
+    monkeypatch.setattr(file_process, "extraction_cache", ExtractionCache(cache_dir=str(tmp_path / "cache")))
+    # One extraction thread, so files are read in upload order
+    monkeypatch.setattr(file_process, "EXTRACT_FILE_WORKERS", 1)
+    monkeypatch.setattr(document_manager, "EMBED_BATCH_SIZE", 1)
+    # Keep extraction only a chunk ahead, so late pages are read after earlier batches flushed
+    monkeypatch.setattr(document_manager, "iterate_in_thread", functools.partial(executors.iterate_in_thread, maxsize=1))
+    folder = tmp_path / "upload"
+    folder.mkdir()
+    return redis, index, folder
+
+def _page(marker, count=12):
+    return "\n\n".join(f"{marker} paragraph {i} describes widget number {i * 7} in some detail." for i in range(count))
+
+def _write_pdf(monkeypatch, folder, name, pages):
+    """Put a multi-page file in the upload, with extraction patched to return its pages"""
+    (folder / name).write_text("\f".join(pages))
+    monkeypatch.setattr(document_manager, "iter_pages_from_files", lambda paths: (
+        (path, number, text) for path in paths for number, text in enumerate(pages, start=1)
+    ))
+
+def _ingest(folder, filenames):
+    return asyncio.run(document_manager.ingest_files("alice", "doc1", str(folder), filenames, "manual"))
+
+def test_text_of_trailing_pages_without_new_chunks_is_kept(monkeypatch, ingest_env):
+    redis, _, folder = ingest_env
+    later_pages = [_page(f"Page{number}") for number in range(2, 9)]
+    _write_pdf(monkeypatch, folder, "a.pdf", [_page("First")] + later_pages)
+    assert _ingest(folder, ["a.pdf"])["success"]
+
+    # Same length, so only the chunks around page 1 change and the later pages add no new chunks
+    _write_pdf(monkeypatch, folder, "a.pdf", [_page("Fresh")] + later_pages)
+    result = _ingest(folder, ["a.pdf"])
+
+    assert result["success"]
+    assert result["chunks_unchanged"] > 0
+    # Re-ingested files are appended to the document's content, every page of them
+    content = redis.data["document_content:doc1"]
+    assert content.count("Fresh paragraph 11 ") == 1
+    assert content.count("Page8 paragraph 11 ") == 2
+
+def test_unchanged_chunks_that_moved_get_new_provenance(monkeypatch, ingest_env):
+    _, index, folder = ingest_env
+    pages = [_page(f"Page{number}") for number in range(1, 7)]
+    _write_pdf(monkeypatch, folder, "a.pdf", pages)
+    assert _ingest(folder, ["a.pdf"])["success"]
+
+    # Merging the first two pages keeps the text stream, but every later chunk moves up a page
+    pages = [pages[0] + "\n" + pages[1]] + pages[2:]
+    _write_pdf(monkeypatch, folder, "a.pdf", pages)
+    result = _ingest(folder, ["a.pdf"])
+
+    assert result["chunks_unchanged"] > 0
+    assert result["chunks_relocated"] == result["chunks_unchanged"]
+    full = "".join(page + "\n" for page in pages)
+    page_starts = [sum(len(page) + 1 for page in pages[:number]) for number in range(len(pages))]
+    ids = [vector_id for batch in index.list(namespace="doc_doc1") for vector_id in batch]
+    for vector in index.fetch(ids, namespace="doc_doc1").vectors.values():
+        metadata = vector.metadata
+        assert full[metadata["char_start"]:metadata["char_end"]] == metadata["text"]
+        assert page_starts[metadata["page_start"] - 1] <= metadata["char_start"] < (
+            page_starts[metadata["page_start"]] if metadata["page_start"] < len(pages) else len(full)
+        )
@@ -0,0 +1,47 @@
+import time
+import threading
+import pytest
+from utils.embedding_scheduler import MultiKeyEmbeddings
+
+class BlockingClient:
+    def __init__(self, release):
+        self.release = release
+
+    def embed_documents(self, texts):
+        self.release.wait(5)
+        return [[1.0] for _ in texts]
+
+    def embed_query(self, text):
+        return [2.0]
+
+def _start_upload(embeddings):
+    upload = threading.Thread(target=embeddings.embed_documents, args=(["chunk"],))
+    upload.start()
+    while embeddings.keys[0].in_flight == 0:
+        time.sleep(0.01)
+    return upload
+
+def _embeddings(release, **kwargs):
+    return MultiKeyEmbeddings(lambda key: BlockingClient(release), ["key-1"], rpm=0, concurrency_per_key=1, **kwargs)
+
+def test_query_is_not_blocked_by_document_batches():
+    release = threading.Event()
+    embeddings = _embeddings(release)
+    upload = _start_upload(embeddings)
+    try:
+        assert embeddings.embed_query("question") == [2.0]
+    finally:
+        release.set()
+        upload.join()
+
+def test_waiting_for_a_slot_times_out():
+    release = threading.Event()
+    embeddings = _embeddings(release, slot_timeout=0.2)
+    upload = _start_upload(embeddings)
+    try:
+        with pytest.raises(TimeoutError):
+            embeddings.embed_documents(["another chunk"])
+    finally:
+        release.set()
+        upload.join()
+    assert embeddings.embed_documents(["after"]) == [[1.0]]
@@ -0,0 +1,40 @@
+from core.proces import file_process
+from core.proces.extraction_cache import ExtractionCache
+from core.proces.extractor_registry import ExtractorRegistry
+
+def _setup(monkeypatch, tmp_path, text_backends, render):
+    registry = ExtractorRegistry()
+    registry.register("pdf", "document", [".pdf"], file_process.iter_pages_from_pdf, streaming=True)
+    for priority, (name, func) in enumerate(reversed(text_backends)):
+        registry.register(name, "pdf_text", [".pdf"], func, priority=priority)
+    registry.register("render", "pdf_render", [".pdf"], render)
+    cache = ExtractionCache(cache_dir=str(tmp_path / "cache"))
+    monkeypatch.setattr(file_process, "registry", registry)
+    monkeypatch.setattr(file_process, "extraction_cache", cache)
+    path = tmp_path / "doc.pdf"
+    path.write_bytes(b"%PDF-1.4 test")
+    return str(path), cache
+
+def _broken_render(*args):
+    raise RuntimeError("pdftoppm crashed")
+
+def test_failed_ocr_pages_are_not_cached(monkeypatch, tmp_path):
+    path, cache = _setup(monkeypatch, tmp_path, [("text", lambda path: ["page one has text", ""])], _broken_render)
+
+    assert list(file_process.iter_pages_from_file(path)) == [(1, "page one has text"), (2, "")]
+    assert cache.stats["stores"] == 0
+    list(file_process.iter_pages_from_file(path))
+    assert cache.stats["hits"] == 0
+
+def test_cache_is_keyed_on_the_backend_that_ran(monkeypatch, tmp_path):
+    def preferred(path):
+        raise RuntimeError("preferred backend failed")
+
+    path, cache = _setup(
+        monkeypatch, tmp_path, [("preferred", preferred), ("fallback", lambda path: ["fallback text"])], _broken_render
+    )
+
+    assert file_process.extract_pages_from_file(path) == ["fallback text"]
+    file_hash = file_process.file_sha256(path)
+    assert cache.get(file_hash, file_process._cache_version(".pdf", "fallback")) == ["fallback text"]
+    assert cache.get(file_hash, file_process._cache_version(".pdf")) is None
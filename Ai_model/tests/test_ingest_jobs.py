@@ -0,0 +1,33 @@
+import asyncio
+from core.utils import ingest_jobs
+from core.utils.ingest_jobs import IngestJobManager
+from core.utils.ingest_scheduler import IngestScheduler
+
+def test_shutdown_fails_running_and_queued_jobs(monkeypatch, tmp_path):
+    published = []
+
+    async def blocked_ingest(*args, **kwargs):
+        await asyncio.Event().wait()
+
+    async def publish(job):
+        published.append((job.job_id, job.status))
+
+    monkeypatch.setattr(ingest_jobs, "ingest_files", blocked_ingest)
+    monkeypatch.setattr(ingest_jobs.IngestJob, "_publish", publish)
+
+    async def scenario():
+        manager = IngestJobManager(scheduler=IngestScheduler(max_concurrent=1, max_per_user=1))
+        running = await manager.submit("alice", "doc1", str(tmp_path), [], "a")
+        queued = await manager.submit("alice", "doc2", str(tmp_path), [], "b")
+        await asyncio.sleep(0.05)
+        assert (running.status, queued.status) == ("running", "queued")
+
+        await manager.shutdown()
+        return running, queued
+
+    running, queued = asyncio.run(scenario())
+    for job in (running, queued):
+        assert job.status == "failed"
+        assert job.error == "Ingestion cancelled"
+        assert job.finished_at is not None
+        assert (job.job_id, "failed") in published
@@ -0,0 +1,76 @@
+import asyncio
+from core.utils.ingest_scheduler import IngestScheduler
+
+def test_per_user_limit_lets_other_users_through():
+    async def scenario():
+        scheduler = IngestScheduler(max_concurrent=2, max_per_user=1)
+        order = []
+        release = asyncio.Event()
+
+        async def job(user_id, name):
+            async with scheduler.slot(user_id, cost=1):
+                order.append(name)
+                await release.wait()
+
+        tasks = [asyncio.create_task(job("alice", "a1")), asyncio.create_task(job("alice", "a2")),
+                 asyncio.create_task(job("bob", "b1"))]
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+        assert order == ["a1", "b1"]
+        release.set()
+        await asyncio.gather(*tasks)
+        assert order == ["a1", "b1", "a2"]
+
+    asyncio.run(scenario())
+
+def test_interactive_goes_ahead_of_bulk():
+    async def scenario():
+        scheduler = IngestScheduler(max_concurrent=1, max_per_user=1)
+        order = []
+        gate = asyncio.Event()
+
+        async def job(user_id, name, cost, priority):
+            async with scheduler.slot(user_id, cost=cost, priority=priority):
+                order.append(name)
+                await gate.wait()
+
+        blocker = asyncio.create_task(job("x", "blocker", 1, "interactive"))
+        await asyncio.sleep(0)
+        bulk = asyncio.create_task(job("backfill", "bulk", 100, "bulk"))
+        await asyncio.sleep(0)
+        interactive = asyncio.create_task(job("carol", "upload", 10, "interactive"))
+        await asyncio.sleep(0)
+        gate.set()
+        await asyncio.gather(blocker, bulk, interactive)
+        assert order == ["blocker", "upload", "bulk"]
+
+    asyncio.run(scenario())
+
+def test_cancelled_waiter_is_removed_and_state_pruned():
+    async def scenario():
+        scheduler = IngestScheduler(max_concurrent=1, max_per_user=1)
+        gate = asyncio.Event()
+
+        async def job(user_id):
+            async with scheduler.slot(user_id, cost=1):
+                await gate.wait()
+
+        running = asyncio.create_task(job("alice"))
+        await asyncio.sleep(0)
+        waiting = asyncio.create_task(job("bob"))
+        await asyncio.sleep(0)
+        assert scheduler.get_stats()["queued"] == 1
+
+        waiting.cancel()
+        await asyncio.gather(waiting, return_exceptions=True)
+        assert scheduler.get_stats()["queued"] == 0
+        assert "bob" not in scheduler._user_finish
+
+        gate.set()
+        await running
+        assert scheduler._running == 0
+        assert not scheduler._running_per_user
+        assert not scheduler._queued_per_user
+        assert not scheduler._user_finish
+
+    asyncio.run(scenario())
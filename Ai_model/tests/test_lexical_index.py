@@ -0,0 +1,48 @@
+from core.utils.lexical_index import (
+    LexicalIndex, LexicalIndexStore, reciprocal_rank_fusion, reciprocal_rank_scores, tokenize,
+)
+
+CHUNKS = {
+    "c0": "The warranty covers parts and labour for two years.",
+    "c1": "Replace filter part AB-1234 every six months.",
+    "c2": "Section 4.2.1 lists the torque values for each bolt.",
+    "c3": "Parts not covered by the warranty are listed below.",
+}
+
+def test_tokenize_keeps_identifiers_whole_and_split():
+    assert tokenize("Part AB-1234 in 4.2.1") == ["part", "ab-1234", "ab", "1234", "in", "4.2.1", "4", "2", "1"]
+
+def test_exact_identifier_ranks_first():
+    index = LexicalIndex.build(CHUNKS)
+    results = index.search("what is ab-1234", top_k=3)
+    assert index.chunk_ids[results[0][0]] == "c1"
+    assert all(score > 0 for _, score in results)
+
+def test_no_matching_terms_returns_nothing():
+    index = LexicalIndex.build(CHUNKS)
+    assert index.search("zebra") == []
+    assert LexicalIndex.build({}).search("warranty") == []
+
+def test_save_and_load_round_trip(tmp_path):
+    index = LexicalIndex.build(CHUNKS)
+    path = str(tmp_path / "doc.npz")
+    index.save(path)
+    loaded = LexicalIndex.load(path)
+    assert loaded.chunks() == CHUNKS
+    assert loaded.search("warranty parts", top_k=4) == index.search("warranty parts", top_k=4)
+
+def test_store_update_adds_and_removes(tmp_path):
+    store = LexicalIndexStore(directory=str(tmp_path))
+    assert store.get("doc") is None
+    store.update("doc", CHUNKS)
+    store.update("doc", {"c4": "Torque wrench calibration"}, removed=["c2"])
+    index = store.get("doc")
+    assert set(index.chunk_ids) == {"c0", "c1", "c3", "c4"}
+    assert [index.chunk_ids[row] for row, _ in index.search("torque")] == ["c4"]
+
+def test_reciprocal_rank_fusion():
+    rankings = [["a", "b", "c"], ["b", "d"]]
+    scores = reciprocal_rank_scores(rankings, k=60)
+    assert scores["b"] == 1 / 62 + 1 / 61
+    assert reciprocal_rank_fusion(rankings)[0] == "b"
+    assert set(reciprocal_rank_fusion(rankings)) == {"a", "b", "c", "d"}
@@ -0,0 +1,76 @@
+import numpy as np
+import pytest
+from utils.local_vector_store import LocalVectorIndex, LocalVectorStore
+
+def _records(vectors, prefix="v"):
+    return [{"id": f"{prefix}{i}", "values": vector.tolist(), "metadata": {"text": f"chunk {i}"}}
+            for i, vector in enumerate(vectors)]
+
+def _vectors(count, dim=32, seed=0):
+    return np.random.default_rng(seed).standard_normal((count, dim)).astype(np.float32)
+
+@pytest.mark.parametrize("dtype", ["float16", "int8"])
+def test_search_matches_exact_cosine_order(tmp_path, dtype):
+    vectors = _vectors(200)
+    index = LocalVectorIndex(path=str(tmp_path), dtype=dtype)
+    index.upsert(_records(vectors), namespace="doc")
+
+    query = vectors[7] + 0.1 * _vectors(1, seed=1)[0]
+    exact = vectors @ query / (np.linalg.norm(vectors, axis=1) * np.linalg.norm(query))
+    results = index.search(query, 5, namespace="doc")
+    assert results[0][0] == "v7"
+    assert results[0][1] == pytest.approx(exact[7], abs=0.02)
+    assert {vector_id for vector_id, _, _ in results} <= {f"v{i}" for i in np.argsort(-exact)[:8]}
+
+def test_delete_and_reupsert(tmp_path):
+    vectors = _vectors(20)
+    index = LocalVectorIndex(path=str(tmp_path))
+    index.upsert(_records(vectors), namespace="doc")
+    index.delete(ids=["v3"], namespace="doc")
+    results = index.search(vectors[3], 20, namespace="doc")
+    assert len(results) == 19
+    assert all(vector_id is not None and vector_id != "v3" for vector_id, _, _ in results)
+
+    index.upsert([{"id": "v5", "values": vectors[3].tolist(), "metadata": {"text": "moved"}}], namespace="doc")
+    top = index.search(vectors[3], 1, namespace="doc")[0]
+    assert top[0] == "v5" and top[2]["text"] == "moved"
+    assert sum(len(page) for page in index.list(namespace="doc")) == 19
+
+def test_compaction_keeps_live_rows(tmp_path):
+    vectors = _vectors(3000, dim=8)
+    index = LocalVectorIndex(path=str(tmp_path))
+    index.upsert(_records(vectors), namespace="doc")
+    index.delete(ids=[f"v{i}" for i in range(2000)], namespace="doc")
+
+    store = index._store("doc")
+    assert len(store.ids) == 1000
+    assert store.count == 1000
+    assert index.search(vectors[2500], 1, namespace="doc")[0][0] == "v2500"
+    assert index.fetch(["v2500"], namespace="doc").vectors["v2500"].metadata["text"] == "chunk 2500"
+
+def test_query_returns_values_and_reloads_from_disk(tmp_path):
+    vectors = _vectors(10)
+    LocalVectorIndex(path=str(tmp_path)).upsert(_records(vectors), namespace="doc")
+
+    reopened = LocalVectorIndex(path=str(tmp_path))
+    response = reopened.query(vectors[2], 2, namespace="doc", include_values=True)
+    match = response.matches[0]
+    assert match.id == "v2"
+    assert match.metadata["text"] == "chunk 2"
+    assert np.allclose(np.asarray(match.values) / np.linalg.norm(match.values),
+                       vectors[2] / np.linalg.norm(vectors[2]), atol=1e-2)
+    assert reopened.describe_index_stats()["namespaces"]["doc"]["vector_count"] == 10
+
+def test_vector_store_returns_documents(tmp_path):
+    vectors = _vectors(10)
+    index = LocalVectorIndex(path=str(tmp_path))
+    index.upsert(_records(vectors), namespace="doc")
+    store = LocalVectorStore(index, embedding=None, namespace="doc")
+    document, score = store.similarity_search_by_vector_with_score(vectors[4].tolist(), k=1)[0]
+    assert document.page_content == "chunk 4"
+    assert "text" not in document.metadata
+    assert score == pytest.approx(1.0, abs=0.01)
+
+def test_rejects_unsupported_dtype(tmp_path):
+    with pytest.raises(ValueError):
+        LocalVectorIndex(path=str(tmp_path), dtype="float32")
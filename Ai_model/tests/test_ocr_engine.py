@@ -0,0 +1,16 @@
+import os
+import pytest
+from concurrent.futures.process import BrokenProcessPool
+from core.proces.ocr_engine import OCREngine
+
+def test_broken_pool_is_replaced():
+    engine = OCREngine(max_workers=1)
+    try:
+        assert engine.submit("upload", os.getpid).result(timeout=60) != os.getpid()
+        with pytest.raises(BrokenProcessPool):
+            # A worker dying takes the pool down with it
+            engine.submit("upload", os._exit, 1).result(timeout=60)
+        assert engine.submit("upload", os.getpid).result(timeout=60) != os.getpid()
+        assert engine.get_stats()["failed"] == 1
+    finally:
+        engine.shutdown()
@@ -5,11 +5,35 @@ from langchain_pinecone import PineconeVectorStore
 import asyncio
 import time
 from utils.redis_config import get_redis
-from utils.pinecone import get_pinecone_index
+from utils.pinecone import get_pinecone_index, local_vector_index
+from utils.local_vector_store import LocalVectorStore
 from functools import lru_cache
 from .api_key import APIKeyManager
+from .embedding_cache import CachedEmbeddings
+from .embedding_scheduler import MultiKeyEmbeddings
 
 CHAIN_TIMEOUT = 300
+EMBEDDING_MODEL = "models/embedding-001"
+# Shared by the context-only QA chain and the streaming path, which formats it directly
+CONTEXT_ONLY_TEMPLATE = """You are Jack, a helpful AI assistant. Answer ONLY based on the provided document context.
+
+                STRICT INSTRUCTIONS:
+                - Use ONLY the information from the provided context
+                - If the context doesn't contain information to answer the question, say "The provided documents do not contain information about this topic. Please ask about topics covered in your uploaded documents."
+                - Do NOT use external knowledge or make assumptions
+                - Be direct and factual
+                - Reference the document content directly
+
+                CONVERSATION HISTORY:
+                {history}
+
+                DOCUMENT CONTEXT:
+                {context}
+
+                USER QUESTION: {question}
+
+                ANSWER (based only on the provided context):"""
+
 api_key_manager = APIKeyManager()
 
 class OptimizedChainManager:
@@ -66,27 +90,8 @@ class OptimizedChainManager:
             model = await self._get_pooled_model()
             
             if context_only:
-                prompt_template = """You are Jack, a helpful AI assistant. Answer ONLY based on the provided document context.
-
-                STRICT INSTRUCTIONS:
-                - Use ONLY the information from the provided context
-                - If the context doesn't contain information to answer the question, say "The provided documents do not contain information about this topic. Please ask about topics covered in your uploaded documents."
-                - Do NOT use external knowledge or make assumptions
-                - Be direct and factual
-                - Reference the document content directly
-
-                CONVERSATION HISTORY:
-                {history}
-
-                DOCUMENT CONTEXT:
-                {context}
-
-                USER QUESTION: {question}
-
-                ANSWER (based only on the provided context):"""
-                
                 prompt = PromptTemplate(
-                    template=prompt_template,
+                    template=CONTEXT_ONLY_TEMPLATE,
                     input_variables=["context", "question", "history"]
                 )
                 chain = load_qa_chain(model, chain_type="stuff", prompt=prompt)
@@ -163,11 +168,12 @@ class OptimizedChainManager:
 
 @lru_cache(maxsize=1)
 def get_cached_embeddings_sync():
-    api_key = api_key_manager.get_next_key()
-    return GoogleGenerativeAIEmbeddings(
-        model="models/embedding-001",
-        google_api_key=api_key
+    embeddings = MultiKeyEmbeddings(
+        lambda api_key: GoogleGenerativeAIEmbeddings(model=EMBEDDING_MODEL, google_api_key=api_key),
+        api_key_manager.api_keys,
+        key_manager=api_key_manager
     )
+    return CachedEmbeddings(embeddings, EMBEDDING_MODEL)
 
 async def get_cached_embeddings():
     redis_client = get_redis()
@@ -196,6 +202,9 @@ async def get_pinecone_vector_store(doc_id: str, embeddings):
     try:
         index = get_pinecone_index()
         namespace = f"doc_{doc_id}"
+        if local_vector_index:
+            print(f"✅ Using local vector store for doc_id: {doc_id}")
+            return LocalVectorStore(index, embeddings, namespace, text_key="text")
         vector_store = PineconeVectorStore(
             index=index,
             embedding=embeddings,
@@ -0,0 +1,175 @@
+import os
+import time
+import sqlite3
+import hashlib
+import threading
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+EMBEDDING_CACHE_PATH = os.getenv("EMBEDDING_CACHE_PATH", os.path.join("storage", "embedding_cache.sqlite3"))
+EMBEDDING_CACHE_MAX_BYTES = int(os.getenv("EMBEDDING_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+EMBEDDING_CACHE_DTYPE = os.getenv("EMBEDDING_CACHE_DTYPE", "float16")
+
+# SQLite caps bound parameters per statement; look keys up in slices of this size
+_LOOKUP_BATCH = 500
+
+def text_sha256(text):
+    return hashlib.sha256(text.encode("utf-8")).digest()
+
+class EmbeddingCache:
+    """Persistent cache of embedding vectors keyed by (model, SHA-256 of the text).
+
+    Vectors are stored as float16 (or float32) blobs in a local SQLite file and
+    evicted least recently used first once the stored vectors exceed
+    `max_bytes`.
+    """
+
+    def __init__(self, path=EMBEDDING_CACHE_PATH, max_bytes=EMBEDDING_CACHE_MAX_BYTES, dtype=EMBEDDING_CACHE_DTYPE):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.dtype = np.dtype(dtype)
+        self._lock = threading.Lock()
+        self._conn = None
+        self._total_bytes = 0
+        self.stats = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+
+    def _connect(self):
+        """Open the database on first use (caller holds the lock)"""
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings ("
+                "model TEXT NOT NULL, text_hash BLOB NOT NULL, dtype TEXT NOT NULL, "
+                "vector BLOB NOT NULL, last_used REAL NOT NULL, PRIMARY KEY (model, text_hash))"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS embeddings_last_used ON embeddings (last_used)")
+            self._total_bytes = self._conn.execute(
+                "SELECT COALESCE(SUM(LENGTH(vector)), 0) FROM embeddings"
+            ).fetchone()[0]
+        return self._conn
+
+    def get_many(self, model, texts):
+        """Return a list aligned with texts holding cached vectors or None"""
+        hashes = [text_sha256(text) for text in texts]
+        found = {}
+        try:
+            with self._lock:
+                conn = self._connect()
+                for start in range(0, len(hashes), _LOOKUP_BATCH):
+                    batch = hashes[start:start + _LOOKUP_BATCH]
+                    placeholders = ",".join("?" * len(batch))
+                    rows = conn.execute(
+                        f"SELECT text_hash, dtype, vector FROM embeddings WHERE model = ? AND text_hash IN ({placeholders})",
+                        [model, *batch],
+                    ).fetchall()
+                    for text_hash, dtype, vector in rows:
+                        found[text_hash] = np.frombuffer(vector, dtype=dtype).astype(np.float32).tolist()
+                    if rows:
+                        conn.execute(
+                            f"UPDATE embeddings SET last_used = ? WHERE model = ? AND text_hash IN ({placeholders})",
+                            [time.time(), model, *batch],
+                        )
+                conn.commit()
+        except Exception as e:
+            print(f"⚠️ Embedding cache lookup failed: {e}")
+            return [None] * len(texts)
+
+        vectors = [found.get(text_hash) for text_hash in hashes]
+        hits = sum(vector is not None for vector in vectors)
+        with self._lock:
+            self.stats["hits"] += hits
+            self.stats["misses"] += len(vectors) - hits
+        return vectors
+
+    def put_many(self, model, texts, vectors):
+        """Store vectors for texts, evicting old entries if over budget"""
+        now = time.time()
+        rows = [
+            (model, text_sha256(text), self.dtype.name, np.asarray(vector, dtype=self.dtype).tobytes(), now)
+            for text, vector in zip(texts, vectors)
+        ]
+        try:
+            with self._lock:
+                conn = self._connect()
+                before = conn.total_changes
+                conn.executemany("INSERT OR IGNORE INTO embeddings VALUES (?, ?, ?, ?, ?)", rows)
+                inserted = conn.total_changes - before
+                conn.commit()
+                if inserted:
+                    self._total_bytes += inserted * len(rows[0][3])
+                    self.stats["stores"] += inserted
+                if self._total_bytes > self.max_bytes:
+                    self._evict(conn)
+        except Exception as e:
+            print(f"⚠️ Embedding cache write failed: {e}")
+
+    def _evict(self, conn):
+        """Drop least recently used vectors down to 90% of the budget (caller holds the lock)"""
+        target = int(self.max_bytes * 0.9)
+        while self._total_bytes > target:
+            rows = conn.execute(
+                "SELECT rowid, LENGTH(vector) FROM embeddings ORDER BY last_used LIMIT 1000"
+            ).fetchall()
+            if not rows:
+                self._total_bytes = 0
+                break
+            freed = 0
+            evicted = []
+            for rowid, size in rows:
+                if self._total_bytes - freed <= target:
+                    break
+                evicted.append((rowid,))
+                freed += size
+            conn.executemany("DELETE FROM embeddings WHERE rowid = ?", evicted)
+            self._total_bytes -= freed
+            self.stats["evictions"] += len(evicted)
+        conn.commit()
+        print(f"🧹 Embedding cache evicted down to {self._total_bytes} bytes")
+
+    def get_stats(self):
+        with self._lock:
+            lookups = self.stats["hits"] + self.stats["misses"]
+            return {
+                **self.stats,
+                "hit_rate": self.stats["hits"] / lookups if lookups else 0.0,
+                "total_bytes": self._total_bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+
+embedding_cache = EmbeddingCache()
+
+class CachedEmbeddings(Embeddings):
+    """LangChain Embeddings wrapper that consults the embedding cache before the model"""
+
+    def __init__(self, embeddings, model_name, cache=embedding_cache):
+        self.embeddings = embeddings
+        self.model_name = model_name
+        self.cache = cache
+
+    def embed_documents(self, texts):
+        vectors = self.cache.get_many(self.model_name, texts)
+        missing = {}
+        for i, vector in enumerate(vectors):
+            if vector is None:
+                missing.setdefault(texts[i], []).append(i)
+
+        if missing:
+            missing_texts = list(missing)
+            fresh = self.embeddings.embed_documents(missing_texts)
+            for text, vector in zip(missing_texts, fresh):
+                for i in missing[text]:
+                    vectors[i] = vector
+            self.cache.put_many(self.model_name, missing_texts, fresh)
+            print(f"🧮 Embedded {len(missing_texts)} chunks, {len(texts) - sum(map(len, missing.values()))} served from cache")
+        else:
+            print(f"✅ All {len(texts)} chunk embeddings served from cache")
+        return vectors
+
+    def embed_query(self, text):
+        return self.embeddings.embed_query(text)
@@ -0,0 +1,180 @@
+import os
+import time
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from langchain_core.embeddings import Embeddings
+
+EMBED_REQUEST_BATCH = int(os.getenv("EMBED_REQUEST_BATCH", "32"))
+EMBED_KEY_RPM = float(os.getenv("EMBED_KEY_RPM", "100"))
+EMBED_KEY_CONCURRENCY = int(os.getenv("EMBED_KEY_CONCURRENCY", "2"))
+# Extra per-key slots only question embeddings may use, so bulk ingestion never starves chat
+EMBED_QUERY_CONCURRENCY = int(os.getenv("EMBED_QUERY_CONCURRENCY", "1"))
+# Longest a request waits for a free key slot before failing
+EMBED_SLOT_TIMEOUT = float(os.getenv("EMBED_SLOT_TIMEOUT", "300"))
+EMBED_QUERY_SLOT_TIMEOUT = float(os.getenv("EMBED_QUERY_SLOT_TIMEOUT", "5"))
+EMBED_MAX_RETRIES = int(os.getenv("EMBED_MAX_RETRIES", "5"))
+EMBED_BACKOFF_BASE = float(os.getenv("EMBED_BACKOFF_BASE", "2.0"))
+EMBED_BACKOFF_MAX = float(os.getenv("EMBED_BACKOFF_MAX", "60"))
+
+def _is_rate_limited(error):
+    text = f"{type(error).__name__} {error}".lower()
+    return any(marker in text for marker in ("429", "resourceexhausted", "resource exhausted", "quota", "rate limit"))
+
+class _KeyState:
+    """Pacing and cooldown state for one API key"""
+
+    def __init__(self, api_key, client):
+        self.api_key = api_key
+        self.client = client
+        self.next_slot = 0.0
+        self.cooldown_until = 0.0
+        self.failures = 0
+        self.in_flight = 0
+        self.query_in_flight = 0
+        self.stats = {"requests": 0, "texts": 0, "rate_limited": 0, "errors": 0}
+
+    def available_at(self):
+        return max(self.next_slot, self.cooldown_until)
+
+class MultiKeyEmbeddings(Embeddings):
+    """Embeds batches concurrently across every API key.
+
+    Texts are split into request batches of `batch_size` and spread over the
+    keys, each paced to `rpm` requests per minute and limited to
+    `concurrency_per_key` requests in flight. Query embeddings have their
+    own `query_concurrency_per_key` slots on top, so they never queue behind
+    an upload's batches. Waiting for a slot is bounded; past the timeout a
+    TimeoutError is raised. A 429 puts that key in an exponential-backoff
+    cooldown (with jitter) and the batch is retried on whichever key frees
+    up first. Results are returned in input order.
+    """
+
+    def __init__(self, client_factory, api_keys, key_manager=None, batch_size=EMBED_REQUEST_BATCH,
+                 rpm=EMBED_KEY_RPM, concurrency_per_key=EMBED_KEY_CONCURRENCY, max_retries=EMBED_MAX_RETRIES,
+                 query_concurrency_per_key=EMBED_QUERY_CONCURRENCY, slot_timeout=EMBED_SLOT_TIMEOUT,
+                 query_slot_timeout=EMBED_QUERY_SLOT_TIMEOUT):
+        if not api_keys:
+            raise ValueError("MultiKeyEmbeddings needs at least one API key")
+        self.keys = [_KeyState(key, client_factory(key)) for key in api_keys]
+        self.key_manager = key_manager
+        self.batch_size = batch_size
+        self.interval = 60.0 / rpm if rpm > 0 else 0.0
+        self.max_retries = max_retries
+        self.concurrency_per_key = max(1, concurrency_per_key)
+        self.query_concurrency_per_key = max(1, query_concurrency_per_key)
+        self.slot_timeout = slot_timeout
+        self.query_slot_timeout = query_slot_timeout
+        self._lock = threading.Lock()
+        # Signalled whenever a key frees a request slot
+        self._key_freed = threading.Condition(self._lock)
+        self._executor = ThreadPoolExecutor(
+            max_workers=len(self.keys) * self.concurrency_per_key, thread_name_prefix="embed"
+        )
+
+    def _has_slot(self, state, query):
+        if query:
+            return state.query_in_flight < self.query_concurrency_per_key
+        return state.in_flight < self.concurrency_per_key
+
+    def _reserve_key(self, query=False):
+        """Pick the key with a free slot that can send soonest and reserve its next slot; returns (key, delay)"""
+        timeout = self.query_slot_timeout if query else self.slot_timeout
+        deadline = time.monotonic() + timeout
+        with self._lock:
+            while True:
+                open_keys = [k for k in self.keys if self._has_slot(k, query)]
+                if open_keys:
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError(f"No embedding key slot freed up within {timeout:.1f}s")
+                self._key_freed.wait(remaining)
+            now = time.monotonic()
+            state = min(open_keys, key=lambda k: (max(now, k.available_at()), k.in_flight + k.query_in_flight))
+            start = max(now, state.available_at())
+            state.next_slot = start + self.interval
+            if query:
+                state.query_in_flight += 1
+            else:
+                state.in_flight += 1
+            return state, start - now
+
+    def _release_key(self, state, query=False):
+        """Return a request slot to the key (caller holds the lock)"""
+        if query:
+            state.query_in_flight -= 1
+        else:
+            state.in_flight -= 1
+        # Query and document waiters share the condition, so wake them all
+        self._key_freed.notify_all()
+
+    def _on_rate_limited(self, state):
+        with self._lock:
+            state.failures += 1
+            state.stats["rate_limited"] += 1
+            backoff = min(EMBED_BACKOFF_MAX, EMBED_BACKOFF_BASE ** state.failures)
+            state.cooldown_until = time.monotonic() + backoff * random.uniform(0.5, 1.0)
+        if self.key_manager:
+            self.key_manager.report_error(state.api_key)
+        print(f"⏳ Embedding key {state.api_key[-6:]} rate limited, cooling down {backoff:.1f}s")
+
+    def _call(self, texts, query=False):
+        last_error = None
+        for attempt in range(self.max_retries + 1):
+            state, delay = self._reserve_key(query)
+            if delay > 0:
+                time.sleep(delay)
+            try:
+                if query:
+                    result = state.client.embed_query(texts)
+                else:
+                    result = state.client.embed_documents(texts)
+            except Exception as e:
+                with self._lock:
+                    self._release_key(state, query)
+                last_error = e
+                if _is_rate_limited(e):
+                    self._on_rate_limited(state)
+                else:
+                    with self._lock:
+                        state.stats["errors"] += 1
+                    if self.key_manager:
+                        self.key_manager.report_error(state.api_key)
+                    print(f"⚠️ Embedding request failed on key {state.api_key[-6:]} (attempt {attempt + 1}): {e}")
+                    time.sleep(min(EMBED_BACKOFF_MAX, EMBED_BACKOFF_BASE ** attempt) * random.uniform(0.5, 1.0))
+                continue
+
+            with self._lock:
+                self._release_key(state, query)
+                state.failures = 0
+                state.stats["requests"] += 1
+                state.stats["texts"] += 1 if query else len(texts)
+            return result
+        raise last_error
+
+    def embed_documents(self, texts):
+        if not texts:
+            return []
+        batches = [texts[i:i + self.batch_size] for i in range(0, len(texts), self.batch_size)]
+        if len(batches) == 1:
+            return self._call(batches[0])
+        vectors = []
+        for batch_vectors in self._executor.map(self._call, batches):
+            vectors.extend(batch_vectors)
+        return vectors
+
+    def embed_query(self, text):
+        return self._call(text, query=True)
+
+    def get_stats(self):
+        with self._lock:
+            now = time.monotonic()
+            return [
+                {
+                    "key": state.api_key[-6:],
+                    **state.stats,
+                    "cooling_down": state.cooldown_until > now,
+                }
+                for state in self.keys
+            ]
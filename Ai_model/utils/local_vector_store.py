@@ -0,0 +1,345 @@
+import os
+import re
+import json
+import threading
+import numpy as np
+from langchain_core.documents import Document
+
+LOCAL_VECTOR_PATH = os.getenv("LOCAL_VECTOR_PATH", os.path.join("storage", "vectors"))
+LOCAL_VECTOR_DTYPE = os.getenv("LOCAL_VECTOR_DTYPE", "float16")
+
+# Rows converted to float32 at a time during search, bounding scratch memory
+_SEARCH_BLOCK = 8192
+_LIST_PAGE = 100
+
+class _Vector:
+    """Fetched vector, shaped like the Pinecone client's Vector"""
+
+    def __init__(self, id, values, metadata):
+        self.id = id
+        self.values = values
+        self.metadata = metadata
+
+class _FetchResponse:
+    def __init__(self, vectors):
+        self.vectors = vectors
+
+class _Match:
+    """Query match, shaped like the Pinecone client's ScoredVector"""
+
+    def __init__(self, id, score, metadata, values=None):
+        self.id = id
+        self.score = score
+        self.metadata = metadata
+        self.values = values or []
+
+class _QueryResponse:
+    def __init__(self, matches):
+        self.matches = matches
+
+class _NamespaceStore:
+    """One namespace on disk: a memory-mapped vector file plus a JSON sidecar.
+
+    Vectors are L2-normalized and stored row by row as float16, or as int8
+    with a float32 scale per row. Upserts append rows and tombstone the row
+    an id previously had; deletes only tombstone. The file is rewritten
+    without dead rows once they outnumber the live ones.
+    """
+
+    def __init__(self, path, dtype):
+        self.path = path
+        self._lock = threading.Lock()
+        self._matrix = None
+        self._scales = None
+        meta_path = os.path.join(path, "meta.json")
+        if os.path.exists(meta_path):
+            with open(meta_path, "r") as f:
+                meta = json.load(f)
+        else:
+            meta = {"dim": None, "dtype": dtype, "ids": [], "metadata": []}
+        self.dim = meta["dim"]
+        self.dtype = np.dtype(meta["dtype"])
+        self.ids = meta["ids"]
+        self.metadata = meta["metadata"]
+        self._row_of = {vector_id: row for row, vector_id in enumerate(self.ids) if vector_id is not None}
+        self._live = np.array([vector_id is not None for vector_id in self.ids], dtype=bool)
+
+    @property
+    def count(self):
+        return len(self._row_of)
+
+    def _file(self, name):
+        return os.path.join(self.path, name)
+
+    def _save_meta(self):
+        meta_path = self._file("meta.json")
+        tmp_path = f"{meta_path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"dim": self.dim, "dtype": self.dtype.name, "ids": self.ids, "metadata": self.metadata}, f)
+        os.replace(tmp_path, meta_path)
+
+    def _encode(self, vectors):
+        """Normalize rows and convert to the storage dtype; returns (rows, scales or None)"""
+        vectors = np.asarray(vectors, dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        vectors = vectors / norms
+        if self.dtype == np.int8:
+            scales = np.abs(vectors).max(axis=1) / 127.0
+            scales[scales == 0] = 1.0
+            return np.round(vectors / scales[:, None]).astype(np.int8), scales.astype(np.float32)
+        return vectors.astype(self.dtype), None
+
+    def _append_rows(self, name, data, rows_before):
+        """Write data after the first rows_before rows, dropping any bytes a crashed write left behind"""
+        path = self._file(name)
+        offset = rows_before * data.itemsize * int(np.prod(data.shape[1:]))
+        with open(path, "r+b" if os.path.exists(path) else "wb") as f:
+            f.seek(offset)
+            f.write(data.tobytes())
+            f.truncate()
+
+    def _mapped(self):
+        """Zero-copy views of the vector (and scale) files, reopened when the row count changes"""
+        rows = len(self.ids)
+        if rows == 0:
+            return None, None
+        if self._matrix is None or self._matrix.shape[0] != rows:
+            self._matrix = np.memmap(self._file("vectors.bin"), dtype=self.dtype, mode="r", shape=(rows, self.dim))
+            if self.dtype == np.int8:
+                self._scales = np.memmap(self._file("scales.bin"), dtype=np.float32, mode="r", shape=(rows,))
+        return self._matrix, self._scales
+
+    def upsert(self, records):
+        if not records:
+            return 0
+        with self._lock:
+            values = [record["values"] for record in records]
+            dim = len(values[0])
+            if self.dim is None:
+                self.dim = dim
+                os.makedirs(self.path, exist_ok=True)
+            elif dim != self.dim:
+                raise ValueError(f"Vector dimension {dim} does not match namespace dimension {self.dim}")
+
+            rows, scales = self._encode(values)
+            rows_before = len(self.ids)
+            self._append_rows("vectors.bin", rows, rows_before)
+            if scales is not None:
+                self._append_rows("scales.bin", scales, rows_before)
+
+            for offset, record in enumerate(records):
+                previous = self._row_of.get(record["id"])
+                if previous is not None:
+                    self.ids[previous] = None
+                    self.metadata[previous] = None
+                self._row_of[record["id"]] = rows_before + offset
+                self.ids.append(record["id"])
+                self.metadata.append(record.get("metadata") or {})
+            self._live = np.array([vector_id is not None for vector_id in self.ids], dtype=bool)
+            self._maybe_compact()
+            self._save_meta()
+            return len(records)
+
+    def delete(self, ids):
+        with self._lock:
+            deleted = 0
+            for vector_id in ids:
+                row = self._row_of.pop(vector_id, None)
+                if row is not None:
+                    self.ids[row] = None
+                    self.metadata[row] = None
+                    self._live[row] = False
+                    deleted += 1
+            if deleted:
+                self._maybe_compact()
+                self._save_meta()
+            return deleted
+
+    def delete_all(self):
+        with self._lock:
+            for name in ("vectors.bin", "scales.bin", "meta.json"):
+                if os.path.exists(self._file(name)):
+                    os.remove(self._file(name))
+            self.ids, self.metadata, self._row_of = [], [], {}
+            self._live = np.zeros(0, dtype=bool)
+            self._matrix = self._scales = None
+
+    def _maybe_compact(self):
+        """Rewrite the files without tombstoned rows once they outnumber live rows (caller holds the lock)"""
+        dead = len(self.ids) - self.count
+        if dead <= max(1024, self.count):
+            return
+        matrix, scales = self._mapped()
+        keep = np.flatnonzero(self._live)
+        live_rows = np.ascontiguousarray(matrix[keep])
+        live_scales = np.ascontiguousarray(scales[keep]) if scales is not None else None
+        # Write new files and swap them in, so searches still mapping the old files are unaffected
+        self._matrix = self._scales = None
+        for name, data in (("vectors.bin", live_rows), ("scales.bin", live_scales)):
+            if data is None:
+                continue
+            tmp_path = self._file(f"{name}.tmp")
+            with open(tmp_path, "wb") as f:
+                f.write(data.tobytes())
+            os.replace(tmp_path, self._file(name))
+        self.ids = [self.ids[row] for row in keep]
+        self.metadata = [self.metadata[row] for row in keep]
+        self._row_of = {vector_id: row for row, vector_id in enumerate(self.ids)}
+        self._live = np.ones(len(self.ids), dtype=bool)
+        print(f"🧹 Compacted local vectors in {self.path}: dropped {dead} deleted rows")
+
+    def search(self, vector, top_k, include_values=False):
+        """Return [(id, score, metadata)] for the top_k live rows by cosine similarity, plus the stored vector if include_values"""
+        with self._lock:
+            matrix, scales = self._mapped()
+            # delete() tombstones these in place, so score against a snapshot
+            live = self._live.copy()
+            ids, metadata = list(self.ids), list(self.metadata)
+        if matrix is None or not live.any():
+            return []
+
+        query = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(query)
+        if norm:
+            query = query / norm
+        scores = np.empty(len(live), dtype=np.float32)
+        for start in range(0, len(live), _SEARCH_BLOCK):
+            block = matrix[start:start + _SEARCH_BLOCK].astype(np.float32)
+            scores[start:start + len(block)] = block @ query
+        if scales is not None:
+            scores *= scales
+        scores[~live] = -np.inf
+
+        k = min(top_k, int(live.sum()))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        if not include_values:
+            return [(ids[row], float(scores[row]), metadata[row]) for row in top]
+        rows = matrix[top].astype(np.float32)
+        if scales is not None:
+            rows *= scales[top][:, None]
+        return [(ids[row], float(scores[row]), metadata[row], values.tolist()) for row, values in zip(top, rows)]
+
+    def fetch(self, ids):
+        with self._lock:
+            matrix, scales = self._mapped()
+            found = {}
+            for vector_id in ids:
+                row = self._row_of.get(vector_id)
+                if row is None:
+                    continue
+                values = matrix[row].astype(np.float32)
+                if scales is not None:
+                    values *= scales[row]
+                found[vector_id] = _Vector(vector_id, values.tolist(), dict(self.metadata[row]))
+            return found
+
+    def list_ids(self):
+        with self._lock:
+            return list(self._row_of)
+
+class LocalVectorIndex:
+    """Stand-in for a Pinecone Index that keeps each namespace in local memory-mapped files.
+
+    Implements the subset of the Pinecone index API the service uses:
+    upsert, delete, fetch, query, list and describe_index_stats, plus a
+    `search` used by LocalVectorStore.
+    """
+
+    def __init__(self, path=LOCAL_VECTOR_PATH, dtype=LOCAL_VECTOR_DTYPE):
+        if np.dtype(dtype) not in (np.float16, np.int8):
+            raise ValueError(f"LOCAL_VECTOR_DTYPE must be float16 or int8, not {dtype}")
+        self.path = path
+        self.dtype = dtype
+        self._stores = {}
+        self._lock = threading.Lock()
+
+    def initialize(self):
+        try:
+            os.makedirs(self.path, exist_ok=True)
+            print(f"✅ Using local vector store at {self.path} ({self.dtype})")
+            return True
+        except Exception as e:
+            print(f"❌ Error initializing local vector store: {e}")
+            return False
+
+    def _store(self, namespace):
+        safe_name = re.sub(r"[^A-Za-z0-9_.-]", "_", namespace or "default")
+        with self._lock:
+            store = self._stores.get(safe_name)
+            if store is None:
+                store = self._stores[safe_name] = _NamespaceStore(os.path.join(self.path, safe_name), self.dtype)
+            return store
+
+    def upsert(self, vectors, namespace=""):
+        return {"upserted_count": self._store(namespace).upsert(vectors)}
+
+    def delete(self, ids=None, namespace="", delete_all=False):
+        store = self._store(namespace)
+        if delete_all:
+            store.delete_all()
+        elif ids:
+            store.delete(ids)
+        return {}
+
+    def fetch(self, ids, namespace=""):
+        return _FetchResponse(self._store(namespace).fetch(ids))
+
+    def list(self, namespace=""):
+        ids = self._store(namespace).list_ids()
+        for start in range(0, len(ids), _LIST_PAGE):
+            yield ids[start:start + _LIST_PAGE]
+
+    def search(self, vector, top_k, namespace=""):
+        return self._store(namespace).search(vector, top_k)
+
+    def query(self, vector, top_k, namespace="", include_values=False, include_metadata=True):
+        matches = []
+        for match in self._store(namespace).search(vector, top_k, include_values=include_values):
+            metadata = dict(match[2]) if include_metadata else None
+            matches.append(_Match(match[0], match[1], metadata, match[3] if include_values else None))
+        return _QueryResponse(matches)
+
+    def describe_index_stats(self):
+        namespaces = {}
+        dimension = None
+        if os.path.isdir(self.path):
+            for name in sorted(os.listdir(self.path)):
+                if os.path.exists(os.path.join(self.path, name, "meta.json")):
+                    store = self._store(name)
+                    namespaces[name] = {"vector_count": store.count}
+                    dimension = dimension or store.dim
+        return {
+            "total_vector_count": sum(ns["vector_count"] for ns in namespaces.values()),
+            "namespaces": namespaces,
+            "dimension": dimension or 768,
+            "index_fullness": 0.0,
+        }
+
+class LocalVectorStore:
+    """The part of LangChain's PineconeVectorStore interface the service uses, over LocalVectorIndex"""
+
+    def __init__(self, index, embedding, namespace, text_key="text"):
+        self.index = index
+        self._embedding = embedding
+        self.namespace = namespace
+        self.text_key = text_key
+
+    @property
+    def embeddings(self):
+        return self._embedding
+
+    def similarity_search_by_vector_with_score(self, embedding, k=4):
+        results = []
+        for _, score, metadata in self.index.search(embedding, k, namespace=self.namespace):
+            metadata = dict(metadata)
+            text = metadata.pop(self.text_key, "")
+            results.append((Document(page_content=text, metadata=metadata), score))
+        return results
+
+    def similarity_search_with_score(self, query, k=4):
+        return self.similarity_search_by_vector_with_score(self._embedding.embed_query(query), k=k)
+
+    def similarity_search(self, query, k=4):
+        return [doc for doc, _ in self.similarity_search_with_score(query, k=k)]
@@ -1,9 +1,13 @@
 import os
 from pinecone import Pinecone, ServerlessSpec
 from dotenv import load_dotenv
+from utils.local_vector_store import LocalVectorIndex
 
 load_dotenv()
 
+# "pinecone" (hosted index) or "local" (memory-mapped files under LOCAL_VECTOR_PATH)
+VECTOR_BACKEND = os.getenv("VECTOR_BACKEND", "pinecone").lower()
+
 class PineconeManager:
     def __init__(self):
         self.api_key = os.getenv("PINECONE_API_KEY")
@@ -79,15 +83,22 @@ class PineconeManager:
 
 
 pinecone_manager = PineconeManager()
+local_vector_index = LocalVectorIndex() if VECTOR_BACKEND == "local" else None
 
 def get_pinecone_index():
-    """Get Pinecone index instance"""
+    """Get Pinecone index instance (or the local index when VECTOR_BACKEND=local)"""
+    if local_vector_index:
+        return local_vector_index
     return pinecone_manager.get_index()
 
 def init_pinecone():
     """Initialize Pinecone"""
+    if local_vector_index:
+        return local_vector_index.initialize()
     return pinecone_manager.initialize()
 
 def get_pinecone_stats():
     """Get Pinecone statistics"""
+    if local_vector_index:
+        return local_vector_index.describe_index_stats()
     return pinecone_manager.get_stats()
\ No newline at end of file
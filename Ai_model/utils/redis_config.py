@@ -23,7 +23,8 @@ async def init_redis():
         print("✅ Redis connected successfully via URL")
         
         try:
-            await redis_client.config_set('maxmemory-policy', 'allkeys-lru')
+            # Only keys with a TTL (the caches) may be evicted; the document registry has none and must survive
+            await redis_client.config_set('maxmemory-policy', 'volatile-lru')
             print("✅ Redis memory policy configured")
         except Exception as e:
             print(f"⚠️ Could not configure Redis memory policy: {e}")
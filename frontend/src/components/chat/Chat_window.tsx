@@ -5,6 +5,7 @@ import React, { useEffect, useRef, useState } from 'react'
 import ThinkingAnimation from '../ui/ThinkingAnimation'
 import { Message } from '@/types'
 import axiosInstance from '@/lib/api'
+import waitForUpload from '@/lib/upload'
 
 interface Chat_WindowProps {
     messages: Message[];
@@ -147,14 +148,35 @@ function Chat_window({
                 },
             });
 
-            const botMessage: Message = {
-                id: `bot-${Date.now()}`,
+            if (response.data.error) {
+                throw new Error(response.data.error);
+            }
+
+            const statusId = `bot-${Date.now()}`;
+            setMessages(prev => [...prev, {
+                id: statusId,
                 type: "bot",
-                content: response.data.message || `✅ Successfully added ${currentFiles.length} file${currentFiles.length > 1 ? 's' : ''} to this chat. You can now ask questions about the content.`,
+                content: `⏳ Processing ${currentFiles.length} file${currentFiles.length > 1 ? 's' : ''}...`,
                 timestamp: new Date(),
-            };
+            }]);
 
-            setMessages(prev => [...prev, botMessage]);
+            const job = await waitForUpload(response.data.job_id, (progress) => {
+                setMessages(prev => prev.map(message => message.id === statusId
+                    ? { ...message, content: `⏳ Processing ${currentFiles.length} file${currentFiles.length > 1 ? 's' : ''}... (${progress.stage}, ${progress.pages_done} pages read)` }
+                    : message
+                ));
+            });
+
+            setMessages(prev => prev.map(message => message.id === statusId
+                ? {
+                    ...message,
+                    content: job.status === "completed"
+                        ? `✅ Successfully added ${currentFiles.length} file${currentFiles.length > 1 ? 's' : ''} to this chat. You can now ask questions about the content.`
+                        : `❌ ${job.error || "Processing failed. Please try again."}`,
+                    timestamp: new Date(),
+                }
+                : message
+            ));
 
             if (response.data.doc_id && response.data.doc_id !== selectedChatId) {
                 onNewChatCreated?.(response.data.doc_id);
@@ -1,4 +1,5 @@
 import axiosInstance from '@/lib/api'
+import waitForUpload from '@/lib/upload'
 import { Message, PreviousChat } from '@/types'
 import { motion } from 'framer-motion'
 import { FileText, X, Send, Upload, Plus, Edit2 } from 'lucide-react'
@@ -26,6 +27,8 @@ export default function UploadFile({
 }: UploadProps) {
     const [isDragOver, setIsDragOver] = useState(false);
     const [isUploading, setIsUploading] = useState(false);
+    const [isProcessing, setIsProcessing] = useState(false);
+    const [processingStage, setProcessingStage] = useState("");
     const [selectedFiles, setSelectedFiles] = useState<File[]>([]);
     const [chatName, setChatName] = useState("");
     const [isCustomName, setIsCustomName] = useState(false);
@@ -69,6 +72,20 @@ export default function UploadFile({
                 },
             );
 
+            if (response.data.error) {
+                throw new Error(response.data.error);
+            }
+
+            setIsProcessing(true);
+            const job = await waitForUpload(response.data.job_id, (progress) => {
+                setProcessingStage(`${progress.stage}, ${progress.pages_done} pages read`);
+            });
+            setIsProcessing(false);
+            setProcessingStage("");
+            if (job.status === "failed") {
+                throw new Error(job.error || "Processing failed");
+            }
+
             setIsUploading(false);
             setSelectedChatId(response.data.doc_id);
             onUploadSuccess?.(response.data.doc_id);
@@ -90,7 +107,9 @@ export default function UploadFile({
         } catch (error) {
             console.error("Upload failed:", error);
             setIsUploading(false);
-            alert("Upload failed. Please try again.");
+            setIsProcessing(false);
+            setProcessingStage("");
+            alert(error instanceof Error && error.message ? `Upload failed: ${error.message}` : "Upload failed. Please try again.");
         }
     };
 
@@ -314,7 +333,7 @@ export default function UploadFile({
                                 {isUploading && (
                                     <div className="mt-4">
                                         <div className="flex items-center justify-between text-sm mb-2 text-foreground">
-                                            <span>Uploading files...</span>
+                                            <span>{isProcessing ? `Processing files...${processingStage ? ` (${processingStage})` : ''}` : 'Uploading files...'}</span>
                                             <span>{uploadProgress}%</span>
                                         </div>
                                         <div className="w-full rounded-full h-2 bg-muted">
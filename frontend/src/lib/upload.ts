@@ -0,0 +1,52 @@
+import axiosInstance from "@/lib/api";
+import { UploadJob } from "@/types";
+
+const POLL_INTERVAL_MS = 1500;
+const MAX_POLL_INTERVAL_MS = 10000;
+const MAX_WAIT_MS = 30 * 60 * 1000;
+const MAX_POLL_ERRORS = 5;
+
+function failedJob(jobId: string, lastJob: UploadJob | null, error: string): UploadJob {
+    return {
+        job_id: jobId,
+        doc_id: lastJob?.doc_id ?? "",
+        stage: lastJob?.stage ?? "failed",
+        pages_done: lastJob?.pages_done ?? 0,
+        chunks_embedded: lastJob?.chunks_embedded ?? 0,
+        status: "failed",
+        error,
+    };
+}
+
+// Uploads are ingested in the background; poll the job until it finishes or fails.
+// Polls back off up to MAX_POLL_INTERVAL_MS, and give up after MAX_WAIT_MS or
+// MAX_POLL_ERRORS failed requests in a row, returning the job as failed.
+async function waitForUpload(jobId: string, onProgress?: (job: UploadJob) => void): Promise<UploadJob> {
+    const deadline = Date.now() + MAX_WAIT_MS;
+    let interval = POLL_INTERVAL_MS;
+    let errors = 0;
+    let lastJob: UploadJob | null = null;
+
+    while (Date.now() < deadline) {
+        try {
+            const response = await axiosInstance.get<UploadJob>(`/ai/chat/upload/${jobId}`);
+            const job = response.data;
+            errors = 0;
+            if (job.status === "completed" || job.status === "failed") {
+                return job;
+            }
+            lastJob = job;
+            onProgress?.(job);
+        } catch {
+            errors += 1;
+            if (errors >= MAX_POLL_ERRORS) {
+                return failedJob(jobId, lastJob, "Lost contact with the server while processing. Please try again.");
+            }
+        }
+        await new Promise((resolve) => setTimeout(resolve, Math.min(interval, Math.max(0, deadline - Date.now()))));
+        interval = Math.min(interval * 1.5, MAX_POLL_INTERVAL_MS);
+    }
+    return failedJob(jobId, lastJob, "Processing is taking too long. Please try again later.");
+}
+
+export default waitForUpload;
@@ -17,4 +17,14 @@ interface HistoryItem {
     timestamp: string;
 }
 
-export type { PreviousChat, Message, HistoryItem };
\ No newline at end of file
+interface UploadJob {
+    job_id: string;
+    doc_id: string;
+    status: "queued" | "running" | "completed" | "failed";
+    stage: string;
+    pages_done: number;
+    chunks_embedded: number;
+    error: string | null;
+}
+
+export type { PreviousChat, Message, HistoryItem, UploadJob };
\ No newline at end of file